@@ -0,0 +1,46 @@
+from django.contrib import admin
+
+from analytics.models import DailyCount, RollupWatermark
+from analytics.stats import get_labels
+
+
+@admin.register(DailyCount)
+class DailyCountAdmin(admin.ModelAdmin):
+    list_display = ('day', 'metric', 'label', 'count', 'quantity', 'amount_cents')
+    list_filter = ('metric',)
+    date_hierarchy = 'day'
+    list_per_page = 200
+
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        rows = list(changelist.result_list)
+        for metric in {row.metric for row in rows}:
+            labels = get_labels(metric, {row.dimension for row in rows if row.metric == metric})
+            for row in rows:
+                if row.metric == metric:
+                    row.label = labels[row.dimension]
+        return changelist
+
+    @admin.display(description='Dimension')
+    def label(self, obj):
+        return getattr(obj, 'label', obj.dimension)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('metric', 'last_id', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,17 @@
+"""
+Analytics app config.
+"""
+
+from django.apps import AppConfig
+
+
+class AnalyticsConfig(AppConfig):
+    """
+    Analytics app config.
+
+    Attributes:
+        default_auto_field: Default auto-created primary key field.
+        name: App name.
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'analytics'
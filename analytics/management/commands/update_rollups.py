@@ -0,0 +1,40 @@
+"""
+Worker command counting new rows into the daily rollups.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.models import DailyCount
+from analytics.rollups import DEFAULT_LAG, SOURCES, count_batch
+
+
+class Command(BaseCommand):
+    """
+    Count rows created since the last run into the daily rollups, one batch per metric per iteration.
+    The first run counts the whole history. Runs forever unless ``--once`` is passed.
+    """
+    help = 'Update daily rollups of contacts, vacancy applications and orders.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Source rows counted per batch.')
+        parser.add_argument('--sleep', type=float, default=60.0, help='Seconds to wait when nothing is new.')
+        parser.add_argument('--lag', type=float, default=DEFAULT_LAG, help='Seconds a row must be old to be counted.')
+        parser.add_argument('--only', choices=[metric for metric, _ in DailyCount.METRICS],
+                            help='Update one metric.')
+        parser.add_argument('--once', action='store_true', help='Exit when nothing is new.')
+
+    def handle(self, *args, **options):
+        metrics = [options['only']] if options['only'] else list(SOURCES)
+        while True:
+            counted = 0
+            for metric in metrics:
+                rows = count_batch(metric, options['batch_size'], options['lag'])
+                if rows:
+                    self.stdout.write(f'Counted {rows} rows of {metric}')
+                counted += rows
+            if not counted:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
@@ -0,0 +1,66 @@
+"""
+Models for analytics app.
+"""
+
+from django.db import models
+
+
+class DailyCount(models.Model):
+    """
+    Count of rows of a metric created on one day, per dimension value.
+
+    Attributes:
+        metric: Counted rows, e.g. ``contacts``.
+        day: Creation date of the rows.
+        dimension: Value the rows are grouped by: contact status, vacancy ID or product ID.
+        count: Count of rows.
+        quantity: Sum of ordered units, orders only.
+        amount_cents: Sum of line totals in cents, orders only.
+    """
+    CONTACTS = 'contacts'
+    APPLICATIONS = 'applications'
+    ORDERS = 'orders'
+    METRICS = [
+        (CONTACTS, "Contacts by status"),
+        (APPLICATIONS, "Vacancy applications by vacancy"),
+        (ORDERS, "Order lines by product"),
+    ]
+
+    metric = models.CharField(max_length=20, choices=METRICS)
+    day = models.DateField()
+    dimension = models.CharField(max_length=64, blank=True)
+    count = models.IntegerField(default=0)
+    quantity = models.BigIntegerField(default=0)
+    amount_cents = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.metric} {self.day} {self.dimension}: {self.count}'
+
+    class Meta:
+        verbose_name = "Daily Count"
+        verbose_name_plural = "Daily Counts"
+        ordering = ['-day', 'metric', 'dimension']
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'day', 'dimension'], name='daily_count_unique'),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """
+    Last source row counted into the rollups of a metric.
+
+    Attributes:
+        metric: Metric of ``DailyCount``.
+        last_id: Primary key of the last counted source row.
+        updated_at: Date and time the watermark last moved.
+    """
+    metric = models.CharField(max_length=20, primary_key=True, choices=DailyCount.METRICS)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.metric}: {self.last_id}'
+
+    class Meta:
+        verbose_name = "Rollup Watermark"
+        verbose_name_plural = "Rollup Watermarks"
@@ -0,0 +1,136 @@
+"""
+Incremental daily rollups of contacts, vacancy applications and orders.
+
+Each metric keeps a watermark, the primary key of the last source row it
+counted. ``count_batch`` takes the next rows past the watermark, groups
+them by creation day and dimension in the database and adds the counts to
+``DailyCount``, moving the watermark in the same transaction. Rows created
+less than ``lag`` seconds ago stop the batch, so rows of transactions still
+in flight, which may commit after rows with higher keys, aren't skipped.
+
+Contact statuses change after creation. ``move_contacts`` moves counted
+contacts between status buckets under the same watermark lock, so the
+rollups hold current statuses. Archived and deleted rows stay counted.
+"""
+
+from datetime import date, timedelta
+from itertools import takewhile
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from analytics.models import DailyCount, RollupWatermark
+from api_models.models import Contact, VacancyApplication
+from orders.models import OrderLine
+
+SOURCES = {
+    DailyCount.CONTACTS: (Contact, 'created_at', 'status'),
+    DailyCount.APPLICATIONS: (VacancyApplication, 'created_at', 'vacancy_id'),
+    DailyCount.ORDERS: (OrderLine, 'order__created_at', 'product_id'),
+}
+DEFAULT_LAG = 60
+
+Counts = dict[tuple[date, str], tuple[int, int, int]]
+
+
+def get_watermark(metric: str) -> RollupWatermark:
+    """
+    Get watermark of the metric, locked until the end of the transaction.
+
+    Every change of the metric's rollups holds this lock, so they are never updated concurrently.
+    """
+    RollupWatermark.objects.bulk_create([RollupWatermark(metric=metric)], ignore_conflicts=True)
+    return RollupWatermark.objects.select_for_update().get(metric=metric)
+
+
+def add_counts(metric: str, counts: Counts) -> None:
+    """
+    Add counts to rollups of the metric. The caller holds the watermark lock.
+
+    Args:
+        metric: Metric of ``DailyCount``.
+        counts: Count, quantity and amount in cents to add, by day and dimension. Negative values subtract.
+    """
+    if not counts:
+        return
+    existing = {
+        (row.day, row.dimension): row
+        for row in DailyCount.objects.filter(metric=metric, day__in={day for day, _ in counts}).order_by()
+    }
+    changed, created = [], []
+    for (day, dimension), (count, quantity, amount_cents) in counts.items():
+        row = existing.get((day, dimension))
+        if row is None:
+            row = DailyCount(metric=metric, day=day, dimension=dimension)
+            created.append(row)
+        else:
+            changed.append(row)
+        row.count += count
+        row.quantity += quantity
+        row.amount_cents += amount_cents
+    DailyCount.objects.bulk_update(changed, ['count', 'quantity', 'amount_cents'])
+    DailyCount.objects.bulk_create(created)
+
+
+def count_batch(metric: str, batch_size: int, lag: float = DEFAULT_LAG) -> int:
+    """
+    Count the next batch of source rows past the watermark of the metric.
+
+    Args:
+        metric: Metric of ``DailyCount``.
+        batch_size: Maximum number of source rows.
+        lag: Seconds a row must be old to be counted.
+
+    Returns:
+        int: Count of counted source rows.
+    """
+    model, date_field, dimension_field = SOURCES[metric]
+    cutoff = timezone.now() - timedelta(seconds=lag)
+    with transaction.atomic():
+        watermark = get_watermark(metric)
+        pending = model.objects.filter(pk__gt=watermark.last_id).order_by('pk')
+        rows = list(takewhile(lambda row: row[1] < cutoff, pending.values_list('pk', date_field)[:batch_size]))
+        if not rows:
+            return 0
+        last_id = rows[-1][0]
+
+        totals = {'rows': Count('pk')}
+        if metric == DailyCount.ORDERS:
+            totals.update(units=Sum('count'), amount=Sum('total_cents'))
+        groups = (
+            pending.filter(pk__lte=last_id).annotate(day=TruncDate(date_field))
+            .values('day', dimension_field).annotate(**totals).order_by()
+        )
+        add_counts(metric, {
+            (group['day'], '' if group[dimension_field] is None else str(group[dimension_field])):
+                (group['rows'], group.get('units') or 0, group.get('amount') or 0)
+            for group in groups
+        })
+        watermark.last_id = last_id
+        watermark.save(update_fields=['last_id', 'updated_at'])
+    return len(rows)
+
+
+def move_contacts(watermark: RollupWatermark, contacts: list[tuple[Contact, str]]) -> None:
+    """
+    Move counted contacts to the buckets of their new statuses.
+
+    Runs in the transaction saving the statuses, with previous statuses read
+    after the contacts watermark was locked. Contacts past the watermark are
+    left to ``count_batch``, which counts them with their current status.
+
+    Args:
+        watermark: Locked watermark of the contacts metric.
+        contacts: Contacts with the new status set, and their previous status.
+    """
+    counts = {}
+    for contact, previous in contacts:
+        if contact.pk > watermark.last_id or contact.status == previous:
+            continue
+        day = timezone.localtime(contact.created_at).date()
+        for status, change in ((previous, -1), (contact.status, 1)):
+            count = counts.get((day, status), (0, 0, 0))[0]
+            counts[(day, status)] = (count + change, 0, 0)
+    add_counts(DailyCount.CONTACTS, counts)
@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+from analytics.models import DailyCount
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+
+
+class StatsQuerySerializer(serializers.Serializer):
+    metric = serializers.ChoiceField(choices=DailyCount.METRICS)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault('end', timezone.localdate())
+        attrs.setdefault('start', attrs['end'] - timedelta(days=DEFAULT_DAYS - 1))
+        if attrs['start'] > attrs['end']:
+            raise serializers.ValidationError("Start must not be after end.")
+        if (attrs['end'] - attrs['start']).days >= MAX_DAYS:
+            raise serializers.ValidationError(f"Range must not exceed {MAX_DAYS} days.")
+        return attrs
+
+
+class DailyCountSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    dimension = serializers.CharField()
+    label = serializers.CharField()
+    count = serializers.IntegerField()
+    quantity = serializers.IntegerField()
+    amount_cents = serializers.IntegerField()
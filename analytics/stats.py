@@ -0,0 +1,47 @@
+"""
+Reading of daily rollups for the stats endpoint and the admin.
+"""
+
+from datetime import date
+
+from analytics.models import DailyCount
+from api_models.models import Contact, Vacancy
+from household_chemicals.models import ChemicalProduct
+
+DIMENSION_MODELS = {
+    DailyCount.APPLICATIONS: Vacancy,
+    DailyCount.ORDERS: ChemicalProduct,
+}
+
+
+def get_labels(metric: str, dimensions: set[str]) -> dict[str, str]:
+    """
+    Get display labels of dimension values, e.g. vacancy titles by vacancy ID.
+    """
+    if metric == DailyCount.CONTACTS:
+        choices = dict(Contact._meta.get_field('status').choices)
+        return {dimension: str(choices.get(dimension, dimension)) for dimension in dimensions}
+    ids = [int(dimension) for dimension in dimensions if dimension.isdigit()]
+    titles = DIMENSION_MODELS[metric].objects.in_bulk(ids)
+    return {
+        dimension: titles[int(dimension)].title if dimension.isdigit() and int(dimension) in titles
+        else dimension or 'Other'
+        for dimension in dimensions
+    }
+
+
+def get_stats(metric: str, start: date, end: date) -> list[dict]:
+    """
+    Get rollup rows of the metric between two days, inclusive.
+
+    Returns:
+        list[dict]: Day, dimension with its label and the counts, ordered by day.
+    """
+    rows = list(
+        DailyCount.objects.filter(metric=metric, day__range=(start, end)).order_by('day', 'dimension')
+        .values('day', 'dimension', 'count', 'quantity', 'amount_cents')
+    )
+    labels = get_labels(metric, {row['dimension'] for row in rows})
+    for row in rows:
+        row['label'] = labels[row['dimension']]
+    return rows
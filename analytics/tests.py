@@ -0,0 +1,110 @@
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from analytics.models import DailyCount, RollupWatermark
+from analytics.rollups import count_batch, get_watermark, move_contacts
+from api_models.models import Contact, Vacancy, VacancyApplication
+from household_chemicals.models import ChemicalProduct
+from orders.models import Order, OrderLine
+
+DAY = date(2026, 3, 2)
+CREATED_AT = datetime(2026, 3, 2, 9, tzinfo=dt_timezone.utc)
+
+
+def create_contact(email, status='new'):
+    contact = Contact.objects.create(name='Lead', email=email, address='1 Main St', status=status)
+    Contact.objects.filter(pk=contact.pk).update(created_at=CREATED_AT)
+    contact.created_at = CREATED_AT
+    return contact
+
+
+def get_counts(metric):
+    return {
+        (row.day, row.dimension): (row.count, row.quantity, row.amount_cents)
+        for row in DailyCount.objects.filter(metric=metric)
+    }
+
+
+class RollupTests(TestCase):
+    def test_only_new_rows_are_counted(self):
+        create_contact('first@example.com')
+        create_contact('second@example.com', status='closed')
+        self.assertEqual(count_batch(DailyCount.CONTACTS, 1, lag=0), 1)
+        self.assertEqual(count_batch(DailyCount.CONTACTS, 10, lag=0), 1)
+        self.assertEqual(count_batch(DailyCount.CONTACTS, 10, lag=0), 0)
+
+        create_contact('third@example.com')
+        count_batch(DailyCount.CONTACTS, 10, lag=0)
+        self.assertEqual(get_counts(DailyCount.CONTACTS), {(DAY, 'new'): (2, 0, 0), (DAY, 'closed'): (1, 0, 0)})
+
+    def test_recent_rows_wait_for_lag(self):
+        Contact.objects.create(name='Lead', email='lead@example.com', address='1 Main St')
+        self.assertEqual(count_batch(DailyCount.CONTACTS, 10), 0)
+        self.assertEqual(RollupWatermark.objects.get().last_id, 0)
+
+    def test_orders_are_counted_by_product(self):
+        soap = ChemicalProduct.objects.create(title='Soap', price='2.50')
+        for count in (2, 3):
+            order = Order.objects.create(full_name='Sasha', phone_number='+996700123456', address='Bishkek',
+                                         total_cents=250 * count)
+            OrderLine.objects.create(order=order, product=soap, title='Soap', count=count, unit_price_cents=250,
+                                     total_cents=250 * count)
+        OrderLine.objects.create(order=order, title='Custom', count=1, unit_price_cents=100, total_cents=100)
+        Order.objects.update(created_at=CREATED_AT)
+
+        with self.assertNumQueries(9):
+            self.assertEqual(count_batch(DailyCount.ORDERS, 10, lag=0), 3)
+        self.assertEqual(get_counts(DailyCount.ORDERS), {(DAY, str(soap.pk)): (2, 5, 1250), (DAY, ''): (1, 1, 100)})
+
+    def test_status_change_moves_counted_contacts(self):
+        counted = create_contact('counted@example.com')
+        count_batch(DailyCount.CONTACTS, 10, lag=0)
+        pending = create_contact('pending@example.com')
+
+        watermark = get_watermark(DailyCount.CONTACTS)
+        for contact in (counted, pending):
+            contact.status = 'closed'
+        move_contacts(watermark, [(counted, 'new'), (pending, 'new')])
+        self.assertEqual(get_counts(DailyCount.CONTACTS), {(DAY, 'new'): (0, 0, 0), (DAY, 'closed'): (1, 0, 0)})
+
+    def test_command_counts_all_metrics(self):
+        vacancy = Vacancy.objects.create(title='Technician')
+        VacancyApplication.objects.create(vacancy=vacancy, name='Sasha', email='sasha@example.com', phone='+1')
+        VacancyApplication.objects.update(created_at=CREATED_AT)
+        create_contact('lead@example.com')
+
+        call_command('update_rollups', '--once', '--lag=0', stdout=StringIO())
+        self.assertEqual(get_counts(DailyCount.APPLICATIONS), {(DAY, str(vacancy.pk)): (1, 0, 0)})
+        self.assertEqual(RollupWatermark.objects.count(), 3)
+
+
+class StatsViewTests(TestCase):
+    def setUp(self):
+        self.vacancy = Vacancy.objects.create(title='Technician')
+        DailyCount.objects.create(metric=DailyCount.APPLICATIONS, day=DAY, dimension=str(self.vacancy.pk), count=4)
+        DailyCount.objects.create(metric=DailyCount.APPLICATIONS, day=date(2026, 1, 1), dimension='999', count=1)
+
+    def get_stats(self, **params):
+        return self.client.get(reverse('analytics-stats'), params, secure=True)
+
+    def test_stats_are_staff_only(self):
+        self.assertEqual(self.get_stats(metric='applications').status_code, 403)
+
+    def test_stats_of_range(self):
+        self.client.force_login(get_user_model().objects.create_user('staff', is_staff=True))
+        with self.assertNumQueries(4):
+            response = self.get_stats(metric='applications', start='2026-03-01', end='2026-03-31')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{
+            'day': '2026-03-02', 'dimension': str(self.vacancy.pk), 'label': 'Technician',
+            'count': 4, 'quantity': 0, 'amount_cents': 0,
+        }])
+
+    def test_invalid_range_is_rejected(self):
+        self.client.force_login(get_user_model().objects.create_user('staff', is_staff=True))
+        self.assertEqual(self.get_stats(metric='applications', start='2026-03-02', end='2026-03-01').status_code, 400)
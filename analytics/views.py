@@ -0,0 +1,34 @@
+"""
+Views for analytics app.
+"""
+
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from analytics.serializers import DailyCountSerializer, StatsQuerySerializer
+from analytics.stats import get_stats
+
+
+class StatsView(APIView):
+    """
+    Daily counts of a metric from the rollups. Staff only.
+
+    Reads one row per day and dimension, so the cost grows with the range, not with the counted rows.
+    """
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        query_serializer=StatsQuerySerializer,
+        responses={200: openapi.Response("Daily counts", DailyCountSerializer(many=True))},
+    )
+    def get(self, request):
+        query = StatsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        rows = get_stats(**query.validated_data)
+        return Response({
+            **query.data,
+            'results': DailyCountSerializer(rows, many=True).data,
+        })
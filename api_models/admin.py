@@ -1,9 +1,11 @@
 from django.contrib import admin
 from rest_framework.exceptions import ValidationError
 from .models import City, Location, Contact, Brand, BlogPost, About, CaseStudy, Vacancy, VacancyApplication, Product, \
-    FAQ, BlogImage, Guarantee, Repair, Installation, Promotion, CaseStudyImage
+    FAQ, BlogImage, Guarantee, Repair, Installation, Promotion, CaseStudyImage, CRMEvent
 from ckeditor.widgets import CKEditorWidget
-from django.db import models
+from analytics.models import DailyCount
+from analytics.rollups import get_watermark, move_contacts
+from django.db import models, transaction
 from django.forms.models import BaseInlineFormSet
 
 
@@ -96,9 +98,19 @@ class LocationAdmin(admin.ModelAdmin):
 
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'sent_to_crm', 'created_at', 'description', 'status', 'address']
+    list_display = ['name', 'email', 'sent_to_crm', 'crm_attempts', 'created_at', 'description', 'status', 'address']
     search_fields = ['name', 'email']
     list_filter = ['sent_to_crm', ]
+    readonly_fields = ['crm_id', 'crm_attempts', 'crm_next_attempt_at', 'crm_error', 'crm_synced_at']
+
+    def save_model(self, request, obj, form, change):
+        if not (change and 'status' in form.changed_data):
+            return super().save_model(request, obj, form, change)
+        with transaction.atomic():
+            watermark = get_watermark(DailyCount.CONTACTS)
+            previous = Contact.objects.filter(pk=obj.pk).values_list('status', flat=True).get()
+            super().save_model(request, obj, form, change)
+            move_contacts(watermark, [(obj, previous)])
 
 
 @admin.register(BlogPost)
@@ -139,6 +151,7 @@ class VacancyAdmin(admin.ModelAdmin):
 class VacancyApplicationAdmin(admin.ModelAdmin):
     list_display = ['name', 'vacancy', 'email', 'phone', 'created_at']
     list_filter = ['vacancy']
+    readonly_fields = ['resume_sha256', 'resume_text', 'processed_at']
 
 
 @admin.register(FAQ)
@@ -146,3 +159,14 @@ class FAQAdmin(admin.ModelAdmin):
     list_display = ['content_type','content_type', 'content_object', 'question', 'answer', 'order']
     list_field = ['question']
 
+
+
+@admin.register(CRMEvent)
+class CRMEventAdmin(admin.ModelAdmin):
+    list_display = ['event_type', 'event_id', 'occurred_at', 'received_at', 'processed_at']
+    list_filter = ['event_type']
+    search_fields = ['event_id']
+    readonly_fields = ['event_id', 'event_type', 'crm_ids', 'payload', 'occurred_at', 'received_at', 'processed_at']
+
+    def has_add_permission(self, request):
+        return False
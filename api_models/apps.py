@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ApiModelsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api_models'
+
+    def ready(self):
+        from outbox.services import register_handler
+        from .resumes import process_application
+
+        register_handler('vacancy_application', process_application)
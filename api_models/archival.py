@@ -0,0 +1,117 @@
+"""
+Archival of old contacts and vacancy applications.
+
+Rows older than the retention cutoff are moved in primary key ranges: each
+batch is written to its own gzipped JSON Lines file under ``ARCHIVE_ROOT``,
+then deleted with one short ``DELETE`` bounded by the same key range.
+Resumes are copied next to the batch file before their rows are deleted,
+which releases them from the private storage.
+A batch interrupted after writing its file is archived again by the next
+run, so rows may repeat across files but are never lost.
+"""
+
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Type
+
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+
+from api_models.crm_sync import MAX_ATTEMPTS
+from api_models.models import Contact, VacancyApplication
+
+
+def get_archivable(model: Type[models.Model], cutoff: datetime) -> models.QuerySet:
+    """
+    Get rows older than the cutoff which are safe to archive.
+
+    Contacts still waiting for CRM sync are kept.
+    """
+    queryset = model.objects.filter(created_at__lt=cutoff)
+    if model is Contact:
+        queryset = queryset.exclude(sent_to_crm=False, crm_attempts__lt=MAX_ATTEMPTS)
+    return queryset.order_by('pk')
+
+
+def get_batches(queryset: models.QuerySet, batch_size: int) -> Iterator[tuple[int, int]]:
+    """
+    Get primary key ranges of consecutive batches, starting after the previous batch.
+    """
+    last_pk = 0
+    while True:
+        pks = list(queryset.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        yield pks[0], pks[-1]
+        last_pk = pks[-1]
+
+
+def archive_resume(application: VacancyApplication, directory: Path) -> str:
+    """
+    Copy resume of the application into the archive directory.
+
+    Returns:
+        str: Path of the copy relative to ``ARCHIVE_ROOT``, empty without a resume.
+    """
+    if not application.resume:
+        return ''
+    target = directory / 'resumes' / os.path.basename(application.resume.name)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if not target.exists():
+        with application.resume.open('rb') as source, open(target, 'wb') as file:
+            shutil.copyfileobj(source, file)
+    return str(target.relative_to(settings.ARCHIVE_ROOT))
+
+
+def archive_batch(queryset: models.QuerySet, first_pk: int, last_pk: int) -> int:
+    """
+    Write rows of the key range to an archive file and delete them.
+
+    Args:
+        queryset: Archivable rows.
+        first_pk: First primary key of the batch.
+        last_pk: Last primary key of the batch.
+
+    Returns:
+        int: Count of archived rows.
+    """
+    model = queryset.model
+    batch = queryset.filter(pk__gte=first_pk, pk__lte=last_pk)
+    rows = list(batch)
+    directory = Path(settings.ARCHIVE_ROOT) / model._meta.db_table
+    directory.mkdir(parents=True, exist_ok=True)
+
+    records = serializers.serialize('python', rows)
+    if model is VacancyApplication:
+        for row, record in zip(rows, records):
+            record['archived_resume'] = archive_resume(row, directory)
+
+    path = directory / f'{first_pk:012d}-{last_pk:012d}.jsonl.gz'
+    partial = path.with_suffix('.tmp')
+    with gzip.open(partial, 'wt', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+    os.replace(partial, path)
+
+    # Resumes are released by the delete signal once the transaction commits.
+    with transaction.atomic():
+        deleted, _ = batch.filter(pk__in=[row.pk for row in rows]).delete()
+    return deleted
+
+
+def archive_old_rows(model: Type[models.Model], cutoff: datetime, batch_size: int) -> Iterator[int]:
+    """
+    Archive rows older than the cutoff batch by batch.
+
+    Yields:
+        int: Count of rows archived by each batch.
+    """
+    queryset = get_archivable(model, cutoff)
+    for first_pk, last_pk in get_batches(queryset, batch_size):
+        yield archive_batch(queryset, first_pk, last_pk)
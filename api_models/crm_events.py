@@ -0,0 +1,159 @@
+"""
+HouseCall Pro webhook events.
+
+The webhook only verifies the signature and stores the event. The
+``process_crm_events`` worker takes stored events in batches, keeps the
+latest status per contact and applies it with one ``bulk_update``.
+"""
+
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from analytics.models import DailyCount
+from analytics.rollups import get_watermark, move_contacts
+from api_models.models import Contact, CRMEvent
+
+SIGNATURE_HEADER = 'Api-Signature'
+TIMESTAMP_HEADER = 'Api-Timestamp'
+SIGNATURE_TOLERANCE = 300
+EVENT_STATUSES = {
+    'job.scheduled': 'processed',
+    'job.on_my_way': 'processed',
+    'job.started': 'processed',
+    'job.completed': 'closed',
+    'job.canceled': 'closed',
+    'job.deleted': 'closed',
+}
+
+
+class InvalidEvent(Exception):
+    pass
+
+
+def verify_signature(body: bytes, timestamp: Optional[str], signature: Optional[str]) -> bool:
+    """
+    Check webhook signature, an HMAC-SHA256 of ``<timestamp>.<body>`` with ``HOUSECALL_WEBHOOK_SECRET``.
+
+    Args:
+        body: Raw request body.
+        timestamp: Unix time the request was signed at.
+        signature: Hex digest of the signature.
+
+    Returns:
+        bool: Whether the signature is valid and recent.
+    """
+    secret = settings.HOUSECALL_WEBHOOK_SECRET
+    if not (secret and timestamp and signature):
+        return False
+    try:
+        if abs(time.time() - int(timestamp)) > SIGNATURE_TOLERANCE:
+            return False
+    except ValueError:
+        return False
+    expected = hmac.new(secret.encode(), timestamp.encode() + b'.' + body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def parse_event(body: bytes) -> CRMEvent:
+    """
+    Build unsaved event from webhook body.
+
+    Raises:
+        InvalidEvent: Body isn't a JSON object with an ``event`` name.
+    """
+    try:
+        payload = json.loads(body)
+    except ValueError as exception:
+        raise InvalidEvent(str(exception))
+    if not isinstance(payload, dict) or not payload.get('event'):
+        raise InvalidEvent('Event name is missing')
+
+    # Contacts keep job IDs, a customer can have jobs of other contacts.
+    job = payload.get('job') or {}
+    crm_ids = [str(job['id'])] if job.get('id') else []
+    occurred_at = parse_datetime(str(payload.get('event_time') or '')) or timezone.now()
+    if timezone.is_naive(occurred_at):
+        occurred_at = occurred_at.replace(tzinfo=dt_timezone.utc)
+    return CRMEvent(
+        event_id=str(payload.get('id') or hashlib.sha256(body).hexdigest()),
+        event_type=payload['event'],
+        crm_ids=crm_ids,
+        payload=payload,
+        occurred_at=occurred_at,
+    )
+
+
+def store_event(event: CRMEvent) -> None:
+    """
+    Store received event, dropping redeliveries with one INSERT.
+    """
+    CRMEvent.objects.bulk_create([event], ignore_conflicts=True)
+
+
+def coalesce_statuses(events: list[CRMEvent]) -> dict[str, tuple[str, datetime]]:
+    """
+    Get the latest status per CRM ID.
+
+    Args:
+        events: Events in any order.
+
+    Returns:
+        dict[str, tuple[str, datetime]]: Status and time of the event it was taken from, by CRM ID.
+    """
+    latest = {}
+    for event in events:
+        status = EVENT_STATUSES.get(event.event_type)
+        if status is None:
+            continue
+        for crm_id in event.crm_ids:
+            if crm_id not in latest or latest[crm_id][1] <= event.occurred_at:
+                latest[crm_id] = (status, event.occurred_at)
+    return latest
+
+
+def process_events(batch_size: int) -> tuple[int, int]:
+    """
+    Apply one batch of stored events to contacts. Safe for concurrent workers.
+
+    Events older than the one a contact's status was last taken from are
+    ignored, so redelivered or reordered events don't roll statuses back.
+    Status changes are applied to the daily rollups in the same transaction.
+
+    Args:
+        batch_size: Maximum number of events.
+
+    Returns:
+        tuple[int, int]: Counts of processed events and updated contacts.
+    """
+    with transaction.atomic():
+        events = list(
+            CRMEvent.objects.filter(processed_at__isnull=True)
+            .select_for_update(skip_locked=True).order_by('pk')[:batch_size]
+        )
+        if not events:
+            return 0, 0
+        statuses = coalesce_statuses(events)
+        watermark = get_watermark(DailyCount.CONTACTS)
+        contacts, moves = [], []
+        candidates = Contact.objects.filter(crm_id__in=statuses) \
+            .only('pk', 'crm_id', 'status', 'crm_status_at', 'created_at')
+        for contact in candidates.order_by():
+            status, occurred_at = statuses[contact.crm_id]
+            if contact.crm_status_at and contact.crm_status_at > occurred_at:
+                continue
+            moves.append((contact, contact.status))
+            contact.status, contact.crm_status_at = status, occurred_at
+            contacts.append(contact)
+        Contact.objects.bulk_update(contacts, ['status', 'crm_status_at'])
+        move_contacts(watermark, moves)
+        CRMEvent.objects.filter(pk__in=[event.pk for event in events]).update(processed_at=timezone.now())
+    return len(events), len(contacts)
@@ -0,0 +1,176 @@
+"""
+HouseCall Pro sync of contacts.
+
+Contacts are saved with ``sent_to_crm=False`` and drained by the ``sync_crm``
+worker. Due contacts are leased with ``SELECT ... FOR UPDATE SKIP LOCKED`` by
+moving ``crm_next_attempt_at`` forward, sent over one rate-limited connection
+pool, and results are written back with one ``bulk_update`` per batch.
+Failures are retried with exponential backoff, contacts rejected as invalid
+or failing ``MAX_ATTEMPTS`` times are left for ``reconcile_crm``.
+"""
+
+from datetime import timedelta
+from typing import Optional
+
+import requests
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api_models.models import Contact
+from integrations.housecall import HouseCallClient, RateLimited
+
+MAX_ATTEMPTS = 10
+BACKOFF_BASE = timedelta(minutes=1)
+BACKOFF_MAX = timedelta(hours=6)
+LEASE_TIMEOUT = timedelta(minutes=5)
+ERROR_MAX_LENGTH = 2000
+# Client errors about the contact itself, other client errors such as 401 or 409 are retried.
+PERMANENT_STATUS_CODES = {400, 422}
+SYNC_FIELDS = ['sent_to_crm', 'crm_id', 'crm_attempts', 'crm_next_attempt_at', 'crm_error', 'crm_synced_at']
+
+
+def get_backoff(attempts: int) -> timedelta:
+    """
+    Get delay before the next attempt after the given count of failed attempts.
+    """
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def get_unsynced_contacts():
+    """
+    Get contacts not sent to CRM which are still retried.
+    """
+    return Contact.objects.filter(sent_to_crm=False, crm_attempts__lt=MAX_ATTEMPTS)
+
+
+def claim_contacts(batch_size: int) -> list[Contact]:
+    """
+    Lease due contacts for sync. Safe for concurrent workers.
+
+    Contacts leased by a worker which died become due again after ``LEASE_TIMEOUT``.
+
+    Args:
+        batch_size: Maximum number of contacts.
+
+    Returns:
+        list[Contact]: Leased contacts.
+    """
+    now = timezone.now()
+    due = get_unsynced_contacts().filter(Q(crm_next_attempt_at__isnull=True) | Q(crm_next_attempt_at__lte=now))
+    with transaction.atomic():
+        batch = list(due.select_for_update(skip_locked=True).order_by('created_at', 'pk')[:batch_size])
+        Contact.objects.filter(pk__in=[contact.pk for contact in batch]).update(
+            crm_next_attempt_at=now + LEASE_TIMEOUT,
+        )
+    return batch
+
+
+def mark_synced(contact: Contact, crm_id: str) -> None:
+    contact.sent_to_crm = True
+    contact.crm_id = crm_id
+    contact.crm_error = ''
+    contact.crm_next_attempt_at = None
+    contact.crm_synced_at = timezone.now()
+
+
+def mark_failed(contact: Contact, error: str, permanent: bool = False) -> None:
+    contact.crm_attempts = MAX_ATTEMPTS if permanent else contact.crm_attempts + 1
+    contact.crm_error = error[:ERROR_MAX_LENGTH]
+    contact.crm_next_attempt_at = timezone.now() + get_backoff(contact.crm_attempts)
+
+
+def sync_contact(client: HouseCallClient, contact: Contact) -> bool:
+    """
+    Send contact to CRM, updating its sync fields without saving.
+
+    The job of a contact claimed before, whose earlier attempt failed or whose
+    worker died holding the lease, is looked up by its reference tag first, so
+    a request which reached CRM but lost its response isn't sent twice. Such
+    contacts have ``crm_next_attempt_at`` set, it's only empty on the first
+    claim. ``crm_id`` is always a job ID.
+
+    Returns:
+        bool: Whether the contact was sent.
+    """
+    try:
+        claimed_before = contact.crm_attempts or contact.crm_next_attempt_at is not None
+        existing = client.find_job(contact) if claimed_before else None
+        record = existing or client.create_job(contact)
+    except RateLimited:
+        raise
+    except requests.HTTPError as exception:
+        response = exception.response
+        mark_failed(contact, f'HTTP {response.status_code}: {response.text}',
+                    permanent=response.status_code in PERMANENT_STATUS_CODES)
+        return False
+    except requests.RequestException as exception:
+        mark_failed(contact, f'{type(exception).__name__}: {exception}')
+        return False
+    mark_synced(contact, str(record.get('id', '')))
+    return True
+
+
+def sync_batch(client: HouseCallClient, batch_size: int) -> tuple[int, int, Optional[float]]:
+    """
+    Sync one batch of due contacts.
+
+    When CRM rate limits the worker, the rest of the batch is released
+    without counting an attempt.
+
+    Args:
+        client: HouseCall Pro client.
+        batch_size: Maximum number of contacts.
+
+    Returns:
+        tuple[int, int, Optional[float]]: Counts of sent and failed contacts,
+        and seconds to pause when CRM rate limited the worker.
+    """
+    batch = claim_contacts(batch_size)
+    sent = failed = 0
+    retry_after = None
+    for index, contact in enumerate(batch):
+        try:
+            if sync_contact(client, contact):
+                sent += 1
+            else:
+                failed += 1
+        except RateLimited as exception:
+            retry_after = exception.retry_after
+            for skipped in batch[index:]:
+                skipped.crm_next_attempt_at = timezone.now() + timedelta(seconds=retry_after)
+            break
+    Contact.objects.bulk_update(batch, SYNC_FIELDS)
+    return sent, failed, retry_after
+
+
+def reconcile(client: HouseCallClient, requeue: bool = False) -> dict:
+    """
+    Settle contacts the worker gave up on.
+
+    Contacts whose job is found in CRM are marked as sent, the rest are counted
+    and, with ``requeue``, get a fresh set of attempts.
+
+    Args:
+        client: HouseCall Pro client.
+        requeue: Whether to retry contacts not found in CRM.
+
+    Returns:
+        dict: Counts of ``found``, ``missing`` and ``requeued`` contacts.
+    """
+    counts = {'found': 0, 'missing': 0, 'requeued': 0}
+    exhausted = Contact.objects.filter(sent_to_crm=False, crm_attempts__gte=MAX_ATTEMPTS).order_by('pk')
+    for contact in exhausted.iterator(chunk_size=100):
+        job = client.find_job(contact)
+        if job:
+            mark_synced(contact, str(job.get('id', '')))
+            counts['found'] += 1
+        else:
+            counts['missing'] += 1
+            if not requeue:
+                continue
+            contact.crm_attempts = 0
+            contact.crm_next_attempt_at = None
+            counts['requeued'] += 1
+        contact.save(update_fields=SYNC_FIELDS)
+    return counts
@@ -0,0 +1,132 @@
+"""
+Bulk import of partner leads.
+
+Rows are checked in one pass with the ``ContactSerializer`` rules and
+precompiled patterns, without a serializer per row, and upserted on
+``email`` with one ``bulk_create``. New contacts are saved with
+``sent_to_crm=False`` and picked up by the ``sync_crm`` worker.
+"""
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import EmailValidator
+from django.db import transaction
+from rest_framework import serializers
+
+from api_models.models import Contact
+from api_models.serializers import clean_phone
+
+MAX_CONTACTS = 5000
+UPSERT_BATCH_SIZE = 1000
+UPDATE_FIELDS = ['name', 'phone', 'address', 'description']
+NAME_MAX_LENGTH = Contact._meta.get_field('name').max_length
+EMAIL_MAX_LENGTH = Contact._meta.get_field('email').max_length
+
+# ContactSerializer validates e-mails with the same validator, through the
+# serializer field of the model's EmailField, and additionally with its
+# uniqueness validator, which doesn't apply to an upsert.
+validate_email = EmailValidator()
+
+
+def get_text(row: dict, field: str) -> str:
+    value = row.get(field)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise serializers.ValidationError("Not a valid string.")
+    return value.strip()
+
+
+def clean_row(row: dict) -> Contact:
+    """
+    Build unsaved contact from a lead.
+
+    Raises:
+        serializers.ValidationError: Errors by field.
+    """
+    if not isinstance(row, dict):
+        raise serializers.ValidationError({'non_field_errors': ["Expected an object."]})
+    errors = {}
+    values = {}
+    for field in ('name', 'phone', 'email', 'address', 'description'):
+        try:
+            values[field] = get_text(row, field)
+        except serializers.ValidationError as exception:
+            errors[field] = exception.detail
+
+    name = values.get('name')
+    if 'name' not in errors and (not name or len(name) > NAME_MAX_LENGTH):
+        errors['name'] = ["Name must not exceed 70 characters and must not be empty"]
+    email = values.get('email')
+    if 'email' not in errors:
+        try:
+            validate_email(email)
+        except DjangoValidationError:
+            errors['email'] = ["Invalid email format"]
+        else:
+            if len(email) > EMAIL_MAX_LENGTH:
+                errors['email'] = [f"Email must not exceed {EMAIL_MAX_LENGTH} characters"]
+    if 'address' not in errors and not values.get('address'):
+        errors['address'] = ["Address is required"]
+    if values.get('phone') and 'phone' not in errors:
+        try:
+            values['phone'] = clean_phone(values['phone'])
+        except serializers.ValidationError as exception:
+            errors['phone'] = exception.detail
+
+    if errors:
+        raise serializers.ValidationError(errors)
+    return Contact(
+        name=name,
+        phone=values['phone'] or None,
+        email=email,
+        address=values['address'],
+        description=values['description'] or None,
+    )
+
+
+def clean_rows(rows: list) -> tuple[list[Contact], dict[int, dict]]:
+    """
+    Validate leads.
+
+    A lead repeating an earlier e-mail of the batch replaces it, as a
+    separate request would.
+
+    Args:
+        rows: Leads as sent by the partner.
+
+    Returns:
+        tuple[list[Contact], dict[int, dict]]: Unsaved contacts, and errors by row index.
+    """
+    contacts = {}
+    errors = {}
+    for index, row in enumerate(rows):
+        try:
+            contact = clean_row(row)
+        except serializers.ValidationError as exception:
+            errors[index] = exception.detail
+            continue
+        contacts.pop(contact.email, None)
+        contacts[contact.email] = contact
+    return list(contacts.values()), errors
+
+
+def upsert_contacts(contacts: list[Contact]) -> tuple[int, int]:
+    """
+    Insert new contacts and update existing ones by e-mail.
+
+    Existing contacts keep their CRM sync state.
+
+    Returns:
+        tuple[int, int]: Counts of created and updated contacts.
+    """
+    emails = [contact.email for contact in contacts]
+    with transaction.atomic():
+        existing = set(Contact.objects.filter(email__in=emails).values_list('email', flat=True))
+        Contact.objects.bulk_create(
+            contacts,
+            batch_size=UPSERT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['email'],
+            update_fields=UPDATE_FIELDS,
+        )
+    return len(contacts) - len(existing), len(existing)
@@ -0,0 +1,43 @@
+"""
+Command archiving old contacts and vacancy applications.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api_models.archival import archive_old_rows
+from api_models.models import Contact, VacancyApplication
+
+MODELS = {
+    'contacts': Contact,
+    'applications': VacancyApplication,
+}
+
+
+class Command(BaseCommand):
+    """
+    Move rows older than the retention period to gzipped JSON Lines files under ``ARCHIVE_ROOT``.
+    """
+    help = 'Archive old contacts and vacancy applications.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SUBMISSION_RETENTION_DAYS,
+                            help='Archive rows older than this many days.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows archived per batch.')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to wait between batches.')
+        parser.add_argument('--only', choices=sorted(MODELS), help='Archive only this kind of rows.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        for label, model in MODELS.items():
+            if options['only'] and options['only'] != label:
+                continue
+            total = 0
+            for archived in archive_old_rows(model, cutoff, options['batch_size']):
+                total += archived
+                time.sleep(options['sleep'])
+            self.stdout.write(f'Archived {total} {label} created before {cutoff:%Y-%m-%d}')
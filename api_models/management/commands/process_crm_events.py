@@ -0,0 +1,31 @@
+"""
+Worker command applying stored HouseCall Pro webhook events.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api_models.crm_events import process_events
+
+
+class Command(BaseCommand):
+    """
+    Apply stored CRM events to contacts in batches. Runs forever unless ``--once`` is passed.
+    """
+    help = 'Apply HouseCall Pro webhook events to contacts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Events applied per batch.')
+        parser.add_argument('--sleep', type=float, default=5.0, help='Seconds to wait when nothing is stored.')
+        parser.add_argument('--once', action='store_true', help='Exit when nothing is stored.')
+
+    def handle(self, *args, **options):
+        while True:
+            events, contacts = process_events(options['batch_size'])
+            if events:
+                self.stdout.write(f'Applied {events} events to {contacts} contacts')
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['sleep'])
@@ -0,0 +1,35 @@
+"""
+Command moving resumes from public media to the private storage.
+"""
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from api_models.models import VacancyApplication
+from assets.storage import get_private_storage
+
+
+class Command(BaseCommand):
+    """
+    Copy resumes stored under ``MEDIA_ROOT`` to the private storage and drop the public copies.
+    """
+    help = 'Move resumes from public media to the private storage.'
+
+    def handle(self, *args, **options):
+        private_storage = get_private_storage()
+        moved = missing = 0
+        applications = VacancyApplication.objects.exclude(resume='').exclude(resume__isnull=True)
+        for application in applications.only('pk', 'resume').iterator(chunk_size=200):
+            name = application.resume.name
+            if private_storage.is_content_addressed(name):
+                continue
+            if not default_storage.exists(name):
+                missing += 1
+                self.stderr.write(f'Missing {name} of application {application.pk}')
+                continue
+            with default_storage.open(name, 'rb') as file:
+                private_name = private_storage.save(name, file)
+            VacancyApplication.objects.filter(pk=application.pk).update(resume=private_name)
+            default_storage.delete(name)
+            moved += 1
+        self.stdout.write(f'Moved {moved} resumes, {missing} missing')
@@ -0,0 +1,25 @@
+"""
+Command settling contacts the CRM sync worker gave up on.
+"""
+
+from django.core.management.base import BaseCommand
+
+from api_models.crm_sync import reconcile
+from integrations.housecall import HouseCallClient
+
+
+class Command(BaseCommand):
+    """
+    Mark exhausted contacts found in HouseCall Pro as sent, optionally requeue the rest.
+    """
+    help = 'Reconcile contacts which failed to sync with HouseCall Pro.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requeue', action='store_true', help='Retry contacts not found in HouseCall Pro.')
+
+    def handle(self, *args, **options):
+        with HouseCallClient() as client:
+            counts = reconcile(client, requeue=options['requeue'])
+        self.stdout.write(
+            f"Found {counts['found']} contacts in CRM, {counts['missing']} missing, {counts['requeued']} requeued"
+        )
@@ -0,0 +1,36 @@
+"""
+Worker command sending contacts to HouseCall Pro.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api_models.crm_sync import sync_batch
+from integrations.housecall import HouseCallClient
+
+
+class Command(BaseCommand):
+    """
+    Send due contacts to HouseCall Pro in batches. Runs forever unless ``--once`` is passed.
+    """
+    help = 'Send unsynced contacts to HouseCall Pro.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Contacts leased per batch.')
+        parser.add_argument('--sleep', type=float, default=10.0, help='Seconds to wait when nothing is due.')
+        parser.add_argument('--once', action='store_true', help='Exit when nothing is due.')
+
+    def handle(self, *args, **options):
+        with HouseCallClient() as client:
+            while True:
+                sent, failed, retry_after = sync_batch(client, options['batch_size'])
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent} contacts, {failed} failed')
+                if retry_after:
+                    self.stderr.write(f'Rate limited, pausing for {retry_after:g}s')
+                    time.sleep(retry_after)
+                elif not (sent or failed):
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
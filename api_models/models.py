@@ -4,6 +4,7 @@ from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelatio
 from django.contrib.contenttypes.models import ContentType
 from ckeditor.fields import RichTextField
 from django.core.exceptions import ValidationError
+from assets.storage import get_private_storage
 
 
 class Promotion(models.Model):
@@ -157,6 +158,7 @@ class Brand(models.Model):
     logo = models.ImageField(upload_to='brands_images/', blank=True, null=True)
     description = models.TextField(max_length=300, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     faqs = GenericRelation('FAQ', related_query_name='brand')
 
     def save(self, *args, **kwargs):
@@ -267,6 +269,14 @@ class Contact(models.Model):
     sent_to_crm = models.BooleanField(default=False, help_text="Indicates if the contact was sent to CRM")
     status = models.CharField(max_length=20, choices=[('new', 'New'), ('processed', 'Processed'), ('closed', 'Closed')],
                               default='new', help_text="Status of the contact request")
+    crm_id = models.CharField(max_length=64, blank=True, help_text="ID of the record created in CRM")
+    crm_attempts = models.PositiveSmallIntegerField(default=0, help_text="Count of failed CRM sync attempts")
+    crm_next_attempt_at = models.DateTimeField(null=True, blank=True,
+                                               help_text="Date and time of the next CRM sync attempt")
+    crm_error = models.TextField(blank=True, help_text="Error of the last failed CRM sync attempt")
+    crm_synced_at = models.DateTimeField(null=True, blank=True, help_text="Date and time the contact was sent to CRM")
+    crm_status_at = models.DateTimeField(null=True, blank=True,
+                                         help_text="Date and time of the CRM event the status was taken from")
 
     def __str__(self):
         return f"{self.name} - {self.email}"
@@ -275,6 +285,28 @@ class Contact(models.Model):
         verbose_name = "Contact"
         verbose_name_plural = "Contacts"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['sent_to_crm', 'crm_next_attempt_at'], name='contact_crm_sync_idx'),
+            models.Index(fields=['created_at'], name='contact_created_idx'),
+        ]
+
+
+class CRMEvent(models.Model):
+    event_id = models.CharField(max_length=128, unique=True, help_text="Delivery ID, used to drop redelivered events")
+    event_type = models.CharField(max_length=64, help_text="Event name, e.g. job.completed")
+    crm_ids = models.JSONField(default=list, help_text="CRM IDs of the job the event is about")
+    payload = models.JSONField()
+    occurred_at = models.DateTimeField(help_text="Date and time the event happened in CRM")
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.event_type} - {self.event_id}"
+
+    class Meta:
+        verbose_name = "CRM Event"
+        verbose_name_plural = "CRM Events"
+        ordering = ['-received_at']
 
 
 class About(models.Model):
@@ -384,9 +416,14 @@ class VacancyApplication(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField()
     phone = models.CharField(max_length=20)
-    resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    resume = models.FileField(upload_to='resumes/', storage=get_private_storage, blank=True, null=True)
+    resume_sha256 = models.CharField(max_length=64, blank=True, db_index=True,
+                                     help_text="SHA-256 of the resume, used to spot repeated applications")
+    resume_text = models.TextField(blank=True, help_text="Text extracted from the resume")
     message = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    processed_at = models.DateTimeField(null=True, blank=True,
+                                        help_text="Date and time the resume was processed and HR notified")
 
     def __str__(self):
         return f"{self.name} - {self.vacancy.title}"
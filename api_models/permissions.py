@@ -0,0 +1,13 @@
+"""
+Permissions of api_models views.
+"""
+
+from rest_framework.permissions import BasePermission
+
+
+class CanImportContacts(BasePermission):
+    """
+    Allow users who may both add and change contacts, e.g. partner accounts authenticated by token.
+    """
+    def has_permission(self, request, view):
+        return request.user.has_perms(['api_models.add_contact', 'api_models.change_contact'])
@@ -0,0 +1,221 @@
+"""
+Resume uploads of vacancy applications.
+
+``ResumeUploadHandler`` streams the ``resume`` part of a multipart request
+to a temporary file in chunks, enforcing ``RESUME_MAX_UPLOAD_SIZE`` and
+checking the type by magic bytes as data arrives, and hashes it on the way,
+so the content-addressed storage moves the file in place without reading it
+again. Text extraction and the HR notification run in the outbox worker.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import re
+import zipfile
+from typing import Optional
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from api_models.models import VacancyApplication
+from outbox.services import enqueue_email
+
+RESUME_FIELD = 'resume'
+SIGNATURES = (
+    (b'%PDF-', 'application/pdf', '.pdf'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/msword', '.doc'),
+    (b'PK\x03\x04', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document', '.docx'),
+)
+SIGNATURE_LENGTH = max(len(signature) for signature, _, _ in SIGNATURES)
+TEXT_MAX_LENGTH = 100_000
+WHITESPACE_PATTERN = re.compile(r'\s+')
+DOCX_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+logger = logging.getLogger(__name__)
+
+
+def detect_type(head: bytes) -> Optional[tuple[str, str]]:
+    """
+    Get content type and extension of a resume by its first bytes.
+
+    Returns:
+        Optional[tuple[str, str]]: Content type and extension, ``None`` for unsupported files.
+    """
+    for signature, content_type, extension in SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    return None
+
+
+def rejected_upload(file_name: str, error: str) -> SimpleUploadedFile:
+    """
+    Get empty placeholder of a rejected file, reported by ``ResumeField``.
+    """
+    upload = SimpleUploadedFile(file_name or RESUME_FIELD, b'')
+    upload.upload_error = error
+    return upload
+
+
+class ResumeUploadHandler(FileUploadHandler):
+    """
+    Stream the resume to disk with size and type checks, other files are left to the next handlers.
+
+    Attributes:
+        max_size: Maximum resume size in bytes.
+    """
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = settings.RESUME_MAX_UPLOAD_SIZE
+        self.active = False
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name == RESUME_FIELD
+        if not self.active:
+            return
+        self.file = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset,
+                                          self.content_type_extra)
+        self.digest = hashlib.sha256()
+        self.head = b''
+        self.error = None
+
+    def reject(self, error: str) -> None:
+        self.error = error
+        self.discard()
+
+    def discard(self) -> None:
+        if getattr(self, 'file', None) is not None:
+            path = self.file.temporary_file_path()
+            self.file.close()
+            if os.path.exists(path):
+                os.remove(path)
+            self.file = None
+
+    def check_type(self) -> None:
+        detected = detect_type(self.head)
+        if detected is None:
+            self.reject('Unsupported file type. Upload a PDF, DOC or DOCX file.')
+            return
+        self.file.content_type, extension = detected
+        self.file.name = os.path.splitext(self.file.name)[0] + extension
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        if self.error:
+            return None
+        if start + len(raw_data) > self.max_size:
+            self.reject(f'File is too large, the maximum size is {self.max_size // (1024 * 1024)} MB.')
+            return None
+        if len(self.head) < SIGNATURE_LENGTH:
+            self.head += raw_data[:SIGNATURE_LENGTH - len(self.head)]
+            if len(self.head) == SIGNATURE_LENGTH:
+                self.check_type()
+                if self.error:
+                    return None
+        self.file.write(raw_data)
+        self.digest.update(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        if not self.error and len(self.head) < SIGNATURE_LENGTH:
+            self.check_type()
+        if self.error:
+            return rejected_upload(self.file_name, self.error)
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.digest.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        if self.active:
+            self.discard()
+
+
+def extract_pdf_text(data: bytes) -> str:
+    from pypdf import PdfReader
+
+    return '\n'.join(page.extract_text() or '' for page in PdfReader(io.BytesIO(data)).pages)
+
+
+def extract_docx_text(data: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        root = ElementTree.fromstring(archive.read('word/document.xml'))
+    return '\n'.join(
+        ''.join(node.text or '' for node in paragraph.iter(f'{DOCX_NAMESPACE}t'))
+        for paragraph in root.iter(f'{DOCX_NAMESPACE}p')
+    )
+
+
+EXTRACTORS = {
+    '.pdf': extract_pdf_text,
+    '.docx': extract_docx_text,
+}
+
+
+def extract_text(resume: FieldFile) -> str:
+    """
+    Get plain text of a stored resume, empty for formats without an extractor and for unreadable files.
+    """
+    extractor = EXTRACTORS.get(os.path.splitext(resume.name)[1].lower())
+    if extractor is None:
+        return ''
+    try:
+        with resume.open('rb') as file:
+            text = extractor(file.read())
+    except Exception:
+        logger.warning('Failed to extract text of %s', resume.name, exc_info=True)
+        return ''
+    return WHITESPACE_PATTERN.sub(' ', text).strip()[:TEXT_MAX_LENGTH]
+
+
+def get_notification(application: VacancyApplication) -> tuple[str, str]:
+    """
+    Get subject and body of the HR notification about an application.
+    """
+    subject = f"New Application for {application.vacancy.title}"
+    message = (
+        f"New application received:\n\n"
+        f"Vacancy: {application.vacancy.title}\n"
+        f"Name: {application.name}\n"
+        f"Email: {application.email}\n"
+        f"Phone: {application.phone}\n"
+        f"Message: {application.message}\n"
+    )
+    if application.resume:
+        message += "Resume: Attached (see admin panel for download)"
+    if application.resume_sha256:
+        duplicates = VacancyApplication.objects.filter(resume_sha256=application.resume_sha256) \
+            .exclude(pk=application.pk).count()
+        if duplicates:
+            message += f"\nThe same resume was sent with {duplicates} other applications"
+    return subject, message
+
+
+def process_application(payload: dict, connection=None) -> None:
+    """
+    Outbox handler extracting resume text and queueing the HR notification.
+
+    Args:
+        payload: ``application_id`` of the vacancy application.
+        connection: Mail connection of the outbox batch, unused.
+    """
+    application = VacancyApplication.objects.select_related('vacancy').filter(pk=payload['application_id']).first()
+    if application is None or application.processed_at:
+        return
+    if application.resume:
+        application.resume_text = extract_text(application.resume)
+    application.processed_at = timezone.now()
+    subject, message = get_notification(application)
+    with transaction.atomic():
+        application.save(update_fields=['resume_text', 'processed_at'])
+        enqueue_email(subject, message, settings.DEFAULT_FROM_EMAIL, [settings.HR_EMAIL], digest=True)
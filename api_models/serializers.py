@@ -1,7 +1,10 @@
+import re
+
 from rest_framework import serializers
 from .models import City, Location, Contact, Brand, BlogPost, About, CaseStudy, Product, BlogImage, \
     VacancyApplication, Vacancy, FAQ, Guarantee, Repair, Installation, CaseStudyImage, Promotion
 from integrations.google_translate import translate_text
+from assets.serializers import RenditionField
 
 
 class CityHeaderSerializer(serializers.ModelSerializer):
@@ -17,9 +20,10 @@ class CityHeaderSerializer(serializers.ModelSerializer):
 
 class BaseServiceHeaderSerializer(serializers.ModelSerializer):
     type = serializers.CharField(source='get_model_name', read_only=True)
+    icon_renditions = RenditionField('icon')
 
     class Meta:
-        fields = ['name', 'slug', 'icon', 'cart_description']
+        fields = ['name', 'slug', 'icon', 'icon_renditions', 'cart_description']
 
     def get_model_name(self, obj):
         return obj._meta.model_name
@@ -52,15 +56,19 @@ class PromotionSerializer(serializers.ModelSerializer):
 
 
 class RepairHeaderSerializer(serializers.ModelSerializer):
+    icon_renditions = RenditionField('icon')
+
     class Meta:
         model = Repair
-        fields = ['name', 'slug', 'icon']
+        fields = ['name', 'slug', 'icon', 'icon_renditions']
 
 
 class InstallationHeaderSerializer(serializers.ModelSerializer):
+    icon_renditions = RenditionField('icon')
+
     class Meta:
         model = Installation
-        fields = ['name', 'slug', 'icon']
+        fields = ['name', 'slug', 'icon', 'icon_renditions']
 
 
 class GuaranteeSerializer(serializers.ModelSerializer):
@@ -71,18 +79,24 @@ class GuaranteeSerializer(serializers.ModelSerializer):
 
 class RepairSerializer(serializers.ModelSerializer):
     cities = serializers.SlugRelatedField(many=True, read_only=True, slug_field='slug')
+    icon_renditions = RenditionField('icon')
+    image_renditions = RenditionField('image')
 
     class Meta:
         model = Repair
-        fields = ['id', 'name', 'slug', 'short_description', 'full_description', 'icon', 'image', 'created_at', 'cities']
+        fields = ['id', 'name', 'slug', 'short_description', 'full_description', 'icon', 'icon_renditions', 'image',
+                  'image_renditions', 'created_at', 'cities']
 
 
 class InstallationSerializer(serializers.ModelSerializer):
     cities = serializers.SlugRelatedField(many=True, read_only=True, slug_field='slug')
+    icon_renditions = RenditionField('icon')
+    image_renditions = RenditionField('image')
 
     class Meta:
         model = Installation
-        fields = ['id', 'name', 'slug', 'short_description', 'full_description', 'icon', 'image', 'created_at', 'cities']
+        fields = ['id', 'name', 'slug', 'short_description', 'full_description', 'icon', 'icon_renditions', 'image',
+                  'image_renditions', 'created_at', 'cities']
 
 
 class LocationSerializer(serializers.ModelSerializer):
@@ -104,6 +118,22 @@ class CitySerializer(serializers.ModelSerializer):
                   'slug', 'latitude', 'longitude', 'place_id']
 
 
+PHONE_PATTERN = re.compile(r'^\+1\s*[\(\.]*\d{3}[\)\.\-]*\s*\d{3}[\.\-]*\s*\d{4}$')
+NON_DIGITS_PATTERN = re.compile(r'\D')
+
+
+def clean_phone(value):
+    """
+    Normalize phone to ``+1 (123) 456-7890``, raising ``ValidationError`` for invalid numbers.
+    """
+    if not PHONE_PATTERN.match(value):
+        raise serializers.ValidationError("Invalid phone format. Example: +1 (123) 456-7890")
+    digits = NON_DIGITS_PATTERN.sub('', value)
+    if len(digits) != 11 or not digits.startswith('1'):
+        raise serializers.ValidationError("Phone number must contain 10 digits after +1")
+    return f"+1 ({digits[1:4]}) {digits[4:7]}-{digits[7:11]}"
+
+
 class ContactSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contact
@@ -116,14 +146,7 @@ class ContactSerializer(serializers.ModelSerializer):
 
     def validate_phone(self, value):
         if value:
-            import re
-            pattern = r'^\+1\s*[\(\.]*\d{3}[\)\.\-]*\s*\d{3}[\.\-]*\s*\d{4}$'
-            if not re.match(pattern, value):
-                raise serializers.ValidationError("Invalid phone format. Example: +1 (123) 456-7890")
-            digits = re.sub(r'\D', '', value)
-            if len(digits) != 11 or not digits.startswith('1'):
-                raise serializers.ValidationError("Phone number must contain 10 digits after +1")
-            return f"+1 ({digits[1:4]}) {digits[4:7]}-{digits[7:11]}"
+            return clean_phone(value)
         return value
 
     def validate_email(self, value):
@@ -144,16 +167,19 @@ class ContactSerializer(serializers.ModelSerializer):
 
 class ProductSerializer(serializers.ModelSerializer):
     brand = serializers.SlugRelatedField(slug_field='slug', queryset=Brand.objects.all())
+    image_renditions = RenditionField('image')
 
     class Meta:
         model = Product
-        fields = ['id', 'brand', 'name', 'slug', 'description', 'created_at', 'updated_at', 'image']
+        fields = ['id', 'brand', 'name', 'slug', 'description', 'created_at', 'updated_at', 'image', 'image_renditions']
 
 
 class BlogImageSerializer(serializers.ModelSerializer):
+    image_renditions = RenditionField('image')
+
     class Meta:
         model = BlogImage
-        fields = ['id', 'image', 'caption', 'created_at']
+        fields = ['id', 'image', 'image_renditions', 'caption', 'created_at']
 
 
 class BlogPostSerializer(serializers.ModelSerializer):
@@ -198,6 +224,7 @@ class FAQSerializer(serializers.ModelSerializer):
 
 class BrandSerializer(serializers.ModelSerializer):
     products = ProductSerializer(many=True, read_only=True)
+    logo_renditions = RenditionField('logo')
     translated_name = serializers.SerializerMethodField(
         help_text="Translated brand name based on the requested language"
     )
@@ -215,13 +242,16 @@ class BrandSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Brand
-        fields = ['id', 'slug', 'translated_name', 'translated_description', 'logo', 'created_at', 'products']
+        fields = ['id', 'slug', 'translated_name', 'translated_description', 'logo', 'logo_renditions', 'created_at',
+                  'products']
 
 
 class BrandHeaderSerializer(serializers.ModelSerializer):
+    logo_renditions = RenditionField('logo')
+
     class Meta:
         model = Brand
-        fields = ['name', 'slug', 'logo']
+        fields = ['name', 'slug', 'logo', 'logo_renditions']
 
 
 class AboutSerializer(serializers.ModelSerializer):
@@ -242,17 +272,20 @@ class AboutSerializer(serializers.ModelSerializer):
 
 
 class CaseStudyImageSerializer(serializers.ModelSerializer):
+    image_renditions = RenditionField('image')
+
     class Meta:
         model = CaseStudyImage
-        fields = ['id', 'image', 'caption', 'created_at']
+        fields = ['id', 'image', 'image_renditions', 'caption', 'created_at']
 
 
 class CaseStudySerializer(serializers.ModelSerializer):
     images = CaseStudyImageSerializer(many=True, read_only=True)
+    image_renditions = RenditionField('image')
 
     class Meta:
         model = CaseStudy
-        fields = ['id', 'title', 'image', 'slug', 'short_description', 'description', 'city', 'created_at', 'video_on_youtube',
+        fields = ['id', 'title', 'image', 'image_renditions', 'slug', 'short_description', 'description', 'city', 'created_at', 'video_on_youtube',
                   'images']
 
 class VacancySerializer(serializers.ModelSerializer):
@@ -264,8 +297,20 @@ class VacancySerializer(serializers.ModelSerializer):
                   'is_active']
 
 
+class ResumeField(serializers.FileField):
+    """
+    File field reporting files rejected by ``ResumeUploadHandler`` while streaming.
+    """
+    def to_internal_value(self, data):
+        error = getattr(data, 'upload_error', None)
+        if error:
+            raise serializers.ValidationError(error)
+        return super().to_internal_value(data)
+
+
 class VacancyApplicationSerializer(serializers.ModelSerializer):
     vacancy = serializers.SlugRelatedField(slug_field='slug', queryset=Vacancy.objects.all())
+    resume = ResumeField(required=False, allow_null=True)
 
     class Meta:
         model = VacancyApplication
@@ -1,3 +1,358 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+import requests
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api_models.crm_events import process_events
+from api_models.lead_import import clean_rows
+from api_models.serializers import ContactSerializer
+from api_models.crm_sync import MAX_ATTEMPTS, claim_contacts, reconcile, sync_batch
+from api_models.models import Contact, CRMEvent, Vacancy, VacancyApplication
+from outbox.models import OutboxMessage
+from integrations.housecall import RateLimited, get_job_reference
+
+
+class FakeHouseCallClient:
+    def __init__(self, fail_with=None, jobs=()):
+        self.fail_with = fail_with
+        self.jobs = {email: {'id': f'job_{email}', 'tags': []} for email in jobs}
+        self.created = []
+
+    def create_job(self, contact):
+        if self.fail_with:
+            raise self.fail_with
+        self.created.append(contact.email)
+        return {'id': f'job_{contact.pk}'}
+
+    def find_job(self, contact):
+        job = self.jobs.get(contact.email)
+        return job and {**job, 'tags': [get_job_reference(contact)]}
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+def create_contact(email='lead@example.com', **kwargs):
+    return Contact.objects.create(name='Lead', email=email, address='1 Main St', **kwargs)
+
+
+class ContactCreateTests(TestCase):
+    def test_contact_is_saved_without_calling_crm(self):
+        response = self.client.post(reverse('contact'), {'name': 'Lead', 'email': 'lead@example.com',
+                                                              'address': '1 Main St'}, secure=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Contact.objects.get().sent_to_crm)
+
+
+class ContactBulkTests(TestCase):
+    def setUp(self):
+        partner = get_user_model().objects.create_user('partner')
+        partner.user_permissions.add(*Permission.objects.filter(codename__in=['add_contact', 'change_contact']))
+        self.token = Token.objects.create(user=partner)
+
+    def post_contacts(self, contacts, token=True):
+        headers = {'Authorization': f'Token {self.token.key}'} if token else {}
+        return self.client.post(reverse('contact-bulk'), {'contacts': contacts}, content_type='application/json',
+                                secure=True, headers=headers)
+
+    def test_anonymous_import_is_rejected(self):
+        create_contact('old@example.com')
+        response = self.post_contacts([{'name': 'Renamed', 'email': 'old@example.com', 'address': '2 Main St'}],
+                                      token=False)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(Contact.objects.get().name, 'Lead')
+
+    def test_emails_are_checked_as_by_contact_serializer(self):
+        for email in ('lead@example.com', 'not-an-email', 'lead@', 'lead@localhost'):
+            row = {'name': 'Lead', 'email': email, 'address': '1 Main St'}
+            _, errors = clean_rows([row])
+            self.assertEqual(not errors, ContactSerializer(data=row).is_valid(), email)
+
+    def test_leads_are_upserted_by_email(self):
+        create_contact('old@example.com', sent_to_crm=True)
+        leads = [{'name': f'Lead {index}', 'email': f'lead{index}@example.com', 'address': '1 Main St',
+                  'phone': '+1 123.456.7890'} for index in range(500)]
+        leads.append({'name': 'Renamed', 'email': 'old@example.com', 'address': '2 Main St'})
+
+        response = self.post_contacts(leads)
+        self.assertEqual(response.json(), {'created': 500, 'updated': 1})
+
+        old = Contact.objects.get(email='old@example.com')
+        self.assertEqual((old.name, old.sent_to_crm), ('Renamed', True))
+        self.assertEqual(Contact.objects.get(email='lead0@example.com').phone, '+1 (123) 456-7890')
+        self.assertEqual(len(claim_contacts(1000)), 500)
+
+    def test_invalid_batch_is_rejected(self):
+        response = self.post_contacts([
+            {'name': 'Lead', 'email': 'lead@example.com', 'address': '1 Main St'},
+            {'name': '', 'email': 'not-an-email', 'address': '1 Main St', 'phone': '123'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']['1']), {'name', 'email', 'phone'})
+        self.assertFalse(Contact.objects.exists())
+
+
+class CrmSyncTests(TestCase):
+    def test_batch_is_sent(self):
+        contacts = [create_contact(f'lead{index}@example.com') for index in range(3)]
+        client = FakeHouseCallClient()
+        self.assertEqual(sync_batch(client, 10), (3, 0, None))
+
+        contact = Contact.objects.get(pk=contacts[0].pk)
+        self.assertTrue(contact.sent_to_crm)
+        self.assertEqual(contact.crm_id, f'job_{contact.pk}')
+        self.assertEqual(sync_batch(client, 10), (0, 0, None))
+
+    def test_leased_contacts_are_not_claimed_again(self):
+        create_contact()
+        self.assertEqual(len(claim_contacts(10)), 1)
+        self.assertEqual(claim_contacts(10), [])
+
+    def test_transient_failure_is_retried_later(self):
+        create_contact()
+        self.assertEqual(sync_batch(FakeHouseCallClient(fail_with=requests.Timeout('timed out')), 10), (0, 1, None))
+
+        contact = Contact.objects.get()
+        self.assertEqual((contact.sent_to_crm, contact.crm_attempts), (False, 1))
+        self.assertGreater(contact.crm_next_attempt_at, timezone.now())
+
+    def test_retry_finds_job_created_by_lost_response(self):
+        create_contact(crm_attempts=1)
+        client = FakeHouseCallClient(jobs=['lead@example.com'])
+        sync_batch(client, 10)
+        self.assertEqual(client.created, [])
+        self.assertEqual(Contact.objects.get().crm_id, 'job_lead@example.com')
+
+    def test_retry_without_job_creates_it(self):
+        contact = create_contact(crm_attempts=1)
+        client = FakeHouseCallClient()
+        sync_batch(client, 10)
+        self.assertEqual(client.created, ['lead@example.com'])
+        self.assertEqual(Contact.objects.get().crm_id, f'job_{contact.pk}')
+
+    def test_invalid_contact_is_not_retried(self):
+        create_contact()
+        sync_batch(FakeHouseCallClient(fail_with=http_error(422)), 10)
+        self.assertEqual(Contact.objects.get().crm_attempts, MAX_ATTEMPTS)
+
+    def test_other_client_errors_are_retried(self):
+        create_contact()
+        sync_batch(FakeHouseCallClient(fail_with=http_error(401)), 10)
+        contact = Contact.objects.get()
+        self.assertEqual((contact.crm_attempts, contact.crm_error), (1, 'HTTP 401: '))
+
+    def test_expired_lease_finds_job_created_by_dead_worker(self):
+        create_contact()
+        claim_contacts(10)
+        Contact.objects.update(crm_next_attempt_at=timezone.now())
+        client = FakeHouseCallClient(jobs=['lead@example.com'])
+        sync_batch(client, 10)
+        self.assertEqual(client.created, [])
+        self.assertEqual(Contact.objects.get().crm_id, 'job_lead@example.com')
+
+    def test_rate_limit_releases_batch_without_attempt(self):
+        create_contact()
+        self.assertEqual(sync_batch(FakeHouseCallClient(fail_with=RateLimited(30)), 10), (0, 0, 30))
+
+        contact = Contact.objects.get()
+        self.assertEqual(contact.crm_attempts, 0)
+        self.assertLess(contact.crm_next_attempt_at, timezone.now() + timedelta(seconds=31))
+
+    def test_reconcile(self):
+        create_contact('found@example.com', crm_attempts=MAX_ATTEMPTS)
+        create_contact('missing@example.com', crm_attempts=MAX_ATTEMPTS)
+        counts = reconcile(FakeHouseCallClient(jobs=['found@example.com']), requeue=True)
+
+        self.assertEqual(counts, {'found': 1, 'missing': 1, 'requeued': 1})
+        self.assertTrue(Contact.objects.get(email='found@example.com').sent_to_crm)
+        self.assertEqual(Contact.objects.get(email='missing@example.com').crm_attempts, 0)
+
+
+@override_settings(HOUSECALL_WEBHOOK_SECRET='secret')
+class CrmWebhookTests(TestCase):
+    def post_event(self, event, job_id='job_1', event_time='2026-01-01T10:00:00Z', secret='secret', **extra):
+        body = json.dumps({'event': event, 'event_time': event_time, 'job': {'id': job_id}, **extra}).encode()
+        timestamp = str(int(time.time()))
+        signature = hmac.new(secret.encode(), timestamp.encode() + b'.' + body, hashlib.sha256).hexdigest()
+        return self.client.post(reverse('housecall-webhook'), body, content_type='application/json', secure=True,
+                                headers={'Api-Timestamp': timestamp, 'Api-Signature': signature})
+
+    def test_invalid_signature_is_rejected(self):
+        self.assertEqual(self.post_event('job.completed', secret='wrong').status_code, 403)
+        self.assertFalse(CRMEvent.objects.exists())
+
+    def test_redelivered_event_is_stored_once(self):
+        for _ in range(2):
+            self.assertEqual(self.post_event('job.completed', id='evt_1').status_code, 202)
+        self.assertEqual(CRMEvent.objects.count(), 1)
+
+    def test_events_are_coalesced_per_contact(self):
+        first = create_contact('first@example.com', crm_id='job_1', sent_to_crm=True)
+        second = create_contact('second@example.com', crm_id='job_2', sent_to_crm=True)
+        self.post_event('job.completed', event_time='2026-01-01T12:00:00Z')
+        self.post_event('job.started', event_time='2026-01-01T11:00:00Z')
+        self.post_event('job.scheduled', job_id='job_2')
+        self.post_event('job.created', job_id='job_3')
+
+        with self.assertNumQueries(8):
+            self.assertEqual(process_events(100), (4, 2))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, second.status), ('closed', 'processed'))
+        self.assertEqual(process_events(100), (0, 0))
+
+    def test_stale_event_does_not_roll_status_back(self):
+        contact = create_contact(crm_id='job_1', sent_to_crm=True)
+        self.post_event('job.completed', event_time='2026-01-01T12:00:00Z')
+        process_events(100)
+        self.post_event('job.started', event_time='2026-01-01T11:00:00Z')
+        process_events(100)
+        contact.refresh_from_db()
+        self.assertEqual(contact.status, 'closed')
+
+
+def make_docx(text):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml', (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+            f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>'
+        ))
+    return buffer.getvalue()
+
+
+@override_settings(HR_EMAIL='hr@example.com', RESUME_MAX_UPLOAD_SIZE=100 * 1024)
+class ResumeUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=f'{media_root.name}/public',
+                                              PRIVATE_MEDIA_ROOT=f'{media_root.name}/private')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.vacancy = Vacancy.objects.create(title='Technician')
+
+    def apply(self, name, content, email='applicant@example.com'):
+        return self.client.post(reverse('vacancy-application-list'), {
+            'vacancy': self.vacancy.slug, 'name': 'Applicant', 'email': email, 'phone': '+1 123 456 7890',
+            'resume': SimpleUploadedFile(name, content),
+        }, secure=True)
+
+    def test_resume_is_hashed_and_processed_in_background(self):
+        content = make_docx('Five years of HVAC repair')
+        response = self.apply('cv.bin', content)
+        self.assertEqual(response.status_code, 201, response.content)
+
+        application = VacancyApplication.objects.get()
+        self.assertEqual(application.resume_sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual(application.resume.name, 'private/{0}/{1}/{2}.docx'.format(
+            application.resume_sha256[:2], application.resume_sha256[2:4], application.resume_sha256))
+        self.assertTrue(application.resume.url.startswith('/api/protected-media/private/'))
+        self.assertEqual(OutboxMessage.objects.get().kind, 'vacancy_application')
+        self.assertEqual(mail.outbox, [])
+
+        self.apply('cv.docx', content, email='again@example.com')
+        call_command('process_outbox', '--once', stdout=StringIO())
+        application.refresh_from_db()
+        self.assertEqual(application.resume_text, 'Five years of HVAC repair')
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn('The same resume was sent with 1 other applications', mail.outbox[0].body)
+
+    def test_unsupported_type_is_rejected(self):
+        response = self.apply('cv.pdf', b'MZ\x90\x00 not a document')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unsupported file type', str(response.json()))
+        self.assertFalse(VacancyApplication.objects.exists())
+
+    def test_oversized_resume_is_rejected(self):
+        response = self.apply('cv.pdf', b'%PDF-1.7' + b'0' * 200 * 1024)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('File is too large', str(response.json()))
+
+    def test_applications_are_not_public(self):
+        self.assertEqual(self.client.get(reverse('vacancy-application-list'), secure=True).status_code, 403)
+
+    def test_public_resumes_are_moved(self):
+        application = VacancyApplication.objects.create(vacancy=self.vacancy, name='Applicant',
+                                                        email='applicant@example.com', phone='+1 123 456 7890')
+        public_name = default_storage.save('resumes/cv.pdf', ContentFile(b'%PDF-1.7 resume'))
+        VacancyApplication.objects.filter(pk=application.pk).update(resume=public_name)
+
+        call_command('protect_resumes', stdout=StringIO())
+        application.refresh_from_db()
+        self.assertTrue(application.resume.name.startswith('private/'))
+        self.assertEqual(application.resume.read(), b'%PDF-1.7 resume')
+        self.assertFalse(default_storage.exists(public_name))
+
+
+class ArchiveSubmissionsTests(TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.archive_root = Path(root.name) / 'archive'
+        settings_override = override_settings(ARCHIVE_ROOT=self.archive_root, PRIVATE_MEDIA_ROOT=f'{root.name}/private')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def read_archive(self, table):
+        rows = []
+        for path in sorted((self.archive_root / table).glob('*.jsonl.gz')):
+            with gzip.open(path, 'rt') as file:
+                rows.extend(json.loads(line) for line in file)
+        return rows
+
+    def test_old_rows_are_archived_in_batches(self):
+        old = timezone.now() - timedelta(days=400)
+        for index in range(5):
+            create_contact(f'old{index}@example.com', sent_to_crm=True)
+        create_contact('pending@example.com')
+        create_contact('new@example.com', sent_to_crm=True)
+        Contact.objects.exclude(email='new@example.com').update(created_at=old)
+
+        call_command('archive_submissions', '--only', 'contacts', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(set(Contact.objects.values_list('email', flat=True)),
+                         {'pending@example.com', 'new@example.com'})
+        self.assertEqual(len(list((self.archive_root / 'api_models_contact').glob('*.jsonl.gz'))), 3)
+        self.assertEqual(sorted(row['fields']['email'] for row in self.read_archive('api_models_contact')),
+                         [f'old{index}@example.com' for index in range(5)])
+
+    def test_resumes_are_moved_to_archive(self):
+        vacancy = Vacancy.objects.create(title='Technician')
+        application = VacancyApplication.objects.create(
+            vacancy=vacancy, name='Applicant', email='applicant@example.com', phone='+1 123 456 7890',
+            resume=ContentFile(b'%PDF-1.7 resume', name='cv.pdf'),
+        )
+        resume_name = application.resume.name
+        VacancyApplication.objects.update(created_at=timezone.now() - timedelta(days=400))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('archive_submissions', '--only', 'applications', stdout=StringIO())
+
+        self.assertFalse(VacancyApplication.objects.exists())
+        [row] = self.read_archive('api_models_vacancyapplication')
+        self.assertEqual((self.archive_root / row['archived_resume']).read_bytes(), b'%PDF-1.7 resume')
+        self.assertFalse(application.resume.storage.exists(resume_name))
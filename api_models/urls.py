@@ -5,7 +5,7 @@ from .views import (
     CaseStudyViewSet, ProductViewSet, VacancyViewSet, VacancyApplicationViewSet,
     send_email_view, send_to_housecall, FAQViewSet , BrandHeaderViewSet, GuaranteeViewSet,
     RepairHeaderViewSet, InstallationHeaderViewSet, ServicesByCityViewSet, PromotionViewSet,
-    CombinedServiceHeaderViewSet, ServicesByCityHeaderSlugViewSet, CityHeaderViewSet
+    CombinedServiceHeaderViewSet, ServicesByCityHeaderSlugViewSet, CityHeaderViewSet, HouseCallWebhookView
 )
 
 urlpatterns = [
@@ -48,6 +48,7 @@ urlpatterns = [
 
     # Contact
     path('contact/', ContactViewSet.as_view({'get': 'list', 'post': 'create'}), name='contact'),
+    path('contact/bulk/', ContactViewSet.as_view({'post': 'bulk'}), name='contact-bulk'),
 
     # Cities
     path('cities/', CityViewSet.as_view({'get': 'list'}), name='city-list'),
@@ -79,4 +80,7 @@ urlpatterns = [
     # Custom views
     path('send-email/', send_email_view, name='send_email'),
     path('send-to-housecall/', send_to_housecall, name='send_to_housecall'),
+
+    # Webhooks
+    path('webhooks/housecall/', HouseCallWebhookView.as_view(), name='housecall-webhook'),
 ]
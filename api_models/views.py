@@ -4,8 +4,13 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from django.conf import settings
 from django.core.mail import send_mail
+from django.db import transaction
 from django.http import HttpResponse
 from decouple import config
 import requests
@@ -23,7 +28,12 @@ from .serializers import (
     FAQSerializer, BrandHeaderSerializer, GuaranteeSerializer, RepairCombinedServiceHeaderSerializer
 )
 from .paginations import FAQPagination
-from integrations.housecall import send_to_housecall_pro
+from outbox.services import enqueue
+from throttling.throttles import SubmissionThrottleMixin
+from .resumes import ResumeUploadHandler
+from .permissions import CanImportContacts
+from .lead_import import MAX_CONTACTS, clean_rows, upsert_contacts
+from .crm_events import SIGNATURE_HEADER, TIMESTAMP_HEADER, InvalidEvent, parse_event, store_event, verify_signature
 
 logger = logging.getLogger(__name__)
 
@@ -124,7 +134,7 @@ class CaseStudyPagination(PageNumberPagination):
 
 
 class BlogPostViewSet(viewsets.ModelViewSet):
-    queryset = BlogPost.objects.all()
+    queryset = BlogPost.objects.prefetch_related('images')
     serializer_class = BlogPostSerializer
     lookup_field = 'slug'
     pagination_class = BlogPostPagination
@@ -178,29 +188,66 @@ class InstallationViewSet(viewsets.ModelViewSet):
     lookup_field = 'slug'
 
 
-class ContactViewSet(viewsets.ModelViewSet):
+class ContactViewSet(SubmissionThrottleMixin, viewsets.ModelViewSet):
     queryset = Contact.objects.all()
     serializer_class = ContactSerializer
     http_method_names = ['post']
+    # Partners authenticate the bulk import with a token of their user.
+    authentication_classes = [TokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+    def get_permissions(self):
+        if self.action == 'bulk':
+            return [CanImportContacts()]
+        return super().get_permissions()
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            contact = serializer.save()
-            try:
-                send_to_housecall_pro(contact)
-                contact.sent_to_crm = True
-                contact.save()
-                return Response({"message": "Application successfully sent to HouseCall Pro"},
-                                status=status.HTTP_201_CREATED)
-            except Exception as e:
-                return Response({"error": f"Error sending to CRM: {str(e)}"},
-                                status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            # Sent to HouseCall Pro by the sync_crm worker.
+            serializer.save()
+            return Response({"message": "Application successfully received"}, status=status.HTTP_201_CREATED)
         return Response({"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
+    def bulk(self, request, *args, **kwargs):
+        """
+        Upsert a batch of partner leads by email. The batch is rejected as a whole if any lead is invalid.
+        Requires permissions to add and change contacts.
+        """
+        rows = request.data.get('contacts') if isinstance(request.data, dict) else None
+        if not isinstance(rows, list) or not rows:
+            return Response({"errors": {"contacts": ["Expected a non-empty list."]}},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > MAX_CONTACTS:
+            return Response({"errors": {"contacts": [f"Ensure this list has at most {MAX_CONTACTS} elements."]}},
+                            status=status.HTTP_400_BAD_REQUEST)
+        contacts, errors = clean_rows(rows)
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        created, updated = upsert_contacts(contacts)
+        return Response({"created": created, "updated": updated}, status=status.HTTP_201_CREATED)
+
+
+class HouseCallWebhookView(APIView):
+    """
+    Receive HouseCall Pro webhook events. Events are only stored here, contacts
+    are updated by the process_crm_events worker.
+    """
+    authentication_classes = []
+
+    def post(self, request):
+        body = request.body
+        if not verify_signature(body, request.headers.get(TIMESTAMP_HEADER), request.headers.get(SIGNATURE_HEADER)):
+            return Response({"error": "Invalid signature"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            event = parse_event(body)
+        except InvalidEvent as e:
+            return Response({"error": f"Invalid event: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+        store_event(event)
+        return Response(status=status.HTTP_202_ACCEPTED)
+
 
 class BrandViewSet(viewsets.ModelViewSet):
-    queryset = Brand.objects.all()
+    queryset = Brand.objects.prefetch_related('products')
     serializer_class = BrandSerializer
     lookup_field = 'slug'
 
@@ -257,7 +304,7 @@ class AboutViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 class CaseStudyViewSet(viewsets.ModelViewSet):
-    queryset = CaseStudy.objects.all()
+    queryset = CaseStudy.objects.prefetch_related('images')
     serializer_class = CaseStudySerializer
     lookup_field = 'slug'
     pagination_class = CaseStudyPagination
@@ -299,41 +346,36 @@ class FAQViewSet(viewsets.ModelViewSet):
             serializer.save()
 
 
-class VacancyApplicationViewSet(viewsets.ModelViewSet):
+class VacancyApplicationViewSet(SubmissionThrottleMixin, viewsets.ModelViewSet):
     queryset = VacancyApplication.objects.all()
     serializer_class = VacancyApplicationSerializer
     swagger_fake_view = True
 
+    def get_permissions(self):
+        # Applications carry personal data and resumes, only submitting them is public.
+        if self.action == 'create':
+            return [AllowAny()]
+        return [IsAdminUser()]
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Stream resumes with size and type checks, before the default handlers buffer them.
+        request.upload_handlers.insert(0, ResumeUploadHandler(request))
+        return super().initialize_request(request, *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-
-        vacancy = serializer.validated_data['vacancy']
-        subject = f"New Application for {vacancy.title}"
-        message = (
-            f"New application received:\n\n"
-            f"Vacancy: {vacancy.title}\n"
-            f"Name: {serializer.validated_data['name']}\n"
-            f"Email: {serializer.validated_data['email']}\n"
-            f"Phone: {serializer.validated_data['phone']}\n"
-            f"Message: {serializer.validated_data['message']}\n"
-        )
-        if serializer.validated_data.get('resume'):
-            message += "Resume: Attached (see admin panel for download)"
-
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [settings.HR_EMAIL],
-            fail_silently=False,
-        )
+
+        with transaction.atomic():
+            self.perform_create(serializer)
+            # Resume text extraction and the HR notification run in the outbox worker.
+            enqueue('vacancy_application', {'application_id': serializer.instance.pk})
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def perform_create(self, serializer):
-        serializer.save()
+        resume = serializer.validated_data.get('resume')
+        serializer.save(resume_sha256=getattr(resume, 'sha256', ''))
 
 
 def send_email_view(request):
@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from assets.models import ImageRendition, StoredBlob
+
+
+@admin.register(ImageRendition)
+class ImageRenditionAdmin(admin.ModelAdmin):
+    list_display = ('source', 'status', 'width', 'height', 'attempts', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('source',)
+    readonly_fields = ('placeholder', 'variants', 'error', 'claimed_at', 'created_at', 'updated_at')
+
+
+@admin.register(StoredBlob)
+class StoredBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'refcount', 'created_at')
+    search_fields = ('name',)
+    readonly_fields = ('name', 'size', 'refcount', 'created_at')
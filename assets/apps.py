@@ -0,0 +1,25 @@
+"""
+Assets app config.
+"""
+
+from django.apps import AppConfig
+
+
+class AssetsConfig(AppConfig):
+    """
+    Assets app config.
+
+    Attributes:
+        default_auto_field: Default auto-created primary key field.
+        name: App name.
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'assets'
+
+    def ready(self) -> None:
+        """
+        Connect signals queueing image renditions and releasing content-addressed files.
+        """
+        from .signals import connect_file_signals, connect_rendition_signals
+        connect_rendition_signals()
+        connect_file_signals()
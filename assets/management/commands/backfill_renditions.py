@@ -0,0 +1,80 @@
+"""
+Command rendering renditions for already uploaded images.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from assets.renditions import (
+    claim_batch, enqueue_sources, iter_image_names, release_variants, render_image, store_result,
+)
+
+
+def _render(source: str) -> tuple[str, dict | None, list[tuple[str, int]], str]:
+    """
+    Render image in a pool process, returning errors instead of raising them.
+
+    Variant files are only written, their names and sizes are returned for the
+    main process to reference, so workers never use the database connection
+    they inherit on fork.
+    """
+    written = []
+
+    def save(name: str, content: ContentFile) -> str:
+        written_name = default_storage.write(name, content)
+        written.append((written_name, content.size))
+        return written_name
+
+    try:
+        return source, render_image(source, save), written, ''
+    except Exception as exception:
+        return source, None, [], f'{type(exception).__name__}: {exception}'
+
+
+class Command(BaseCommand):
+    """
+    Queue every image referenced by models and render the queue with a process pool.
+
+    Rendering is CPU bound, so processes are used instead of threads. Workers
+    only write files, database writes including file references stay in the
+    main process.
+    """
+    help = 'Queue and render renditions for all existing images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Number of worker processes.')
+        parser.add_argument('--batch-size', type=int, default=200, help='Renditions claimed per iteration.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        names: list[str] = []
+        for name in iter_image_names():
+            names.append(name)
+            if len(names) >= batch_size:
+                enqueue_sources(names)
+                names.clear()
+        enqueue_sources(names)
+
+        rendered = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            while batch := claim_batch(batch_size):
+                renditions = {rendition.source: rendition for rendition in batch}
+                for source, result, written, error in pool.map(_render, renditions):
+                    rendition = renditions[source]
+                    previous = rendition.variants
+                    with transaction.atomic():
+                        for name, size in written:
+                            default_storage.add_reference(name, size)
+                        store_result(rendition, result, error)
+                    if result is None:
+                        failed += 1
+                        self.stderr.write(f'Failed {source}: {error}')
+                    else:
+                        rendered += 1
+                        release_variants(previous)
+
+        self.stdout.write(self.style.SUCCESS(f'Rendered {rendered} images, {failed} failed.'))
@@ -0,0 +1,74 @@
+"""
+Command reporting or deleting media files not referenced by any model.
+"""
+
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from assets.models import ImageRendition
+from assets.orphans import ReferenceSet, collect_references, delete_orphans, find_orphans
+
+
+class Command(BaseCommand):
+    """
+    Report or delete unreferenced files in ``MEDIA_ROOT`` older than a grace period.
+
+    With ``--state`` the reference set and walk checkpoint are kept in the given
+    file, and an interrupted run can be continued with ``--resume``.
+    """
+    help = 'Report or delete media files not referenced by any model.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help='Delete orphaned files instead of reporting.')
+        parser.add_argument('--grace-hours', type=float, default=24.0,
+                            help='Ignore files and renditions modified within this period.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows and files processed per batch.')
+        parser.add_argument('--state', type=Path, help='State file for resumable runs.')
+        parser.add_argument('--resume', action='store_true', help='Continue an interrupted run from --state.')
+
+    def handle(self, *args, **options):
+        if options['resume'] and not options['state']:
+            raise CommandError('--resume requires --state.')
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            refs = ReferenceSet(options['state'] or Path(tmp_dir) / 'refs.sqlite3')
+            try:
+                self.collect(refs, options)
+            finally:
+                refs.close()
+
+    def collect(self, refs: ReferenceSet, options: dict) -> None:
+        batch_size = options['batch_size']
+        grace_seconds = options['grace_hours'] * 3600
+
+        if not (options['resume'] and refs.get_meta('collected')):
+            refs.connection.execute('DELETE FROM refs')
+            refs.connection.execute('DELETE FROM meta')
+            dropped = 0
+            for stale_sources in collect_references(refs, grace_seconds, batch_size):
+                if options['delete'] and stale_sources:
+                    dropped += ImageRendition.objects.filter(source__in=stale_sources).delete()[0]
+            if dropped:
+                self.stdout.write(f'Dropped {dropped} renditions of unreferenced images.')
+            refs.set_meta('collected', '1')
+
+        checkpoint = refs.get_meta('checkpoint')
+        if checkpoint:
+            self.stdout.write(f'Resuming after {checkpoint}')
+
+        count = total_size = 0
+        for last_name, orphans in find_orphans(refs, grace_seconds, batch_size, checkpoint):
+            for name, size in orphans:
+                self.stdout.write(name)
+            if options['delete']:
+                delete_orphans([name for name, _ in orphans])
+            count += len(orphans)
+            total_size += sum(size for _, size in orphans)
+            refs.set_meta('checkpoint', last_name)
+
+        refs.connection.execute('DELETE FROM meta')
+        refs.connection.commit()
+        action = 'Deleted' if options['delete'] else 'Found'
+        self.stdout.write(self.style.SUCCESS(f'{action} {count} orphaned files, {total_size} bytes.'))
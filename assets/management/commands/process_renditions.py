@@ -0,0 +1,34 @@
+"""
+Worker command rendering queued image renditions.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from assets.renditions import claim_batch, process_rendition
+
+
+class Command(BaseCommand):
+    """
+    Render pending image renditions. Runs forever unless ``--once`` is passed.
+    """
+    help = 'Render pending image renditions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20, help='Renditions claimed per iteration.')
+        parser.add_argument('--sleep', type=float, default=5.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty.')
+
+    def handle(self, *args, **options):
+        while True:
+            batch = claim_batch(options['batch_size'])
+            for rendition in batch:
+                if process_rendition(rendition):
+                    self.stdout.write(f'Rendered {rendition.source}')
+                else:
+                    self.stderr.write(f'Failed {rendition.source}: {rendition.error}')
+            if not batch:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
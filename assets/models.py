@@ -0,0 +1,77 @@
+"""
+Models for assets app.
+"""
+
+from django.db import models
+
+
+class ImageRendition(models.Model):
+    """
+    Resized variants of one stored image.
+
+    The table also works as a queue for the rendition worker: rows are created
+    as pending on upload and processed by ``process_renditions`` command.
+
+    Attributes:
+        source: Storage name of the original image.
+        status: Processing status.
+        width: Original image width.
+        height: Original image height.
+        placeholder: Tiny blurred preview as data URI.
+        variants: Storage names of variants by MIME type and width,
+            e.g. ``{"image/webp": {"320": "renditions/..."}}``.
+        attempts: Number of processing attempts.
+        error: Last processing error.
+        claimed_at: Date and time the row was taken by a worker.
+    """
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (READY, 'Ready'),
+        (FAILED, 'Failed'),
+    ]
+
+    source = models.CharField(max_length=255, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    placeholder = models.TextField(blank=True)
+    variants = models.JSONField(default=dict, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.source
+
+    class Meta:
+        verbose_name = "Image Rendition"
+        verbose_name_plural = "Image Renditions"
+
+
+class StoredBlob(models.Model):
+    """
+    Reference counter of a content-addressed file.
+
+    Attributes:
+        name: Storage name of the file, derived from its content hash.
+        size: File size in bytes.
+        refcount: Number of uploads resolved to this file.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = "Stored Blob"
+        verbose_name_plural = "Stored Blobs"
@@ -0,0 +1,228 @@
+"""
+Orphaned media detection.
+
+Referenced file names are streamed from every ``FileField`` into an on-disk
+SQLite set, then ``MEDIA_ROOT`` is walked in sorted order and checked against
+it in batches. Memory usage doesn't depend on the number of files or rows, and
+the sorted walk makes it possible to resume from a checkpoint.
+"""
+
+import os
+import sqlite3
+import time
+from datetime import timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import FileField, Model
+from django.utils import timezone
+
+from .models import ImageRendition, StoredBlob
+
+IGNORED_PREFIX = '.'
+
+
+def iter_file_fields() -> Iterator[tuple[type[Model], str]]:
+    """
+    Iterate over all concrete file fields of installed models.
+
+    Yields:
+        tuple[type[Model], str]: Model and field name.
+    """
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, FileField):
+                yield model, field.attname
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """
+    Split iterable into lists of specified size.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class ReferenceSet:
+    """
+    Set of referenced file names stored in an SQLite file.
+    """
+    def __init__(self, path: Path) -> None:
+        """
+        Open or create a reference set.
+
+        Args:
+            path: SQLite database path.
+        """
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS refs (name TEXT PRIMARY KEY) WITHOUT ROWID')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    def add(self, names: Iterable[str]) -> None:
+        self.connection.executemany('INSERT OR IGNORE INTO refs (name) VALUES (?)', ((name,) for name in names))
+        self.connection.commit()
+
+    def existing(self, names: list[str]) -> set[str]:
+        """
+        Get names present in the set.
+        """
+        if not names:
+            return set()
+        placeholders = ','.join('?' * len(names))
+        rows = self.connection.execute(f'SELECT name FROM refs WHERE name IN ({placeholders})', names)
+        return {name for name, in rows}
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def get_live_references(names: list[str]) -> set[str]:
+    """
+    Get names currently referenced by any file field.
+
+    Args:
+        names: File names to check.
+
+    Returns:
+        set[str]: Referenced names.
+    """
+    referenced = set()
+    for model, field in iter_file_fields():
+        referenced.update(model._default_manager.filter(**{f'{field}__in': names}).values_list(field, flat=True))
+    return referenced
+
+
+def collect_references(refs: ReferenceSet, grace_seconds: float, batch_size: int) -> Iterator[list[str]]:
+    """
+    Fill reference set with names from all file fields and ready rendition variants.
+
+    Variants are only kept referenced while their source image is referenced.
+    Sources missing from the reference set are checked against the file fields
+    again, so images referenced after their table was read keep their
+    renditions, and renditions updated within the grace period are kept too.
+    The generator must be exhausted for the reference set to be complete.
+
+    Args:
+        refs: Reference set.
+        grace_seconds: Minimal age of a stale rendition.
+        batch_size: Rows fetched per database round trip.
+
+    Yields:
+        list[str]: Sources of renditions whose images aren't referenced anymore, per batch.
+    """
+    for model, field in iter_file_fields():
+        names = (
+            model._default_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            .order_by('pk').values_list(field, flat=True)
+        )
+        for batch in batched(names.iterator(chunk_size=batch_size), batch_size):
+            refs.add(batch)
+
+    deadline = timezone.now() - timedelta(seconds=grace_seconds)
+    renditions = ImageRendition.objects.order_by('pk').values_list('pk', 'source', 'variants', 'updated_at')
+    last_pk = 0
+    # Pages are taken by primary key, so the caller may delete stale renditions between batches.
+    while batch := list(renditions.filter(pk__gt=last_pk)[:batch_size]):
+        last_pk = batch[-1][0]
+        referenced = refs.existing([source for _, source, _, _ in batch])
+        candidates = [
+            source for _, source, _, updated_at in batch if source not in referenced and updated_at < deadline
+        ]
+        if candidates:
+            referenced |= get_live_references(candidates)
+
+        stale = []
+        for _, source, variants, updated_at in batch:
+            if source in referenced or updated_at >= deadline:
+                refs.add(name for by_width in variants.values() for name in by_width.values())
+            else:
+                stale.append(source)
+        yield stale
+
+
+def walk_sorted(root: Path, relative: str = '') -> Iterator[str]:
+    """
+    Walk directory tree in sorted order, yielding file names relative to the root.
+
+    Args:
+        root: Directory to walk.
+        relative: Path of the directory relative to the walk root.
+    """
+    with os.scandir(root) as entries:
+        entries = sorted(entries, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.name.startswith(IGNORED_PREFIX):
+            continue
+        name = f'{relative}{entry.name}'
+        if entry.is_dir(follow_symlinks=False):
+            yield from walk_sorted(Path(entry.path), f'{name}/')
+        elif entry.is_file(follow_symlinks=False):
+            yield name
+
+
+def walk_key(name: str) -> tuple[str, ...]:
+    """
+    Get sort key of a name matching ``walk_sorted`` order.
+    """
+    return tuple(name.split('/'))
+
+
+def find_orphans(
+        refs: ReferenceSet,
+        grace_seconds: float,
+        batch_size: int,
+        after: Optional[str] = None,
+) -> Iterator[tuple[str, list[tuple[str, int]]]]:
+    """
+    Find unreferenced files older than grace period.
+
+    Args:
+        refs: Filled reference set.
+        grace_seconds: Minimal age of an orphaned file.
+        batch_size: Files checked per batch.
+        after: Resume walk after this name.
+
+    Yields:
+        tuple[str, list[tuple[str, int]]]: Last walked name and orphaned names with sizes
+            of every batch. Batches without orphans are yielded too, so the caller can
+            checkpoint the walk.
+    """
+    root = Path(settings.MEDIA_ROOT)
+    deadline = time.time() - grace_seconds
+    names = walk_sorted(root)
+    if after:
+        after_key = walk_key(after)
+        names = (name for name in names if walk_key(name) > after_key)
+
+    for batch in batched(names, batch_size):
+        referenced = refs.existing(batch)
+        orphans = []
+        for name in batch:
+            if name in referenced:
+                continue
+            stat = (root / name).stat()
+            if stat.st_mtime < deadline:
+                orphans.append((name, stat.st_size))
+        yield batch[-1], orphans
+
+
+def delete_orphans(names: list[str]) -> None:
+    """
+    Delete orphaned files and their reference counters.
+    """
+    root = Path(settings.MEDIA_ROOT)
+    for name in names:
+        (root / name).unlink(missing_ok=True)
+    StoredBlob.objects.filter(name__in=names).delete()
@@ -0,0 +1,244 @@
+"""
+Responsive image renditions.
+
+Uploaded images are queued as pending ``ImageRendition`` rows and rendered by a
+background worker into resized WebP and AVIF (or JPEG, when Pillow is built
+without AVIF) variants plus a tiny placeholder.
+"""
+
+import base64
+import io
+import os
+from datetime import timedelta
+from typing import Callable, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Model, Q
+from django.utils import timezone
+from PIL import Image, ImageFilter, ImageOps, features
+
+from api_models.models import (
+    BlogImage, Brand, CaseStudy, CaseStudyImage, Installation, Product, Repair,
+)
+from household_chemicals.models import ChemicalProduct
+from .models import ImageRendition
+
+IMAGE_FIELDS: dict[type[Model], tuple[str, ...]] = {
+    Repair: ('icon', 'image'),
+    Installation: ('icon', 'image'),
+    Brand: ('logo',),
+    Product: ('image',),
+    BlogImage: ('image',),
+    CaseStudy: ('image',),
+    CaseStudyImage: ('image',),
+    ChemicalProduct: ('image',),
+}
+
+RENDITIONS_DIR = 'renditions'
+PLACEHOLDER_WIDTH = 16
+MAX_ATTEMPTS = 3
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def get_widths() -> tuple[int, ...]:
+    """
+    Get target widths of the variants.
+    """
+    return tuple(getattr(settings, 'IMAGE_RENDITION_WIDTHS', (320, 640, 960, 1280)))
+
+
+def get_formats() -> tuple[tuple[str, str, str], ...]:
+    """
+    Get variant formats as (MIME type, Pillow format, file extension).
+    """
+    fallback = ('image/avif', 'AVIF', 'avif') if features.check('avif') else ('image/jpeg', 'JPEG', 'jpg')
+    return ('image/webp', 'WEBP', 'webp'), fallback
+
+
+def variant_name(source: str, width: int, extension: str) -> str:
+    """
+    Get storage name of the variant.
+
+    Args:
+        source: Storage name of the original image.
+        width: Variant width.
+        extension: Variant file extension.
+    """
+    stem, _ = os.path.splitext(source)
+    return f'{RENDITIONS_DIR}/{stem}-{width}w.{extension}'
+
+
+def encode_image(image: Image.Image, pillow_format: str) -> bytes:
+    """
+    Encode image to bytes in specified format.
+    """
+    buffer = io.BytesIO()
+    if pillow_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.save(buffer, format=pillow_format, quality=getattr(settings, 'IMAGE_RENDITION_QUALITY', 80))
+    return buffer.getvalue()
+
+
+def render_image(source: str, save: Optional[Callable[[str, ContentFile], str]] = None) -> dict:
+    """
+    Render all variants of the image and save them to storage.
+
+    Saving to the content-addressed storage references the files in the
+    database. Worker processes pass a ``save`` which only writes the files
+    and leave the references to the main process.
+
+    Args:
+        source: Storage name of the original image.
+        save: Function saving a variant and returning its storage name, ``default_storage.save`` by default.
+
+    Returns:
+        dict: Rendition fields: width, height, placeholder and variants.
+    """
+    save = save or default_storage.save
+    with default_storage.open(source, 'rb') as file:
+        image = Image.open(file)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = image.mode in ('LA', 'PA', 'P') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    width, height = image.size
+
+    widths = [target for target in get_widths() if target < width] or [width]
+    variants: dict[str, dict[str, str]] = {}
+    for mime_type, pillow_format, extension in get_formats():
+        variants[mime_type] = {}
+        for target in widths:
+            resized = image if target == width else image.resize(
+                (target, max(1, round(height * target / width))), Image.LANCZOS,
+            )
+            variants[mime_type][str(target)] = save(
+                variant_name(source, target, extension), ContentFile(encode_image(resized, pillow_format)),
+            )
+
+    tiny = image.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))))
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    placeholder = 'data:image/webp;base64,' + base64.b64encode(encode_image(tiny, 'WEBP')).decode()
+
+    return {'width': width, 'height': height, 'placeholder': placeholder, 'variants': variants}
+
+
+def iter_image_names(batch_size: int = 2000) -> Iterator[str]:
+    """
+    Iterate over storage names of all images referenced by models.
+    """
+    for model, fields in IMAGE_FIELDS.items():
+        for field in fields:
+            names = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            yield from names.values_list(field, flat=True).order_by('pk').iterator(chunk_size=batch_size)
+
+
+def enqueue_sources(names: Iterable[str]) -> None:
+    """
+    Queue images for rendering. Already known images are skipped.
+
+    Args:
+        names: Storage names of images.
+    """
+    ImageRendition.objects.bulk_create(
+        [ImageRendition(source=name) for name in set(names) if name],
+        ignore_conflicts=True,
+    )
+
+
+def claim_batch(batch_size: int) -> list[ImageRendition]:
+    """
+    Take pending renditions for processing. Safe for concurrent workers.
+
+    Rows claimed by a worker which died are taken again after ``CLAIM_TIMEOUT``.
+
+    Args:
+        batch_size: Maximum number of rows.
+
+    Returns:
+        list[ImageRendition]: Claimed renditions.
+    """
+    now = timezone.now()
+    claimable = ImageRendition.objects.filter(
+        Q(status=ImageRendition.PENDING)
+        | Q(status=ImageRendition.PROCESSING, claimed_at__lt=now - CLAIM_TIMEOUT)
+    )
+    with transaction.atomic():
+        batch = list(claimable.select_for_update(skip_locked=True).order_by('pk')[:batch_size])
+        ImageRendition.objects.filter(pk__in=[rendition.pk for rendition in batch]).update(
+            status=ImageRendition.PROCESSING, claimed_at=now,
+        )
+    return batch
+
+
+def store_result(rendition: ImageRendition, result: Optional[dict], error: str = '') -> None:
+    """
+    Save rendering result or failure of the rendition.
+
+    Args:
+        rendition: Processed rendition.
+        result: Result of ``render_image`` or None on failure.
+        error: Failure description.
+    """
+    rendition.attempts += 1
+    rendition.claimed_at = None
+    if result is not None:
+        for attr, value in result.items():
+            setattr(rendition, attr, value)
+        rendition.status = ImageRendition.READY
+        rendition.error = ''
+    else:
+        rendition.status = ImageRendition.FAILED if rendition.attempts >= MAX_ATTEMPTS else ImageRendition.PENDING
+        rendition.error = error
+    rendition.save()
+
+
+def release_variants(variants: dict[str, dict[str, str]]) -> None:
+    """
+    Drop storage references of variants replaced by a new rendering.
+
+    Args:
+        variants: Variant names by MIME type and width.
+    """
+    for names in variants.values():
+        for name in names.values():
+            default_storage.delete(name)
+
+
+def process_rendition(rendition: ImageRendition) -> bool:
+    """
+    Render one claimed rendition. Variants of an earlier rendering are released
+    after the new ones are stored, so unchanged variants are kept.
+
+    Returns:
+        bool: Whether rendering succeeded.
+    """
+    previous = rendition.variants
+    try:
+        result = render_image(rendition.source)
+    except Exception as exception:
+        store_result(rendition, None, f'{type(exception).__name__}: {exception}')
+        return False
+    store_result(rendition, result)
+    release_variants(previous)
+    return True
+
+
+def get_renditions(names: Iterable[str]) -> dict[str, ImageRendition]:
+    """
+    Get ready renditions of images in one query.
+
+    Args:
+        names: Storage names of images.
+
+    Returns:
+        dict[str, ImageRendition]: Renditions by source name.
+    """
+    names = [name for name in set(names) if name]
+    if not names:
+        return {}
+    renditions = ImageRendition.objects.filter(source__in=names, status=ImageRendition.READY)
+    return {rendition.source: rendition for rendition in renditions}
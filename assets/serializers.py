@@ -0,0 +1,112 @@
+"""
+Serializer fields for assets app.
+"""
+
+from typing import Optional
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.files.storage import default_storage
+from django.db.models import QuerySet
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+from rest_framework.fields import get_attribute
+
+from .renditions import get_renditions
+
+
+class RenditionField(serializers.Field):
+    """
+    Read-only field representing responsive variants of an image field.
+
+    Renditions of all objects serialized at the position of the field, in the
+    top-level list and in nested lists, are fetched in one query on the first
+    access and memoized in serializer context.
+
+    Example output::
+
+        {
+            "width": 1600,
+            "height": 900,
+            "placeholder": "data:image/webp;base64,...",
+            "srcset": {"image/webp": "https://.../a-320w.webp 320w, https://.../a-640w.webp 640w"}
+        }
+    """
+    CONTEXT_KEY = 'image_renditions'
+
+    def __init__(self, image_field: str, **kwargs) -> None:
+        """
+        Init a rendition field.
+
+        Args:
+            image_field: Name of the model image field.
+        """
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def _sibling_names(self) -> list[str]:
+        """
+        Get image names of all objects serialized at the position of this field, e.g. images of every
+        product of every brand in the list.
+
+        Nested lists are read through their related managers, so they should be prefetched by the view.
+        """
+        sources = []
+        node = self.parent
+        while node.parent is not None:
+            if not isinstance(node.parent, serializers.ListSerializer):
+                sources.append(node.source_attrs)
+            node = node.parent
+        if node.instance is None:
+            return []
+
+        objects = list(node.instance) if isinstance(node, serializers.ListSerializer) else [node.instance]
+        for source_attrs in reversed(sources):
+            nested = []
+            for obj in objects:
+                try:
+                    value = get_attribute(obj, source_attrs)
+                except (AttributeError, KeyError, ObjectDoesNotExist):
+                    continue
+                if isinstance(value, BaseManager):
+                    nested.extend(value.all())
+                elif isinstance(value, (list, tuple, QuerySet)):
+                    nested.extend(value)
+                elif value is not None:
+                    nested.append(value)
+            objects = nested
+        return [getattr(obj, self.image_field).name for obj in objects]
+
+    def _build_url(self, name: str) -> str:
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def to_representation(self, instance) -> Optional[dict]:
+        image = getattr(instance, self.image_field)
+        if not image:
+            return None
+
+        cache = self.context.setdefault(self.CONTEXT_KEY, {})
+        if image.name not in cache:
+            names = {image.name, *self._sibling_names()} - cache.keys()
+            renditions = get_renditions(names)
+            cache.update({name: renditions.get(name) for name in names})
+
+        rendition = cache[image.name]
+        if rendition is None:
+            return None
+        return {
+            'width': rendition.width,
+            'height': rendition.height,
+            'placeholder': rendition.placeholder,
+            'srcset': {
+                mime_type: ', '.join(
+                    f'{self._build_url(name)} {width}w' for width, name in sorted(
+                        variants.items(), key=lambda variant: int(variant[0]),
+                    )
+                )
+                for mime_type, variants in rendition.variants.items()
+            },
+        }
@@ -0,0 +1,110 @@
+"""
+Signals queueing image renditions for uploaded images and releasing
+references of content-addressed files.
+"""
+
+from functools import lru_cache, partial
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import FileField, Model
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .renditions import IMAGE_FIELDS, enqueue_sources
+from .storage import ContentAddressedStorage
+
+STORED_NAMES_ATTR = '_stored_file_names'
+
+
+def queue_image_renditions(sender, instance, raw=False, **kwargs) -> None:
+    """
+    Queue renditions of the saved instance images. Known images are skipped by the database.
+    """
+    if raw:
+        return
+    names = [getattr(instance, field).name for field in IMAGE_FIELDS[sender]]
+    if any(names):
+        enqueue_sources(names)
+
+
+def connect_rendition_signals() -> None:
+    """
+    Connect save signals of every model with images.
+    """
+    for model in IMAGE_FIELDS:
+        post_save.connect(queue_image_renditions, sender=model, dispatch_uid=f'renditions-{model._meta.label}')
+
+
+@lru_cache(maxsize=None)
+def get_file_fields(model: type[Model]) -> list[FileField]:
+    """
+    Get file fields of the model stored in a content-addressed storage.
+    """
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def get_loaded_name(instance: Model, field: FileField) -> str:
+    """
+    Get file name of the field without loading a deferred field.
+    """
+    value = instance.__dict__.get(field.attname)
+    return getattr(value, 'name', value) or ''
+
+
+def release_file(field: FileField, name: str) -> None:
+    """
+    Drop one reference of the content-addressed file after the transaction commits.
+    """
+    if name and field.storage.is_content_addressed(name):
+        transaction.on_commit(partial(field.storage.delete, name))
+
+
+def remember_file_names(sender, instance, **kwargs) -> None:
+    """
+    Remember file names the instance was loaded with, to release replaced files on save.
+    """
+    instance.__dict__[STORED_NAMES_ATTR] = {
+        field.attname: get_loaded_name(instance, field) for field in get_file_fields(sender)
+        if field.attname in instance.__dict__
+    }
+
+
+def release_replaced_files(sender, instance, raw=False, **kwargs) -> None:
+    """
+    Release files replaced or cleared by the save.
+    """
+    if raw:
+        return
+    stored_names = instance.__dict__.setdefault(STORED_NAMES_ATTR, {})
+    for field in get_file_fields(sender):
+        if field.attname not in instance.__dict__:
+            continue
+        name = get_loaded_name(instance, field)
+        previous = stored_names.get(field.attname, '')
+        if previous != name:
+            release_file(field, previous)
+        stored_names[field.attname] = name
+
+
+def release_deleted_files(sender, instance, **kwargs) -> None:
+    """
+    Release files of the deleted instance.
+    """
+    for field in get_file_fields(sender):
+        release_file(field, get_loaded_name(instance, field))
+
+
+def connect_file_signals() -> None:
+    """
+    Connect signals releasing content-addressed files of every model with file fields.
+    """
+    for model in apps.get_models():
+        if not get_file_fields(model):
+            continue
+        uid = model._meta.label
+        post_init.connect(remember_file_names, sender=model, dispatch_uid=f'file-names-{uid}')
+        post_save.connect(release_replaced_files, sender=model, dispatch_uid=f'file-replace-{uid}')
+        post_delete.connect(release_deleted_files, sender=model, dispatch_uid=f'file-delete-{uid}')
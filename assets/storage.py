@@ -0,0 +1,153 @@
+"""
+Content-addressed file storage.
+
+Files are stored under a name derived from the SHA-256 of their content, e.g.
+``cas/3f/a2/3fa2...e1.png``. Identical uploads resolve to the same file, which
+is reference counted, and the name never changes for the same content, so
+the web server can serve them with ``Cache-Control: immutable``.
+
+References are released by model signals when a row is deleted or its file
+is replaced, see ``assets.signals``.
+"""
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils.functional import cached_property
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage naming files by content hash and deduplicating them.
+
+    Files saved before the storage was enabled keep their original names and
+    are handled as in plain ``FileSystemStorage``.
+    """
+    chunk_size = 64 * 1024
+
+    @property
+    def prefix(self) -> str:
+        return getattr(settings, 'CONTENT_ADDRESSED_PREFIX', 'cas')
+
+    def is_content_addressed(self, name: str) -> bool:
+        """
+        Check whether the file name was produced by this storage.
+        """
+        return name.replace('\\', '/').startswith(self.prefix + '/')
+
+    def hashed_name(self, name: str, content: File) -> str:
+        """
+        Get content-addressed name of the file.
+
+        Args:
+            name: Requested file name, only its extension is kept.
+            content: File content, files hashed while uploading carry the hex digest as ``sha256``.
+        """
+        hexdigest = getattr(content, 'sha256', None)
+        if hexdigest is None:
+            digest = hashlib.sha256()
+            for chunk in content.chunks(self.chunk_size):
+                digest.update(chunk)
+            if hasattr(content, 'seek'):
+                content.seek(0)
+            hexdigest = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()[:10]
+        return f'{self.prefix}/{hexdigest[:2]}/{hexdigest[2:4]}/{hexdigest}{extension}'
+
+    def _save(self, name: str, content: File) -> str:
+        hashed_name = self.write(name, content)
+        self.add_reference(hashed_name, content.size)
+        return hashed_name
+
+    def write(self, name: str, content: File) -> str:
+        """
+        Write the file under its content-addressed name without referencing it.
+
+        Doesn't touch the database. The caller adds the reference with
+        ``add_reference``, until then the file is left to the orphan collector.
+
+        Args:
+            name: Requested file name, only its extension is kept.
+            content: File content.
+
+        Returns:
+            str: Content-addressed name of the file.
+        """
+        hashed_name = self.hashed_name(name, content)
+        if self.exists(hashed_name):
+            # Refresh modification time, so the orphan collector's grace period covers new references.
+            os.utime(self.path(hashed_name))
+        else:
+            saved_name = super()._save(hashed_name, content)
+            if saved_name != hashed_name:
+                # Another process stored the same content concurrently.
+                super().delete(saved_name)
+        return hashed_name
+
+    @staticmethod
+    def add_reference(name: str, size: int) -> None:
+        """
+        Increment reference counter of the file, creating it on first reference.
+        """
+        from .models import StoredBlob
+
+        if StoredBlob.objects.filter(name=name).update(refcount=F('refcount') + 1):
+            return
+        try:
+            with transaction.atomic():
+                StoredBlob.objects.create(name=name, size=size, refcount=1)
+        except IntegrityError:
+            StoredBlob.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+    def delete(self, name: str) -> None:
+        """
+        Drop one reference of the file. The file itself is deleted with its last reference.
+        """
+        if not self.is_content_addressed(name):
+            return super().delete(name)
+
+        from .models import StoredBlob
+
+        with transaction.atomic():
+            StoredBlob.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1)
+            deleted, _ = StoredBlob.objects.filter(name=name, refcount=0).delete()
+        if deleted:
+            super().delete(name)
+
+
+class PrivateContentAddressedStorage(ContentAddressedStorage):
+    """
+    Content-addressed storage outside ``MEDIA_ROOT``, not served by the web server directly.
+
+    File URLs point to the protected media view, which checks permissions and
+    hands the transfer to nginx with ``X-Accel-Redirect``.
+    """
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.PRIVATE_MEDIA_ROOT)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'PRIVATE_MEDIA_ROOT':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+
+    @property
+    def prefix(self) -> str:
+        return getattr(settings, 'PRIVATE_CONTENT_ADDRESSED_PREFIX', 'private')
+
+    def url(self, name: str) -> str:
+        return reverse('protected-media', kwargs={'name': name.replace('\\', '/')})
+
+
+def get_private_storage() -> PrivateContentAddressedStorage:
+    """
+    Get private storage, for ``storage`` argument of file fields.
+    """
+    return storages['private']
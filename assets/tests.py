@@ -0,0 +1,308 @@
+import io
+import os
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from assets.management.commands.backfill_renditions import _render
+from assets.models import ImageRendition, StoredBlob
+from assets.orphans import ReferenceSet, iter_file_fields
+from assets.renditions import claim_batch, process_rendition
+from assets.storage import get_private_storage
+from api_models.models import Brand, Product
+from household_chemicals.models import ChemicalProduct
+from household_chemicals.serializers import ProductBaseSerializer
+
+
+def make_image(width, height, image_format='PNG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'red').save(buffer, format=image_format)
+    return SimpleUploadedFile(f'photo.{image_format.lower()}', buffer.getvalue())
+
+
+class ImageRenditionTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name, IMAGE_RENDITION_WIDTHS=(320, 640))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_upload_is_queued_and_rendered(self):
+        product = ChemicalProduct.objects.create(title='Soap', price='1.00', image=make_image(800, 400))
+        rendition = ImageRendition.objects.get(source=product.image.name)
+        self.assertEqual(rendition.status, ImageRendition.PENDING)
+
+        [claimed] = claim_batch(10)
+        self.assertTrue(process_rendition(claimed))
+
+        rendition.refresh_from_db()
+        self.assertEqual(rendition.status, ImageRendition.READY)
+        self.assertEqual((rendition.width, rendition.height), (800, 400))
+        self.assertEqual(set(rendition.variants['image/webp']), {'320', '640'})
+        self.assertTrue(rendition.placeholder.startswith('data:image/webp;base64,'))
+
+    def test_small_image_keeps_original_width(self):
+        ChemicalProduct.objects.create(title='Soap', price='1.00', image=make_image(100, 100))
+        [claimed] = claim_batch(10)
+        process_rendition(claimed)
+        claimed.refresh_from_db()
+        self.assertEqual(set(claimed.variants['image/webp']), {'100'})
+
+    def test_broken_image_is_retried_then_failed(self):
+        ChemicalProduct.objects.create(
+            title='Soap', price='1.00', image=SimpleUploadedFile('broken.png', b'not an image'),
+        )
+        for _ in range(3):
+            [claimed] = claim_batch(10)
+            self.assertFalse(process_rendition(claimed))
+        self.assertEqual(claimed.status, ImageRendition.FAILED)
+        self.assertEqual(claim_batch(10), [])
+
+    def test_serializer_exposes_srcset(self):
+        for title in ('Soap', 'Bleach'):
+            ChemicalProduct.objects.create(title=title, price='1.00', image=make_image(800, 400))
+        for claimed in claim_batch(10):
+            process_rendition(claimed)
+
+        products = ChemicalProduct.objects.order_by('id')
+        with self.assertNumQueries(2):
+            data = ProductBaseSerializer(products, many=True).data
+
+        srcset = data[0]['image_renditions']['srcset']['image/webp']
+        self.assertRegex(srcset, r'^/media/cas/\w{2}/\w{2}/\w{64}\.webp 320w, .+ 640w$')
+
+    def test_nested_renditions_are_fetched_in_one_query(self):
+        for name in ('Bosch', 'Miele'):
+            brand = Brand.objects.create(name=name, logo=make_image(800, 400, 'JPEG'))
+            for index in range(3):
+                Product.objects.create(brand=brand, name=f'{name} {index}', image=make_image(700 + index, 400))
+        for claimed in claim_batch(100):
+            process_rendition(claimed)
+
+        # Brands, their prefetched products, then renditions of logos and of product images.
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('brand-list'), secure=True)
+        images = [product['image_renditions'] for brand in response.json() for product in brand['products']]
+        self.assertEqual(len(images), 6)
+        self.assertTrue(all(images))
+
+    def test_rerender_releases_previous_variants(self):
+        ChemicalProduct.objects.create(title='Soap', price='1.00', image=make_image(800, 400))
+        [claimed] = claim_batch(10)
+        process_rendition(claimed)
+        ImageRendition.objects.update(status=ImageRendition.PENDING)
+        [claimed] = claim_batch(10)
+        process_rendition(claimed)
+
+        names = [name for variants in claimed.variants.values() for name in variants.values()]
+        self.assertEqual(set(StoredBlob.objects.filter(name__in=names).values_list('refcount', flat=True)), {1})
+
+    def test_backfill_workers_dont_touch_database(self):
+        product = ChemicalProduct.objects.create(title='Soap', price='1.00', image=make_image(800, 400))
+        with self.assertNumQueries(0):
+            _, result, written, error = _render(product.image.name)
+        self.assertEqual(error, '')
+        names = [name for variants in result['variants'].values() for name in variants.values()]
+        self.assertEqual([name for name, _ in written], names)
+        self.assertFalse(StoredBlob.objects.filter(name__in=[name for name, _ in written]).exists())
+
+    def test_backfill_references_variants(self):
+        ChemicalProduct.objects.create(title='Soap', price='1.00', image=make_image(800, 400))
+        call_command('backfill_renditions', '--workers=1', stdout=io.StringIO())
+
+        rendition = ImageRendition.objects.get()
+        self.assertEqual(rendition.status, ImageRendition.READY)
+        names = [name for variants in rendition.variants.values() for name in variants.values()]
+        self.assertEqual(set(StoredBlob.objects.filter(name__in=names).values_list('refcount', flat=True)), {1})
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_identical_uploads_are_deduplicated(self):
+        first = default_storage.save('brands_images/logo.PNG', ContentFile(b'logo'))
+        second = default_storage.save('product_images/other.png', ContentFile(b'logo'))
+        third = default_storage.save('product_images/other.png', ContentFile(b'another logo'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+        self.assertRegex(first, r'^cas/\w{2}/\w{2}/\w{64}\.png$')
+        self.assertEqual(StoredBlob.objects.get(name=first).refcount, 2)
+
+    def test_file_is_deleted_with_last_reference(self):
+        name = default_storage.save('logo.png', ContentFile(b'logo'))
+        default_storage.save('logo.png', ContentFile(b'logo'))
+
+        default_storage.delete(name)
+        self.assertTrue(default_storage.exists(name))
+        default_storage.delete(name)
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(StoredBlob.objects.filter(name=name).exists())
+
+
+class FileReleaseTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_replaced_file_is_released(self):
+        brand = Brand.objects.create(name='Bosch', logo=SimpleUploadedFile('logo.png', b'old logo'))
+        Brand.objects.create(name='Miele', logo=SimpleUploadedFile('logo.png', b'old logo'))
+        old_name = brand.logo.name
+
+        brand = Brand.objects.get(pk=brand.pk)
+        brand.logo = SimpleUploadedFile('logo.png', b'new logo')
+        with self.captureOnCommitCallbacks(execute=True):
+            brand.save()
+        self.assertEqual(StoredBlob.objects.get(name=old_name).refcount, 1)
+        self.assertEqual(StoredBlob.objects.get(name=brand.logo.name).refcount, 1)
+
+    def test_deleted_rows_release_files(self):
+        for name in ('Bosch', 'Miele'):
+            Brand.objects.create(name=name, logo=SimpleUploadedFile('logo.png', b'logo'))
+        logo = Brand.objects.first().logo.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Brand.objects.first().delete()
+        self.assertEqual(StoredBlob.objects.get(name=logo).refcount, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Brand.objects.all().delete()
+        self.assertFalse(StoredBlob.objects.filter(name=logo).exists())
+        self.assertFalse(default_storage.exists(logo))
+
+
+class CollectOrphanedMediaTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.media_root = Path(media_root.name)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def make_file(self, name, age_hours):
+        path = self.media_root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'data')
+        mtime = time.time() - age_hours * 3600
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def run_command(self, *args):
+        output = io.StringIO()
+        call_command('collect_orphaned_media', *args, stdout=output)
+        return output.getvalue()
+
+    def test_reports_and_deletes_old_orphans(self):
+        brand = Brand.objects.create(name='Bosch', logo=SimpleUploadedFile('logo.png', b'logo'))
+        os.utime(brand.logo.path, (0, 0))
+        old_orphan = self.make_file('blog_images/old.jpg', age_hours=48)
+        new_orphan = self.make_file('blog_images/new.jpg', age_hours=1)
+
+        output = self.run_command()
+        self.assertIn('blog_images/old.jpg', output)
+        self.assertNotIn('new.jpg', output)
+        self.assertNotIn(brand.logo.name, output)
+        self.assertTrue(old_orphan.exists())
+
+        self.run_command('--delete')
+        self.assertFalse(old_orphan.exists())
+        self.assertTrue(new_orphan.exists())
+        self.assertTrue(Path(brand.logo.path).exists())
+
+    def test_resume_continues_after_checkpoint(self):
+        for name in ('a/1.jpg', 'a/2.jpg', 'b/1.jpg'):
+            self.make_file(name, age_hours=48)
+        state = self.media_root.parent / f'{self.media_root.name}-state.sqlite3'
+        self.addCleanup(state.unlink, missing_ok=True)
+
+        refs = ReferenceSet(state)
+        refs.set_meta('collected', '1')
+        refs.set_meta('checkpoint', 'a/2.jpg')
+        refs.close()
+
+        output = self.run_command('--state', str(state), '--resume')
+        self.assertIn('b/1.jpg', output)
+        self.assertNotIn('a/1.jpg', output)
+
+    def make_rendition(self, source, age_hours):
+        variant = self.make_file(f'cas/{source}.webp', age_hours=48)
+        rendition, _ = ImageRendition.objects.update_or_create(source=source, defaults={
+            'status': ImageRendition.READY,
+            'variants': {'image/webp': {'320': str(variant.relative_to(self.media_root))}},
+        })
+        ImageRendition.objects.filter(pk=rendition.pk).update(updated_at=timezone.now() - timedelta(hours=age_hours))
+        return variant
+
+    def test_stale_renditions_are_dropped_after_grace(self):
+        old_variant = self.make_rendition('product_images/old.png', age_hours=48)
+        new_variant = self.make_rendition('product_images/new.png', age_hours=1)
+
+        output = self.run_command('--delete', '--batch-size=1')
+        self.assertIn('Dropped 1 renditions', output)
+        self.assertEqual(list(ImageRendition.objects.values_list('source', flat=True)), ['product_images/new.png'])
+        self.assertFalse(old_variant.exists())
+        self.assertTrue(new_variant.exists())
+
+    def test_images_referenced_after_scan_keep_renditions(self):
+        brand = Brand.objects.create(name='Bosch', logo=SimpleUploadedFile('logo.png', b'logo'))
+        variant = self.make_rendition(brand.logo.name, age_hours=48)
+
+        # The logo is referenced only after the brands table was read.
+        with mock.patch('assets.orphans.iter_file_fields', side_effect=[iter(()), iter_file_fields()]):
+            self.run_command('--delete')
+        self.assertTrue(ImageRendition.objects.filter(source=brand.logo.name).exists())
+        self.assertTrue(variant.exists())
+
+
+class ProtectedMediaTests(TestCase):
+    def setUp(self):
+        private_root = tempfile.TemporaryDirectory()
+        self.addCleanup(private_root.cleanup)
+        settings_override = override_settings(PRIVATE_MEDIA_ROOT=private_root.name, PROTECTED_MEDIA_X_ACCEL=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.name = get_private_storage().save('cv.pdf', ContentFile(b'%PDF-1.7 resume'))
+        self.url = get_private_storage().url(self.name)
+
+    def test_staff_download_is_handed_to_nginx(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        response = self.client.get(self.url, secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{self.name}')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content, b'')
+
+    def test_download_is_streamed_without_nginx(self):
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        with override_settings(PROTECTED_MEDIA_X_ACCEL=False):
+            response = self.client.get(self.url, secure=True)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.7 resume')
+
+    def test_anonymous_and_missing(self):
+        self.assertIn(self.client.get(self.url, secure=True).status_code, (401, 403))
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        missing = reverse('protected-media', kwargs={'name': '../secret.txt'})
+        self.assertEqual(self.client.get(missing, secure=True).status_code, 404)
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import ProtectedMediaView
+
+urlpatterns = [
+    path('<path:name>', ProtectedMediaView.as_view(), name='protected-media'),
+]
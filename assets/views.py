@@ -0,0 +1,47 @@
+"""
+Views for assets app.
+"""
+
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from .storage import get_private_storage
+
+
+class ProtectedMediaView(APIView):
+    """
+    Download a file of the private storage. Staff only.
+
+    With ``PROTECTED_MEDIA_X_ACCEL`` the response is empty and carries an
+    ``X-Accel-Redirect`` to the internal nginx location, which sends the file
+    with sendfile and range support. Otherwise, e.g. under runserver, the file
+    is streamed by Django.
+    """
+    permission_classes = [IsAdminUser]
+    swagger_schema = None
+
+    def get(self, request, name):
+        storage = get_private_storage()
+        try:
+            exists = storage.exists(name)
+        except SuspiciousFileOperation:
+            exists = False
+        if not exists:
+            raise Http404
+
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if settings.PROTECTED_MEDIA_X_ACCEL:
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = settings.PROTECTED_MEDIA_INTERNAL_URL + quote(name)
+        else:
+            response = FileResponse(storage.open(name, 'rb'), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{os.path.basename(name)}"'
+        response['Cache-Control'] = 'private, no-store'
+        return response
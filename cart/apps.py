@@ -15,3 +15,10 @@ class CartConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cart'
+
+    def ready(self) -> None:
+        """
+        Connect signals bumping catalog version.
+        """
+        from .signals import connect_catalog_signals
+        connect_catalog_signals()
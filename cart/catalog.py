@@ -0,0 +1,33 @@
+"""
+Catalog version stamp for cart app.
+
+The stamp is kept in the shared cache and replaced on every product change, so
+carts validated against the current stamp don't need to query products again.
+"""
+
+from uuid import uuid4
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = 'cart:catalog_version'
+
+
+def get_catalog_version() -> str:
+    """
+    Get current catalog version stamp, creating it on first use.
+
+    Returns:
+        str: Catalog version stamp.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, uuid4().hex, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version(**kwargs) -> None:
+    """
+    Replace catalog version stamp, invalidating all validated carts.
+    """
+    cache.set(CATALOG_VERSION_KEY, uuid4().hex, timeout=None)
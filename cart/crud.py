@@ -1,6 +1,8 @@
 """
 Service functions for working with database.
 """
+from typing import Iterable
+
 from django.shortcuts import get_object_or_404
 from household_chemicals.models import ChemicalProduct
 
@@ -15,3 +17,27 @@ def get_product_by_id(product_id: int) -> ChemicalProduct:
         ChemicalProduct: ChemicalProduct object with specified ID.
     """
     return get_object_or_404(ChemicalProduct, id=product_id)
+
+
+def get_products_by_ids(product_ids: Iterable[int]) -> dict[int, ChemicalProduct]:
+    """
+    Get products by their IDs in one query.
+
+    Args:
+        product_ids: IDs of the products.
+    Returns:
+        dict[int, ChemicalProduct]: Found products by ID.
+    """
+    return ChemicalProduct.objects.in_bulk(set(product_ids))
+
+
+def get_products_by_titles(titles: Iterable[str]) -> dict[str, ChemicalProduct]:
+    """
+    Get products by their titles in one query.
+
+    Args:
+        titles: Titles of the products.
+    Returns:
+        dict[str, ChemicalProduct]: Found products by title.
+    """
+    return {product.title: product for product in ChemicalProduct.objects.filter(title__in=set(titles))}
@@ -0,0 +1,105 @@
+"""
+Command comparing session formats on realistic carts.
+"""
+
+import hashlib
+import timeit
+from decimal import Decimal
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.core.signing import JSONSerializer
+from django.utils import timezone
+
+from cart.structures import Cart
+from core.sessions import MsgPackSerializer
+
+
+def build_sample_cart(items: int) -> Cart:
+    """
+    Build a cart of the given size, shaped like real carts.
+
+    Args:
+        items: Count of cart items.
+
+    Returns:
+        Cart: Sample cart.
+    """
+    cart = Cart()
+    for index in range(1, items + 1):
+        product = {
+            'title': f'All-purpose cleaner concentrate, lemon scent, {index * 250} ml',
+            'price': str(Decimal(index * 137) / 100 + Decimal('4.99')),
+            'is_available': index % 7 != 0,
+        }
+        digest = hashlib.sha256(str(index).encode()).hexdigest()
+        image = f'https://api.example.com/media/cas/{digest[:2]}/{digest[2:4]}/{digest}.webp'
+        cart.add(index, product, index % 5 + 1, image)
+    return cart
+
+
+def build_sample_session(cart_data: dict) -> dict:
+    """
+    Build session data around stored cart.
+
+    Args:
+        cart_data: Stored cart.
+
+    Returns:
+        dict: Session data.
+    """
+    return {
+        '_auth_user_id': '1',
+        '_session_expiry': 1209600,
+        'cart': cart_data,
+        'visited_at': timezone.now().isoformat(),
+    }
+
+
+def item_dicts(cart: Cart) -> dict:
+    """
+    Get stored cart with an item dict per item, as before compact rows.
+    """
+    return {**cart.to_dict(), 'items': list(cart.items.values())}
+
+
+FORMATS = {
+    'json+dicts': (JSONSerializer, item_dicts),
+    'json+rows': (JSONSerializer, Cart.to_dict),
+    'msgpack+rows': (MsgPackSerializer, Cart.to_dict),
+}
+
+
+class Command(BaseCommand):
+    """
+    Report encoded session size, encode time and decode time including cart restore for every format.
+
+    ``json+dicts`` is the format used before compact carts and ``msgpack+rows`` the current one.
+    """
+    help = 'Compare session formats on realistic carts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, nargs='+', default=[1, 10, 50], help='Cart sizes to measure.')
+        parser.add_argument('--number', type=int, default=1000, help='Iterations per measurement.')
+
+    def measure(self, func, number: int) -> float:
+        """
+        Get best time of a call in microseconds.
+        """
+        return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+    def handle(self, *args, **options):
+        number = options['number']
+        self.stdout.write(f"{'items':>6} {'format':>13} {'bytes':>7} {'encode us':>10} {'decode us':>10}")
+        for items in options['items']:
+            cart = build_sample_cart(items)
+            for name, (serializer, dump_cart) in FORMATS.items():
+                store = SessionStore()
+                store.serializer = serializer
+                data = build_sample_session(dump_cart(cart))
+                encoded = store.encode(data)
+                assert Cart.from_dict(store.decode(encoded)['cart']).as_list() == cart.as_list()
+
+                encode_time = self.measure(lambda: store.encode(data), number)
+                decode_time = self.measure(lambda: Cart.from_dict(store.decode(encoded)['cart']), number)
+                self.stdout.write(f'{items:>6} {name:>13} {len(encoded):>7} {encode_time:>10.1f} {decode_time:>10.1f}')
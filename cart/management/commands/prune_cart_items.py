@@ -0,0 +1,62 @@
+"""
+Command deleting cart items of expired sessions.
+"""
+
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db.models import Model
+from django.utils import timezone
+
+from cart.models import CartItem, CartSequence
+
+DATABASE_ENGINES = ('django.contrib.sessions.backends.db', 'django.contrib.sessions.backends.cached_db')
+
+
+class Command(BaseCommand):
+    """
+    Delete ``DatabaseCartStorage`` items and sequences whose session expired or was deleted.
+    Intended to be run periodically next to ``clearsessions``.
+    """
+    help = 'Delete cart items of expired sessions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Sessions checked per batch.')
+
+    def get_expired_keys(self, keys: list[str]) -> list[str]:
+        """
+        Get keys of the batch without a live session.
+        """
+        if settings.SESSION_ENGINE in DATABASE_ENGINES:
+            live = set(
+                Session.objects.filter(session_key__in=keys, expire_date__gt=timezone.now())
+                .values_list('session_key', flat=True)
+            )
+        else:
+            store = import_module(settings.SESSION_ENGINE).SessionStore()
+            live = {key for key in keys if store.exists(key)}
+        return [key for key in keys if key not in live]
+
+    def prune(self, model: type[Model], batch_size: int) -> int:
+        """
+        Delete rows of the model whose session expired.
+
+        Returns:
+            int: Count of deleted rows.
+        """
+        deleted = 0
+        last_key = ''
+        keys = model.objects.order_by('session_key').values_list('session_key', flat=True).distinct()
+        while batch := list(keys.filter(session_key__gt=last_key)[:batch_size]):
+            last_key = batch[-1]
+            expired = self.get_expired_keys(batch)
+            if expired:
+                deleted += model.objects.filter(session_key__in=expired).delete()[0]
+        return deleted
+
+    def handle(self, *args, **options):
+        deleted = self.prune(CartItem, options['batch_size'])
+        self.prune(CartSequence, options['batch_size'])
+        self.stdout.write(f'Deleted {deleted} cart items')
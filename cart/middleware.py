@@ -0,0 +1,35 @@
+"""
+Middleware for cart app.
+"""
+
+from typing import Callable
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+
+class CartCookieMiddleware:
+    """
+    Write cart cookie prepared by ``CookieCartStorage`` to the response.
+    """
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        value = getattr(request, 'cart_cookie', None)
+        if value is None:
+            return response
+
+        if value:
+            response.set_cookie(
+                settings.CART_COOKIE_NAME,
+                value,
+                max_age=settings.SESSION_COOKIE_AGE,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+        else:
+            response.delete_cookie(settings.CART_COOKIE_NAME, samesite=settings.SESSION_COOKIE_SAMESITE)
+        return response
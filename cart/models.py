@@ -0,0 +1,64 @@
+"""
+Models for cart app.
+"""
+
+from django.db import models
+
+from household_chemicals.models import ChemicalProduct
+
+
+class CartItem(models.Model):
+    """
+    Cart item of ``DatabaseCartStorage``, one row per item.
+
+    Attributes:
+        session_key: Key of the session the cart belongs to.
+        item_id: Cart item ID, unique within the cart.
+        product: Cart item's product.
+        product_data: Serialized product snapshot.
+        image: Absolute product image URL.
+        count: Products count.
+        catalog_version: Catalog version stamp the product snapshot was validated against.
+        created_at: Date and time the item was added.
+    """
+    session_key = models.CharField(max_length=40)
+    item_id = models.PositiveIntegerField()
+    product = models.ForeignKey(ChemicalProduct, on_delete=models.CASCADE, related_name='cart_items')
+    product_data = models.JSONField()
+    image = models.URLField(max_length=500, null=True, blank=True)
+    count = models.IntegerField(default=1)
+    catalog_version = models.CharField(max_length=32, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.session_key}: {self.item_id}'
+
+    class Meta:
+        verbose_name = "Cart Item"
+        verbose_name_plural = "Cart Items"
+        ordering = ['session_key', 'item_id']
+        constraints = [
+            models.UniqueConstraint(fields=['session_key', 'item_id'], name='unique_cart_item_id'),
+        ]
+
+
+class CartSequence(models.Model):
+    """
+    Last allocated cart item ID of a ``DatabaseCartStorage`` cart.
+
+    The row is locked while an item is added, so concurrent adds to one cart
+    get distinct item IDs, and IDs of removed items are never reused.
+
+    Attributes:
+        session_key: Key of the session the cart belongs to.
+        last_item_id: Last allocated cart item ID.
+    """
+    session_key = models.CharField(max_length=40, unique=True)
+    last_item_id = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.session_key}: {self.last_item_id}'
+
+    class Meta:
+        verbose_name = "Cart Sequence"
+        verbose_name_plural = "Cart Sequences"
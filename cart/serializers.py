@@ -7,6 +7,7 @@ from rest_framework import serializers
 from decimal import Decimal
 
 from household_chemicals.models import ChemicalProduct
+from .structures import format_cents
 
 class AddCartItemSerializer(serializers.Serializer):
     product = serializers.PrimaryKeyRelatedField(queryset=ChemicalProduct.objects.all())
@@ -28,15 +29,19 @@ class CartItemSerializer(serializers.Serializer):
 
     Attributes:
         id: Cart item ID.
+        product_id: ID of the cart item's product.
         product: Cart item's product.
         count: Products count.
         total_price: Total price of specified amount of products.
+        changes: Price and availability changes since the item was added.
     """
     id = serializers.IntegerField()
+    product_id = serializers.IntegerField(required=False)
     product = CartProductSerializer()
     count = serializers.IntegerField(min_value=1)
     image = serializers.CharField(allow_null=True, required=False)
     total_price = serializers.SerializerMethodField()
+    changes = serializers.DictField(read_only=True)
 
     def get_total_price(self, obj: dict) -> str:
         """
@@ -46,6 +51,70 @@ class CartItemSerializer(serializers.Serializer):
             obj: Serializer object.
 
         Returns:
-            Decimal: Total price.
+            str: Total price.
         """
+        if 'price_cents' in obj:
+            return format_cents(obj['price_cents'] * obj['count'])
         return str(Decimal(obj['product']['price']) * obj['count'])
+
+
+class CartSummarySerializer(serializers.Serializer):
+    """
+    Serializer for representing cart totals.
+
+    Attributes:
+        items: Count of cart items.
+        quantity: Total count of products.
+        subtotal: Total price of all cart items.
+    """
+    items = serializers.IntegerField()
+    quantity = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class CartOperationSerializer(serializers.Serializer):
+    """
+    Serializer for validating a single bulk cart operation.
+
+    Attributes:
+        op: Operation name.
+        product: Product ID, for ``add`` and ``set`` operations.
+        item: Cart item ID, for ``set`` and ``remove`` operations.
+        count: Products count, for ``add`` and ``set`` operations.
+    """
+    OPERATIONS = ('add', 'set', 'remove', 'clear')
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    product = serializers.IntegerField(required=False)
+    item = serializers.IntegerField(required=False)
+    count = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Check that the operation has all required arguments.
+        """
+        op = attrs['op']
+        if op == 'add':
+            if 'product' not in attrs:
+                raise serializers.ValidationError('Product ID is required.')
+            attrs.setdefault('count', 1)
+            if attrs['count'] < 1:
+                raise serializers.ValidationError('Count must be positive.')
+        elif op == 'set':
+            if ('item' in attrs) == ('product' in attrs):
+                raise serializers.ValidationError('Either item or product ID is required.')
+            if 'count' not in attrs:
+                raise serializers.ValidationError('Count is required.')
+        elif op == 'remove' and 'item' not in attrs:
+            raise serializers.ValidationError('Item ID is required.')
+        return attrs
+
+
+class CartBulkSerializer(serializers.Serializer):
+    """
+    Serializer for validating a batch of cart operations.
+
+    Attributes:
+        operations: Operations applied in order.
+    """
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=100)
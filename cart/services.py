@@ -3,48 +3,237 @@ Services for cart app.
 """
 
 from abc import ABC, abstractmethod
-from typing import Callable, Optional
-
-from rest_framework.exceptions import ValidationError
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.contrib.sessions.backends.db import SessionStore as DatabaseSessionStore
+from django.core import signing
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.request import Request
 
-from .crud import get_product_by_id
-from .serializers import CartProductSerializer, CartItemSerializer
+from household_chemicals.models import ChemicalProduct
+from .catalog import get_catalog_version
+from .crud import get_product_by_id, get_products_by_ids, get_products_by_titles
+from .models import CartItem, CartSequence
+from .serializers import CartProductSerializer
+from .structures import Cart, format_cents, to_cents
+
 
 class CartStorage(ABC):
     """
     Cart storage abstraction.
 
+    Storages keeping the whole cart as one value persist it in ``save``. Storages
+    keeping items separately override item hooks, which are called by
+    ``CartManager`` right after the change of the loaded cart.
+
     Methods:
+        from_request: Create storage for current request.
         load: Load storage.
         save: Save changes in storage.
+        add_item: Persist a new cart item.
+        update_count: Persist a change of the cart item count.
+        remove_item: Persist a removal of the cart item.
+        clear_items: Persist a removal of all cart items.
+        refresh_items: Persist refreshed product snapshots.
+
+    Attributes:
+        keeps_snapshots: Whether loaded items carry product snapshots which can go stale.
     """
+    keeps_snapshots = True
+
+    @classmethod
+    @abstractmethod
+    def from_request(cls, request: Request) -> 'CartStorage':
+        """
+        Create storage for current request.
+
+        Args:
+            request: Current HTTP request.
+
+        Returns:
+            CartStorage: Cart storage.
+        """
+        pass
+
     @abstractmethod
-    def load(self) -> list[dict]:
+    def load(self) -> Cart:
         """
         Load storage serialized object.
 
         Returns:
-            list[dict]: Serialized python object for cart serving.
+            Cart: Cart for serving.
         """
         pass
 
     @abstractmethod
-    def save(self, cart: list[dict]) -> None:
+    def save(self, cart: Cart) -> bool:
         """
         Save changes in serialized object to storage.
 
         Args:
-            cart: Serialized python object with changes.
+            cart: Cart with changes.
+
+        Returns:
+            bool: False if the stored cart was changed concurrently since it was
+                loaded and nothing was saved.
+        """
+        pass
+
+    def add_item(self, cart_item: dict) -> Optional[int]:
+        """
+        Persist a new cart item.
+
+        Args:
+            cart_item: Cart item.
+
+        Returns:
+            Optional[int]: ID the item was stored with, if the storage allocates item IDs itself.
+        """
+        pass
+
+    def update_count(self, item_id: int, delta: int) -> None:
+        """
+        Persist a change of the cart item count. Items with zero count are removed.
+
+        Args:
+            item_id: Cart item ID.
+            delta: Difference between new count and old count.
+        """
+        pass
+
+    def remove_item(self, item_id: int) -> None:
+        """
+        Persist a removal of the cart item.
+
+        Args:
+            item_id: Cart item ID.
         """
         pass
 
+    def clear_items(self) -> None:
+        """
+        Persist a removal of all cart items.
+        """
+        pass
+
+    def refresh_items(self, cart: Cart, items: list[dict]) -> None:
+        """
+        Persist refreshed product snapshots and the catalog version of the cart.
+
+        Args:
+            cart: Revalidated cart.
+            items: Cart items whose product snapshots were changed.
+        """
+        pass
+
+
+def build_image_url(request: Request, product: ChemicalProduct):
+    """
+    Get absolute URL of the product image.
+
+    Args:
+        request: Current HTTP request.
+        product: Product.
+
+    Returns:
+        Optional[str]: Image URL or None if product has no image.
+    """
+    return request.build_absolute_uri(product.image.url) if product.image else None
+
+
+def cart_from_legacy(items: list[dict]) -> Cart:
+    """
+    Convert cart stored as a list of serialized items, which have no product IDs.
+
+    Products are matched by title in one query, items of products which don't
+    exist anymore are dropped.
+
+    Args:
+        items: Cart items in the legacy format.
+
+    Returns:
+        Cart: Converted cart.
+    """
+    products = get_products_by_titles(item['product']['title'] for item in items)
+    cart = Cart()
+    for item in sorted(items, key=lambda legacy_item: legacy_item['id']):
+        product = products.get(item['product']['title'])
+        if product is None or product.pk in cart.products:
+            continue
+        cart.add(product.pk, item['product'], item['count'], item.get('image'), item_id=item['id'])
+    return cart
+
+
+def revalidate_cart(storage: CartStorage, cart: Cart) -> dict[int, dict]:
+    """
+    Refresh product snapshots of the cart from the catalog in one query.
+
+    Empty carts and carts validated against the current catalog version are
+    skipped without querying products or writing the storage, so reading an
+    empty cart never creates a session. Items of deleted products are kept as
+    unavailable.
+
+    Args:
+        storage: Storage the cart was loaded from.
+        cart: Loaded cart.
+
+    Returns:
+        dict[int, dict]: Price and availability changes by cart item ID, each
+            as ``{'old': ..., 'new': ...}``.
+    """
+    if not storage.keeps_snapshots or not cart:
+        return {}
+    version = get_catalog_version()
+    if cart.catalog_version == version:
+        return {}
+
+    products = get_products_by_ids(cart.products)
+    changes = {}
+    refreshed = []
+    for item in cart:
+        product = products.get(item['product_id'])
+        old = item['product']
+        if product is None:
+            current = {**old, 'is_available': False}
+        else:
+            current = dict(CartProductSerializer(product).data)
+
+        item_changes = {}
+        price_cents = to_cents(current['price'])
+        if price_cents != item['price_cents']:
+            item_changes['price'] = {'old': format_cents(item['price_cents']), 'new': format_cents(price_cents)}
+        if current['is_available'] != old['is_available']:
+            item_changes['is_available'] = {'old': old['is_available'], 'new': current['is_available']}
+        if item_changes:
+            changes[item['id']] = item_changes
+        if current != old:
+            cart.refresh_product(item['id'], current)
+            refreshed.append(item)
+
+    cart.catalog_version = version
+    storage.refresh_items(cart, refreshed)
+    storage.save(cart)
+    return changes
+
 
 class SessionCartStorage(CartStorage):
     """
     Cart storage realization with Django session.
+
+    With the database session engine the cart is written right away with a
+    compare-and-swap on the session row, instead of the whole session being
+    saved at the end of the request. A request which loaded the cart before a
+    concurrent write gets ``False`` from ``save`` and has to reload and retry,
+    so concurrent changes are never silently overwritten.
     """
-    def __init__(self, session: dict, session_key: str) -> None:
+    def __init__(self, session: SessionBase, session_key: str) -> None:
         """
         Init a session storage.
 
@@ -55,47 +244,529 @@ class SessionCartStorage(CartStorage):
         self.session = session
         self.session_key = session_key
 
-    def load(self) -> list[dict]:
+    @classmethod
+    def from_request(cls, request: Request) -> 'SessionCartStorage':
+        """
+        Create session storage for current request.
+
+        Args:
+            request: Current HTTP request.
+
+        Returns:
+            SessionCartStorage: Cart storage.
+        """
+        return cls(request.session, settings.CART_SESSION_ID)
+
+    @property
+    def supports_cas(self) -> bool:
+        """
+        Whether session rows can be written with compare-and-swap.
+        """
+        return isinstance(self.session, DatabaseSessionStore)
+
+    def _read_session_data(self) -> Optional[str]:
+        """
+        Read encoded data of the current session row.
+
+        Returns:
+            Optional[str]: Encoded session data or None if the session isn't stored.
+        """
+        if not self.session.session_key:
+            return None
+        rows = self.session.model.objects.filter(session_key=self.session.session_key, expire_date__gt=timezone.now())
+        return rows.values_list('session_data', flat=True).first()
+
+    def _sync_session(self, cart_data: Optional[dict]) -> None:
+        """
+        Put stored cart into the loaded session without marking it modified, so
+        the session middleware doesn't overwrite the row with a stale copy.
+
+        Args:
+            cart_data: Stored cart or None if there is no cart.
+        """
+        if cart_data is None:
+            self.session._session.pop(self.session_key, None)
+        else:
+            self.session._session[self.session_key] = cart_data
+
+    def load(self) -> Cart:
+        """
+        Load current session cart. Carts in the legacy list format are converted
+        and written back, so the conversion happens once per session.
+
+        Returns:
+            Cart: Current cart.
+        """
+        data = self.session.get(self.session_key)
+        if not data:
+            return Cart()
+        if isinstance(data, list):
+            cart = cart_from_legacy(data)
+            self.save(cart)
+            return cart
+        return Cart.from_dict(data)
+
+    def save(self, cart: Cart) -> bool:
+        """
+        Save changed cart to session, increasing its revision.
+
+        The stored cart must have the revision the cart was loaded with, and the
+        session row is updated only if it wasn't changed since it was read. On
+        conflict the loaded session is refreshed, so the next ``load`` returns
+        the stored cart.
+
+        Args:
+            cart: Modified cart.
+
+        Returns:
+            bool: False if the stored cart was changed since it was loaded.
+        """
+        cart_data = {**cart.to_dict(), 'revision': cart.revision + 1}
+        session_data = self._read_session_data() if self.supports_cas else None
+        if session_data is None:
+            self.session[self.session_key] = cart_data
+            self.session.modified = True
+            cart.revision += 1
+            return True
+
+        stored = self.session.decode(session_data)
+        stored_cart = stored.get(self.session_key)
+        stored_revision = stored_cart.get('revision', 0) if isinstance(stored_cart, dict) else 0
+        if stored_revision != cart.revision:
+            self._sync_session(stored_cart)
+            return False
+
+        stored[self.session_key] = cart_data
+        updated = self.session.model.objects.filter(
+            session_key=self.session.session_key,
+            session_data=session_data,
+        ).update(session_data=self.session.encode(stored), expire_date=self.session.get_expiry_date())
+        if not updated:
+            return False
+
+        self._sync_session(cart_data)
+        cart.revision += 1
+        return True
+
+
+class DatabaseCartStorage(CartStorage):
+    """
+    Cart storage realization with a row per cart item.
+
+    Every cart change touches a single small row instead of rewriting the whole
+    session, and count changes are atomic ``F()`` updates.
+    """
+    def __init__(self, session) -> None:
+        """
+        Init a database storage.
+
+        Args:
+            session: Current request session, its key identifies the cart.
+        """
+        self.session = session
+
+    @classmethod
+    def from_request(cls, request: Request) -> 'DatabaseCartStorage':
+        """
+        Create database storage for current request.
+
+        Args:
+            request: Current HTTP request.
+
+        Returns:
+            DatabaseCartStorage: Cart storage.
+        """
+        return cls(request.session)
+
+    @property
+    def session_key(self) -> str:
+        """
+        Get key of the current session, creating the session on first cart write.
+        """
+        if not self.session.session_key:
+            self.session.save()
+        return self.session.session_key
+
+    def items(self):
+        """
+        Get queryset of current cart items.
+        """
+        return CartItem.objects.filter(session_key=self.session_key)
+
+    def load(self) -> Cart:
+        """
+        Load current cart items.
+
+        Returns:
+            Cart: Current cart.
+        """
+        cart = Cart()
+        self.row_ids = {}
+        if not self.session.session_key:
+            return cart
+        rows = self.items().order_by('item_id').values_list(
+            'pk', 'item_id', 'product_id', 'product_data', 'count', 'image', 'catalog_version',
+        )
+        versions = set()
+        for pk, item_id, product_id, product_data, count, image, catalog_version in rows:
+            cart.add(product_id, product_data, count, image, item_id=item_id)
+            self.row_ids[item_id] = pk
+            versions.add(catalog_version)
+        if len(versions) == 1:
+            cart.catalog_version = versions.pop()
+        return cart
+
+    def save(self, cart: Cart) -> bool:
+        """
+        Nothing to save, every change is persisted by item hooks.
+        """
+        return True
+
+    def add_item(self, cart_item: dict) -> int:
         """
-        Load current session cart.
+        Insert a new cart item row, allocating its item ID under the lock of the cart sequence.
+
+        Adds to one cart are serialized by the lock, so concurrent adds never get
+        the same item ID. If the product was added concurrently since the cart was
+        loaded, the count of its row is increased instead.
+
+        Args:
+            cart_item: Cart item.
 
         Returns:
-            list[dict]: Current cart.
+            int: ID of the stored item.
+        """
+        session_key = self.session_key
+        with transaction.atomic():
+            CartSequence.objects.bulk_create([CartSequence(session_key=session_key)], ignore_conflicts=True)
+            sequence = CartSequence.objects.select_for_update().get(session_key=session_key)
+            item_id = self.items().filter(product_id=cart_item['product_id']).values_list('item_id', flat=True).first()
+            if item_id is not None:
+                self.update_count(item_id, cart_item['count'])
+                return item_id
+
+            item_id = max(sequence.last_item_id + 1, cart_item['id'])
+            sequence.last_item_id = item_id
+            sequence.save(update_fields=['last_item_id'])
+            CartItem.objects.create(
+                session_key=session_key,
+                item_id=item_id,
+                product_id=cart_item['product_id'],
+                product_data=cart_item['product'],
+                image=cart_item['image'],
+                count=cart_item['count'],
+            )
+        return item_id
+
+    def update_count(self, item_id: int, delta: int) -> None:
+        """
+        Atomically change the cart item count, deleting the row when it drops to zero.
+
+        Args:
+            item_id: Cart item ID.
+            delta: Difference between new count and old count.
         """
-        return self.session.get(self.session_key, [])
+        items = self.items().filter(item_id=item_id)
+        items.update(count=F('count') + delta)
+        if delta < 0:
+            items.filter(count__lte=0).delete()
 
-    def save(self, cart: list[dict]) -> None:
+    def remove_item(self, item_id: int) -> None:
         """
-        Save changed cart to session.
+        Delete the cart item row.
+
+        Args:
+            item_id: Cart item ID.
+        """
+        self.items().filter(item_id=item_id).delete()
+
+    def clear_items(self) -> None:
+        """
+        Delete all rows of the cart.
+        """
+        self.items().delete()
+
+    def refresh_items(self, cart: Cart, items: list[dict]) -> None:
+        """
+        Update product snapshots of refreshed rows in one query and mark all rows validated.
+
+        Args:
+            cart: Revalidated cart.
+            items: Cart items whose product snapshots were changed.
+        """
+        if not cart:
+            return
+        CartItem.objects.bulk_update(
+            [CartItem(pk=self.row_ids[item['id']], product_data=item['product']) for item in items],
+            ['product_data'],
+        )
+        self.items().update(catalog_version=cart.catalog_version)
+
+
+class CookieCartStorage(CartStorage):
+    """
+    Cart storage realization with a signed and compressed cookie.
+
+    Only item IDs, product IDs and counts are kept in the cookie, product data
+    is loaded in one query on read. Carts whose cookie would exceed
+    ``CART_COOKIE_MAX_SIZE`` are kept in the session instead, and the cookie
+    only marks that. Small carts never touch the sessions table.
+
+    The cookie is written to the response by ``CartCookieMiddleware``.
+    """
+    keeps_snapshots = False
+    SALT = 'cart.cookie'
+    SESSION_MARKER = 'session'
+
+    def __init__(self, request: Request) -> None:
+        """
+        Init a cookie storage.
+
+        Args:
+            request: Current HTTP request.
+        """
+        self.request = request
+
+    @classmethod
+    def from_request(cls, request: Request) -> 'CookieCartStorage':
+        """
+        Create cookie storage for current request.
+
+        Args:
+            request: Current HTTP request.
+
+        Returns:
+            CookieCartStorage: Cart storage.
+        """
+        return cls(request)
+
+    @property
+    def overflow_key(self) -> str:
+        """
+        Get session key of carts too big for the cookie.
+        """
+        return f'{settings.CART_SESSION_ID}_overflow'
+
+    def _load_payload(self) -> dict:
+        """
+        Load compact cart from the cookie or from the session on overflow.
+
+        Returns:
+            dict: Next item ID (``n``) and item rows (``i``) of item ID, product ID and count.
+        """
+        value = self.request.COOKIES.get(settings.CART_COOKIE_NAME)
+        if not value:
+            return {'n': 1, 'i': []}
+        if value == self.SESSION_MARKER:
+            payload = self.request.session.get(self.overflow_key, [])
+        else:
+            try:
+                payload = signing.loads(value, salt=self.SALT)
+            except signing.BadSignature:
+                return {'n': 1, 'i': []}
+        if isinstance(payload, list):
+            payload = {'n': max((row[0] for row in payload), default=0) + 1, 'i': payload}
+        return payload
+
+    def load(self) -> Cart:
+        """
+        Load current cart, fetching products of all items in one query.
+
+        Returns:
+            Cart: Current cart.
+        """
+        payload = self._load_payload()
+        products = get_products_by_ids(product_id for _, product_id, _ in payload['i'])
+
+        cart = Cart()
+        for item_id, product_id, count in payload['i']:
+            product = products.get(product_id)
+            if product is not None:
+                cart.add(
+                    product_id,
+                    CartProductSerializer(product).data,
+                    count,
+                    build_image_url(self.request, product),
+                    item_id=item_id,
+                )
+        cart.next_id = max(cart.next_id, payload['n'])
+        return cart
+
+    def save(self, cart: Cart) -> bool:
+        """
+        Write compact cart to the cookie, or to the session if the cookie gets too big.
 
         Args:
             cart: Modified cart.
+
+        Returns:
+            bool: Always True, the cookie is owned by a single client.
         """
-        self.session[self.session_key] = cart
-        self.session.modified = True
+        payload = {'n': cart.next_id, 'i': [[item['id'], item['product_id'], item['count']] for item in cart]}
+        value = signing.dumps(payload, salt=self.SALT, compress=True) if len(cart) else ''
+        http_request = getattr(self.request, '_request', self.request)
+
+        if len(value) > settings.CART_COOKIE_MAX_SIZE:
+            self.request.session[self.overflow_key] = payload
+            value = self.SESSION_MARKER
+        elif self.request.COOKIES.get(settings.CART_COOKIE_NAME) == self.SESSION_MARKER:
+            self.request.session.pop(self.overflow_key, None)
+        http_request.cart_cookie = value
+        return True
+
+
+def get_cart_storage_class() -> type[CartStorage]:
+    """
+    Get cart storage class selected by ``CART_STORAGE`` setting.
+
+    Returns:
+        type[CartStorage]: Cart storage class.
+    """
+    return import_string(getattr(settings, 'CART_STORAGE', 'cart.services.SessionCartStorage'))
+
+
+class CartConflict(APIException):
+    """
+    Cart was changed by concurrent requests more times than the manager retries.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Cart was changed concurrently, please retry.'
+    default_code = 'cart_conflict'
 
 
 class CartManager:
     """
     Manager for working with cart.
+
+    Every change is recorded as an operation keyed by product ID. When the
+    storage reports a concurrent write on save, the cart is reloaded and the
+    recorded operations are replayed on top of it. Increments and additions
+    commute, so concurrent clicks are merged instead of lost, while ``set``,
+    ``remove`` and ``clear`` win over earlier concurrent changes.
+
+    Attributes:
+        MAX_ATTEMPTS: Save attempts before giving up with ``CartConflict``.
     """
+    MAX_ATTEMPTS = 5
+
     def __init__(self, storage: CartStorage, request: Request):
         self.storage = storage
         self.request = request
+        self.operations = []
 
     def __enter__(self):
         self.cart = self.storage.load()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
-        if not exc_type:
-            self.storage.save(self.cart)
+        if exc_type:
+            return False
+        if not self.operations:
             return True
-        return False
+        for _ in range(self.MAX_ATTEMPTS):
+            if self.storage.save(self.cart):
+                return True
+            self.cart = self.storage.load()
+            for operation in self.operations:
+                self._apply(operation)
+        raise CartConflict()
+
+    def _apply(self, operation: dict) -> None:
+        """
+        Apply operation to the loaded cart and persist it with storage hooks.
+
+        Operations referring to products which aren't in the cart anymore are skipped.
+
+        Args:
+            operation: Operation with ``op`` name and its arguments.
+        """
+        op = operation['op']
+        if op == 'clear':
+            self.cart.clear()
+            self.storage.clear_items()
+            return
+
+        cart_item = self.cart.find_by_product(operation['product_id'])
+        if cart_item is None:
+            if op in ('add', 'set') and operation['count']:
+                cart_item = self.cart.add(
+                    operation['product_id'], operation['product'], operation['count'], operation['image'],
+                )
+                item_id = self.storage.add_item(cart_item)
+                if item_id is not None and item_id != cart_item['id']:
+                    self.cart.renumber(cart_item['id'], item_id)
+        elif op == 'remove':
+            self.cart.remove(cart_item['id'])
+            self.storage.remove_item(cart_item['id'])
+        else:
+            if op == 'set':
+                delta = self.cart.set_count(cart_item['id'], operation['count'])
+            else:
+                delta = operation['count']
+                self.cart.apply_delta(cart_item['id'], delta)
+            if delta:
+                self.storage.update_count(cart_item['id'], delta)
+
+    def _record(self, operation: dict) -> None:
+        """
+        Apply operation and record it for replay on conflict.
+
+        Args:
+            operation: Operation with ``op`` name and its arguments.
+        """
+        self._apply(operation)
+        self.operations.append(operation)
+
+    def get_item(self, item_id: int) -> dict:
+        """
+        Get cart item by ID.
+
+        Args:
+            item_id: Item ID.
+
+        Raises:
+            ValidationError: If item isn't found.
+        """
+        cart_item = self.cart.get(item_id)
+        if cart_item is None:
+            raise ValidationError(detail='Cart item not found.')
+        return cart_item
+
+    def _add_product(self, product: ChemicalProduct, count: int) -> None:
+        """
+        Add product to the cart, increasing count of its item if it's already in the cart.
+
+        Args:
+            product: Product.
+            count: Products count.
+        """
+        self._record({
+            'op': 'add',
+            'product_id': product.pk,
+            'product': dict(CartProductSerializer(product).data),
+            'image': build_image_url(self.request, product),
+            'count': count,
+        })
+
+    def _set_count(self, cart_item: dict, count: int) -> None:
+        """
+        Set count of the cart item, removing it when the count is zero.
+
+        Args:
+            cart_item: Cart item.
+            count: New products count.
+        """
+        self._record({
+            'op': 'set',
+            'product_id': cart_item['product_id'],
+            'product': cart_item['product'],
+            'image': cart_item['image'],
+            'count': count,
+        })
 
     def add_to_cart(self, item_data: dict) -> None:
         """
-        Add item to the cart.
+        Add item to the cart. Adding a product already in the cart increases its count.
 
         Args:
             item_data: Item data.
@@ -107,23 +778,58 @@ class CartManager:
         product_id = item_data.get('product')
         if not product_id:
             raise ValidationError(detail='Product ID is required')
-        product = get_product_by_id(product_id)
-        product_data = CartProductSerializer(product).data
+        try:
+            count = int(item_data['count'])
+        except (TypeError, ValueError):
+            raise ValidationError(detail='Invalid request data: count must be an integer.')
+        if count < 1:
+            raise ValidationError(detail='Invalid request data: count must be positive.')
+        self._add_product(get_product_by_id(product_id), count)
+
+    def apply_operations(self, operations: list[dict]) -> None:
+        """
+        Apply a batch of cart operations, fetching all referenced products in one query.
 
-        if self.cart:
-            duplicate_index = check_duplicate(self.cart, product_data['title'])
-            if isinstance(duplicate_index, int):
-                increment_item_count(self.cart, duplicate_index)
-                return
+        Operations are applied in order, each is a dict with ``op`` and its arguments:
+        ``add`` (``product``, ``count``), ``set`` (``item`` or ``product``, ``count``),
+        ``remove`` (``item``) and ``clear``. Setting count of a product missing in the
+        cart adds it. Nothing is saved if any operation fails, storages persisting
+        items separately must be used inside a transaction.
 
-        item_data['id'] = max([cart_item['id'] for cart_item in self.cart], default=0) + 1
-        item_data['product'] = product_data
-        item_data['image'] = self.request.build_absolute_uri(product.image.url) if product.image else None
+        Args:
+            operations: Validated operations.
 
-        cart_item = CartItemSerializer(data=item_data)
-        if not cart_item.is_valid():
-            raise ValidationError(detail=f'Invalid request data: {cart_item.errors}')
-        self.cart.append(cart_item.data)
+        Raises:
+            ValidationError: If a product or cart item isn't found.
+        """
+        product_ids = {operation['product'] for operation in operations if 'product' in operation}
+        products = get_products_by_ids(product_ids)
+        missing = product_ids - products.keys()
+        if missing:
+            raise ValidationError(detail=f'Products not found: {sorted(missing)}.')
+
+        for operation in operations:
+            op = operation['op']
+            if op == 'clear':
+                self.clear()
+            elif op == 'remove':
+                self.remove_from_cart(operation['item'])
+            elif op == 'add':
+                self._add_product(products[operation['product']], operation['count'])
+            elif 'item' in operation:
+                self._set_count(self.get_item(operation['item']), operation['count'])
+            else:
+                cart_item = self.cart.find_by_product(operation['product'])
+                if cart_item is not None:
+                    self._set_count(cart_item, operation['count'])
+                elif operation['count']:
+                    self._add_product(products[operation['product']], operation['count'])
+
+    def clear(self) -> None:
+        """
+        Remove all items from cart.
+        """
+        self._record({'op': 'clear'})
 
     def remove_from_cart(self, item_id: int) -> None:
         """
@@ -132,80 +838,16 @@ class CartManager:
         Args:
             item_id: Item ID.
         """
-        for cart_item in self.cart:
-            if cart_item.get('id') == item_id:
-                self.cart.remove(cart_item)
-                break
-        else:
-            raise ValidationError(detail='Cart item not found.')
+        cart_item = self.get_item(item_id)
+        self._record({'op': 'remove', 'product_id': cart_item['product_id']})
 
     def update_quantity(self, item_id: int, delta: int) -> None:
-        if item_id not in [cart_item['id'] for cart_item in self.cart]:
-            raise ValidationError(detail='Cart item not found.')
-        apply_item_delta(
-            cart=self.cart,
-            item_id=item_id,
-            delta=delta,
-            on_zero=remove_if_zero,
-        )
-
-
-def increment_item_count(cart: list, index: int) -> None:
-    """
-    Increment item count in the cart.
-
-    Args:
-        cart: Current cart.
-        index: Item cart index.
-    """
-    cart[index]['count'] += 1
-
-
-def check_duplicate(cart: list, product_title: str) -> Optional[int]:
-    """
-    Check cart on duplicates. If found, returns index.
-
-    Args:
-        cart: Current cart.
-        product_title: Product title.
-
-    Returns:
-        Optional[int]: If found, returns index, else None
-    """
-    for index, cart_item in enumerate(cart):
-        if product_title == cart_item['product']['title']:
-            return index
-
-
-def remove_if_zero(cart: list, cart_item: dict) -> None:
-    """
-    Specifies actions for item count equals 0 scenario.
-
-    Args:
-        cart: Current cart.
-        cart_item: Cart item, which count is equals 0.
-    """
-    cart.remove(cart_item)
-
-
-def apply_item_delta(
-        cart: list,
-        item_id: int,
-        delta: int,
-        on_zero: Callable[[list, dict], None] = None
-):
-    """
-    Specifies actions for item count equals 0 scenario.
+        """
+        Change count of the cart item, removing it when the count drops to zero.
 
-    Args:
-        cart: Current cart.
-        item_id: Item for changing.
-        delta: Difference between new value and old value.
-        on_zero: Action for objects, which count equals zero.
-    """
-    for cart_item in cart:
-        if cart_item.get('id') == item_id:
-            cart_item['count'] += delta
-            if cart_item['count'] == 0 and on_zero:
-                on_zero(cart, cart_item)
-            break
+        Args:
+            item_id: Item ID.
+            delta: Difference between new count and old count.
+        """
+        cart_item = self.get_item(item_id)
+        self._record({'op': 'delta', 'product_id': cart_item['product_id'], 'count': delta})
@@ -0,0 +1,20 @@
+"""
+Signals for cart app.
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from household_chemicals.models import ChemicalProduct
+from household_chemicals.signals import stock_changed
+from .catalog import bump_catalog_version
+
+
+def connect_catalog_signals() -> None:
+    """
+    Bump catalog version on every product save, delete and stock change.
+
+    Other bulk ``QuerySet.update`` calls don't send signals and must bump the version explicitly.
+    """
+    post_save.connect(bump_catalog_version, sender=ChemicalProduct, dispatch_uid='cart-catalog-save')
+    post_delete.connect(bump_catalog_version, sender=ChemicalProduct, dispatch_uid='cart-catalog-delete')
+    stock_changed.connect(bump_catalog_version, sender=ChemicalProduct, dispatch_uid='cart-catalog-stock')
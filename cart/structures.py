@@ -0,0 +1,298 @@
+"""
+Indexed cart structure.
+
+Items are kept by item ID with an index by product ID, item IDs are allocated
+monotonically, and subtotal (in integer cents) and quantity are maintained on
+every change. All operations are constant time.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterator, Optional, Union
+
+CART_FORMAT_VERSION = 3
+ITEM_FIELDS = ('id', 'product_id', 'count', 'price_cents', 'image')
+
+
+def to_cents(price: Union[Decimal, str, int, float]) -> int:
+    """
+    Convert price to integer cents.
+
+    Args:
+        price: Price in dollars.
+
+    Returns:
+        int: Price in cents.
+    """
+    return int((Decimal(str(price)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def format_cents(cents: int) -> str:
+    """
+    Format integer cents as a decimal string, e.g. ``1250`` as ``'12.50'``.
+
+    Args:
+        cents: Amount in cents.
+
+    Returns:
+        str: Amount in dollars.
+    """
+    sign = '-' if cents < 0 else ''
+    dollars, cents = divmod(abs(cents), 100)
+    return f'{sign}{dollars}.{cents:02d}'
+
+
+class Cart:
+    """
+    Cart with constant-time item operations and running totals.
+
+    Attributes:
+        items: Cart items by item ID, in order of addition.
+        products: Item IDs by product ID.
+        next_id: ID of the next added item.
+        subtotal_cents: Total price of all items in cents.
+        quantity: Total count of all items.
+        catalog_version: Catalog version stamp the product snapshots were validated against.
+        revision: Number of saves of the stored cart, used for optimistic concurrency.
+    """
+    def __init__(self) -> None:
+        self.items: dict[int, dict] = {}
+        self.products: dict[int, int] = {}
+        self.next_id = 1
+        self.subtotal_cents = 0
+        self.quantity = 0
+        self.catalog_version = ''
+        self.revision = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.items.values())
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self.items
+
+    def get(self, item_id: int) -> Optional[dict]:
+        """
+        Get cart item by its ID.
+        """
+        return self.items.get(item_id)
+
+    def find_by_product(self, product_id: int) -> Optional[dict]:
+        """
+        Get cart item of the product.
+        """
+        item_id = self.products.get(product_id)
+        return None if item_id is None else self.items[item_id]
+
+    def _account(self, item: dict, count_delta: int) -> None:
+        self.subtotal_cents += item['price_cents'] * count_delta
+        self.quantity += count_delta
+
+    def add(
+            self,
+            product_id: int,
+            product: dict,
+            count: int = 1,
+            image: Optional[str] = None,
+            item_id: Optional[int] = None,
+    ) -> dict:
+        """
+        Add a new cart item.
+
+        Args:
+            product_id: ID of the product.
+            product: Serialized product snapshot with ``title``, ``price`` and ``is_available``.
+            count: Products count.
+            image: Absolute product image URL.
+            item_id: Explicit item ID, used when restoring a stored cart.
+
+        Returns:
+            dict: Added cart item.
+        """
+        if item_id is None:
+            item_id = self.next_id
+        self.next_id = max(self.next_id, item_id + 1)
+        item = {
+            'id': item_id,
+            'product_id': product_id,
+            'product': product,
+            'price_cents': to_cents(product['price']),
+            'count': count,
+            'image': image,
+        }
+        self.items[item_id] = item
+        self.products[product_id] = item_id
+        self._account(item, count)
+        return item
+
+    def apply_delta(self, item_id: int, delta: int) -> int:
+        """
+        Change count of the cart item, removing it when the count drops to zero.
+
+        Args:
+            item_id: Cart item ID.
+            delta: Difference between new count and old count.
+
+        Returns:
+            int: New count.
+        """
+        item = self.items[item_id]
+        delta = max(delta, -item['count'])
+        item['count'] += delta
+        self._account(item, delta)
+        if item['count'] == 0:
+            self.remove(item_id)
+        return item['count']
+
+    def refresh_product(self, item_id: int, product: dict) -> None:
+        """
+        Replace product snapshot of the cart item, updating the subtotal.
+
+        Args:
+            item_id: Cart item ID.
+            product: Current serialized product.
+        """
+        item = self.items[item_id]
+        self._account(item, -item['count'])
+        item['product'] = product
+        item['price_cents'] = to_cents(product['price'])
+        self._account(item, item['count'])
+
+    def set_count(self, item_id: int, count: int) -> int:
+        """
+        Set count of the cart item, removing it when the count is zero.
+
+        Returns:
+            int: Difference between new count and old count.
+        """
+        delta = count - self.items[item_id]['count']
+        self.apply_delta(item_id, delta)
+        return delta
+
+    def remove(self, item_id: int) -> dict:
+        """
+        Remove the cart item.
+
+        Returns:
+            dict: Removed cart item.
+        """
+        item = self.items.pop(item_id)
+        del self.products[item['product_id']]
+        self._account(item, -item['count'])
+        return item
+
+    def renumber(self, item_id: int, new_id: int) -> dict:
+        """
+        Change ID of the cart item, e.g. to the ID a storage allocated for it.
+
+        Returns:
+            dict: Renumbered cart item.
+        """
+        item = self.items.pop(item_id)
+        item['id'] = new_id
+        self.items[new_id] = item
+        self.products[item['product_id']] = new_id
+        self.next_id = max(self.next_id, new_id + 1)
+        return item
+
+    def clear(self) -> None:
+        """
+        Remove all cart items. Item IDs are not reused.
+        """
+        self.items.clear()
+        self.products.clear()
+        self.subtotal_cents = 0
+        self.quantity = 0
+
+    def as_list(self) -> list[dict]:
+        """
+        Get cart items in API representation.
+
+        Returns:
+            list[dict]: Cart items with total prices.
+        """
+        return [
+            {
+                'id': item['id'],
+                'product_id': item['product_id'],
+                'product': item['product'],
+                'count': item['count'],
+                'image': item['image'],
+                'total_price': format_cents(item['price_cents'] * item['count']),
+            }
+            for item in self.items.values()
+        ]
+
+    def summary(self) -> dict:
+        """
+        Get cart totals.
+        """
+        return {
+            'items': len(self.items),
+            'quantity': self.quantity,
+            'subtotal': format_cents(self.subtotal_cents),
+        }
+
+    def to_dict(self) -> dict:
+        """
+        Get compact JSON-serializable representation for storing.
+
+        Items are stored as rows of ``ITEM_FIELDS`` followed by product values
+        in order of ``product_fields``, so field names aren't repeated per item.
+        Products with other fields are stored as dicts.
+        """
+        items = list(self.items.values())
+        product_fields = list(items[0]['product']) if items else []
+        rows = []
+        for item in items:
+            row = [item[field] for field in ITEM_FIELDS]
+            product = item['product']
+            if list(product) == product_fields:
+                row.extend(product.values())
+            else:
+                row.append(product)
+            rows.append(row)
+        return {
+            'version': CART_FORMAT_VERSION,
+            'next_id': self.next_id,
+            'product_fields': product_fields,
+            'items': rows,
+            'subtotal_cents': self.subtotal_cents,
+            'quantity': self.quantity,
+            'catalog_version': self.catalog_version,
+            'revision': self.revision,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Cart':
+        """
+        Restore cart stored with ``to_dict``, including carts stored with item dicts.
+        """
+        cart = cls()
+        product_fields = data.get('product_fields', [])
+        for row in data['items']:
+            if isinstance(row, dict):
+                item = row
+            else:
+                item_id, product_id, count, price_cents, image, *values = row
+                if len(values) == 1 and isinstance(values[0], dict):
+                    product = values[0]
+                else:
+                    product = dict(zip(product_fields, values))
+                item = {
+                    'id': item_id,
+                    'product_id': product_id,
+                    'product': product,
+                    'price_cents': price_cents,
+                    'count': count,
+                    'image': image,
+                }
+            cart.items[item['id']] = item
+            cart.products[item['product_id']] = item['id']
+        cart.next_id = data['next_id']
+        cart.subtotal_cents = data['subtotal_cents']
+        cart.quantity = data['quantity']
+        cart.catalog_version = data.get('catalog_version', '')
+        cart.revision = data.get('revision', 0)
+        return cart
@@ -0,0 +1,421 @@
+import io
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.signing import JSONSerializer
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.urls import reverse
+from django.utils import timezone
+
+from cart.management.commands.benchmark_session_serializer import build_sample_cart, build_sample_session, item_dicts
+from cart.models import CartItem, CartSequence
+from cart.services import CartConflict, CartManager, DatabaseCartStorage, SessionCartStorage
+from cart.structures import Cart
+from household_chemicals.models import ChemicalProduct
+
+
+class CartApiTestMixin:
+    def setUp(self):
+        self.soap = ChemicalProduct.objects.create(title='Soap', price='2.50')
+        self.bleach = ChemicalProduct.objects.create(title='Bleach', price='4.00')
+
+    def get_cart(self):
+        response = self.client.get(reverse('cart-list'), secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def add(self, product, count=1):
+        return self.client.post(reverse('add-cart-item'), {'product': product.pk, 'count': count},
+                                content_type='application/json', secure=True)
+
+    def patch(self, name, item_id):
+        return self.client.patch(reverse(name, kwargs={'pk': item_id}), secure=True)
+
+    def test_add_and_list(self):
+        self.assertEqual(self.add(self.soap, 2).status_code, 201)
+        self.add(self.bleach)
+
+        cart = self.get_cart()
+        self.assertEqual([(item['id'], item['product']['title'], item['count']) for item in cart],
+                         [(1, 'Soap', 2), (2, 'Bleach', 1)])
+
+    def test_add_duplicate_increments_count(self):
+        self.add(self.soap)
+        self.add(self.soap)
+        self.assertEqual([item['count'] for item in self.get_cart()], [2])
+
+    def test_increase_decrease_and_remove(self):
+        self.add(self.soap)
+        self.add(self.bleach)
+
+        self.assertEqual(self.patch('cart-item-increase', 1).status_code, 200)
+        self.assertEqual(self.get_cart()[0]['count'], 2)
+
+        self.patch('cart-item-decrease', 2)
+        self.assertEqual([item['id'] for item in self.get_cart()], [1])
+
+        self.assertEqual(self.client.delete(reverse('remove-cart-item', kwargs={'pk': 1}), secure=True).status_code,
+                         204)
+        self.assertEqual(self.get_cart(), [])
+
+    def test_unknown_item(self):
+        self.assertEqual(self.patch('cart-item-increase', 42).status_code, 404)
+
+    def test_summary(self):
+        self.add(self.soap, 3)
+        self.add(self.bleach)
+        self.patch('cart-item-decrease', 1)
+
+        response = self.client.get(reverse('cart-summary'), secure=True)
+        self.assertEqual(response.json(), {'items': 2, 'quantity': 3, 'subtotal': '9.00'})
+        self.assertEqual([item['total_price'] for item in self.get_cart()], ['5.00', '4.00'])
+
+    def bulk(self, *operations):
+        return self.client.post(reverse('cart-bulk'), {'operations': operations},
+                                content_type='application/json', secure=True)
+
+    def test_bulk_operations(self):
+        self.add(self.soap)
+        response = self.bulk(
+            {'op': 'set', 'item': 1, 'count': 12},
+            {'op': 'add', 'product': self.bleach.pk, 'count': 2},
+            {'op': 'set', 'product': self.bleach.pk, 'count': 3},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['summary'], {'items': 2, 'quantity': 15, 'subtotal': '42.00'})
+        self.assertEqual([(item['id'], item['count']) for item in self.get_cart()], [(1, 12), (2, 3)])
+
+        self.bulk({'op': 'clear'}, {'op': 'set', 'product': self.soap.pk, 'count': 1}, {'op': 'remove', 'item': 3})
+        self.assertEqual(self.get_cart(), [])
+
+    def test_bulk_is_atomic(self):
+        self.add(self.soap)
+        response = self.bulk({'op': 'set', 'item': 1, 'count': 5}, {'op': 'remove', 'item': 42})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.bulk({'op': 'add', 'product': 0}).status_code, 400)
+        self.assertEqual(self.bulk({'op': 'set', 'count': 1}).status_code, 400)
+        self.assertEqual([item['count'] for item in self.get_cart()], [1])
+
+    def test_price_and_availability_changes_are_flagged(self):
+        self.add(self.soap, 2)
+        self.add(self.bleach)
+        self.get_cart()
+
+        self.soap.price = '3.00'
+        self.soap.save()
+        self.bleach.is_available = False
+        self.bleach.save()
+
+        cart = self.get_cart()
+        self.assertEqual(cart[0]['changes'], {'price': {'old': '2.50', 'new': '3.00'}})
+        self.assertEqual(cart[0]['total_price'], '6.00')
+        self.assertEqual(cart[1]['changes'], {'is_available': {'old': True, 'new': False}})
+        self.assertEqual([item['changes'] for item in self.get_cart()], [{}, {}])
+
+
+class CartStructureTests(TestCase):
+    def test_totals_and_ids(self):
+        cart = Cart()
+        soap = cart.add(1, {'title': 'Soap', 'price': '2.50'}, 2)
+        cart.add(2, {'title': 'Bleach', 'price': '4.00'})
+        cart.remove(soap['id'])
+        bleach = cart.add(1, {'title': 'Soap', 'price': '2.50'})
+
+        self.assertEqual(bleach['id'], 3)
+        self.assertEqual(cart.find_by_product(1), bleach)
+        self.assertEqual((cart.subtotal_cents, cart.quantity), (650, 2))
+
+        restored = Cart.from_dict(cart.to_dict())
+        restored.apply_delta(3, -1)
+        self.assertEqual((restored.subtotal_cents, restored.quantity, len(restored)), (400, 1, 1))
+        self.assertEqual(restored.add(5, {'title': 'Lye', 'price': '1'})['id'], 4)
+
+    def test_stored_rows_round_trip(self):
+        cart = build_sample_cart(5)
+        cart.items[2]['product'] = {'title': 'Old', 'price': '1.00'}
+        restored = Cart.from_dict(cart.to_dict())
+        self.assertEqual(restored.as_list(), cart.as_list())
+        self.assertEqual(Cart.from_dict(item_dicts(cart)).as_list(), cart.as_list())
+
+
+class SessionSerializerTests(SimpleTestCase):
+    def test_types_round_trip(self):
+        data = {
+            'price': Decimal('12.50'),
+            'at': datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+            'day': datetime.date(2026, 1, 2),
+            'counts': {1: 2},
+        }
+        store = SessionStore()
+        self.assertEqual(store.decode(store.encode(data)), data)
+
+    def test_json_sessions_are_read(self):
+        legacy_store = SessionStore()
+        legacy_store.serializer = JSONSerializer
+        data = build_sample_session(item_dicts(build_sample_cart(3)))
+        self.assertEqual(SessionStore().decode(legacy_store.encode(data)), data)
+
+    def test_cart_session_is_smaller(self):
+        cart = build_sample_cart(50)
+        legacy_store = SessionStore()
+        legacy_store.serializer = JSONSerializer
+        legacy = legacy_store.encode(build_sample_session(item_dicts(cart)))
+        compact = SessionStore().encode(build_sample_session(cart.to_dict()))
+        self.assertLess(len(compact), len(legacy))
+
+
+class SessionCartStorageTests(CartApiTestMixin, TestCase):
+    def test_legacy_cart_is_converted(self):
+        session = self.client.session
+        session['cart'] = [
+            {'id': 3, 'product': {'title': 'Bleach', 'price': '4.00', 'is_available': True}, 'count': 2, 'image': None},
+            {'id': 5, 'product': {'title': 'Removed', 'price': '1.00', 'is_available': True}, 'count': 1,
+             'image': None},
+        ]
+        session.save()
+
+        cart = self.get_cart()
+        self.assertEqual([(item['id'], item['product_id'], item['count']) for item in cart], [(3, self.bleach.pk, 2)])
+        self.assertEqual(self.client.session['cart']['version'], 3)
+
+        self.add(self.soap)
+        self.assertEqual([item['id'] for item in self.get_cart()], [3, 4])
+
+    def test_empty_cart_doesnt_create_session(self):
+        self.assertEqual(self.get_cart(), [])
+        self.assertNotIn('sessionid', self.client.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_unchanged_catalog_skips_product_query(self):
+        self.add(self.soap)
+        self.get_cart()
+        with self.assertNumQueries(2):
+            self.get_cart()
+
+    def test_deleted_product_becomes_unavailable(self):
+        self.add(self.soap)
+        self.get_cart()
+        self.soap.delete()
+        item, = self.get_cart()
+        self.assertFalse(item['product']['is_available'])
+        self.assertEqual(item['changes'], {'is_available': {'old': True, 'new': False}})
+
+
+@override_settings(CART_STORAGE='cart.services.DatabaseCartStorage')
+class DatabaseCartStorageTests(CartApiTestMixin, TestCase):
+    def test_items_are_stored_as_rows(self):
+        self.add(self.soap)
+        self.add(self.soap)
+        self.add(self.bleach)
+        self.assertEqual(
+            list(CartItem.objects.values_list('item_id', 'product_id', 'count')),
+            [(1, self.soap.pk, 2), (2, self.bleach.pk, 1)],
+        )
+
+    def test_empty_cart_doesnt_create_session(self):
+        self.assertEqual(self.get_cart(), [])
+        self.assertNotIn('sessionid', self.client.cookies)
+
+    def test_items_of_expired_sessions_are_pruned(self):
+        self.add(self.soap)
+        live_key = CartItem.objects.get().session_key
+        CartItem.objects.create(session_key='expired', item_id=1, product=self.soap, product_data={})
+        CartSequence.objects.create(session_key='expired', last_item_id=1)
+        Session.objects.create(session_key='expired', session_data='', expire_date=timezone.now())
+
+        call_command('prune_cart_items', '--batch-size=1', stdout=io.StringIO())
+        self.assertEqual(list(CartItem.objects.values_list('session_key', flat=True)), [live_key])
+        self.assertEqual(list(CartSequence.objects.values_list('session_key', flat=True)), [live_key])
+
+    def test_item_ids_arent_reused(self):
+        self.add(self.soap)
+        self.client.delete(reverse('remove-cart-item', kwargs={'pk': 1}), secure=True)
+        self.add(self.bleach)
+        self.assertEqual([(item['id'], item['product']['title']) for item in self.get_cart()], [(2, 'Bleach')])
+
+
+@skipUnlessDBFeature('has_select_for_update', 'test_db_allows_multiple_connections')
+class DatabaseCartConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        self.session = SessionStore()
+        self.session.create()
+
+    def add_concurrently(self, products: list[ChemicalProduct]) -> None:
+        barrier = threading.Barrier(len(products))
+
+        def add(product: ChemicalProduct) -> None:
+            try:
+                with CartManager(DatabaseCartStorage(SessionStore(self.session.session_key)), None) as manager:
+                    barrier.wait()
+                    manager.add_to_cart({'product': product.pk})
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(products)) as executor:
+            list(executor.map(add, products))
+
+    def test_concurrent_adds_get_distinct_ids(self):
+        products = [ChemicalProduct.objects.create(title=f'Soap {index}', price='2.50') for index in range(8)]
+        self.add_concurrently(products)
+        self.assertEqual(
+            sorted(CartItem.objects.values_list('item_id', 'count')),
+            [(item_id, 1) for item_id in range(1, 9)],
+        )
+        self.assertEqual(CartSequence.objects.get().last_item_id, 8)
+
+    def test_concurrent_adds_of_product_are_merged(self):
+        soap = ChemicalProduct.objects.create(title='Soap', price='2.50')
+        self.add_concurrently([soap] * 8)
+        self.assertEqual(list(CartItem.objects.values_list('item_id', 'product_id', 'count')), [(1, soap.pk, 8)])
+
+
+@override_settings(CART_STORAGE='cart.services.CookieCartStorage')
+class CookieCartStorageTests(CartApiTestMixin, TestCase):
+    def test_cart_is_kept_in_cookie_without_session(self):
+        self.add(self.soap)
+        self.assertIn('cart', self.client.cookies)
+        self.assertNotIn('sessionid', self.client.cookies)
+
+        with self.assertNumQueries(1):
+            cart = self.get_cart()
+        self.assertEqual(cart[0]['product']['title'], 'Soap')
+
+    def test_tampered_cookie_is_ignored(self):
+        self.add(self.soap)
+        self.client.cookies['cart'] = self.client.cookies['cart'].value + 'x'
+        self.assertEqual(self.get_cart(), [])
+
+    def test_price_and_availability_changes_are_flagged(self):
+        self.add(self.soap)
+        self.soap.price = '3.00'
+        self.soap.save()
+        item, = self.get_cart()
+        self.assertEqual((item['product']['price'], item['changes']), ('3.00', {}))
+
+    @override_settings(CART_COOKIE_MAX_SIZE=10)
+    def test_big_cart_falls_back_to_session(self):
+        self.add(self.soap)
+        self.add(self.bleach)
+        self.assertEqual(self.client.cookies['cart'].value, 'session')
+        self.assertIn('sessionid', self.client.cookies)
+        self.assertEqual([item['product']['title'] for item in self.get_cart()], ['Soap', 'Bleach'])
+
+
+class CountingSessionCartStorage(SessionCartStorage):
+    """
+    Session cart storage counting saves rejected by compare-and-swap.
+    """
+    rejected = 0
+
+    def save(self, cart: Cart) -> bool:
+        saved = super().save(cart)
+        self.rejected += not saved
+        return saved
+
+
+def make_cart_data() -> dict:
+    cart = Cart()
+    cart.add(1, {'title': 'Soap', 'price': '2.50', 'is_available': True}, 1)
+    cart.add(2, {'title': 'Bleach', 'price': '4.00', 'is_available': True}, 100)
+    return cart.to_dict()
+
+
+class SessionCartConcurrencyTests(TestCase):
+    def test_conflicting_session_writes_are_merged(self):
+        session = SessionStore()
+        session['cart'] = make_cart_data()
+        session.create()
+
+        first = CartManager(SessionCartStorage(SessionStore(session.session_key), 'cart'), None)
+        second = CartManager(SessionCartStorage(SessionStore(session.session_key), 'cart'), None)
+        with first:
+            first.update_quantity(1, 2)
+            with second:
+                second.update_quantity(1, 3)
+                second.remove_from_cart(2)
+
+        cart = Cart.from_dict(SessionStore(session.session_key)['cart'])
+        self.assertEqual([(item['product_id'], item['count']) for item in cart], [(1, 6)])
+        self.assertEqual(cart.revision, 2)
+
+    def test_stale_writers_retry_until_saved(self):
+        session = SessionStore()
+        session['cart'] = make_cart_data()
+        session.create()
+
+        storages = [CountingSessionCartStorage(SessionStore(session.session_key), 'cart') for _ in range(8)]
+        with ExitStack() as stack:
+            for storage in storages:
+                manager = stack.enter_context(CartManager(storage, None))
+                manager.update_quantity(1, 1)
+                manager.update_quantity(2, -1)
+
+        cart = Cart.from_dict(SessionStore(session.session_key)['cart'])
+        self.assertEqual([(item['product_id'], item['count']) for item in cart], [(1, 9), (2, 92)])
+        self.assertEqual(cart.revision, 8)
+        self.assertEqual(cart.subtotal_cents, 250 * 9 + 400 * 92)
+        self.assertEqual([storage.rejected for storage in storages], [1] * 7 + [0])
+
+    def test_conflict_is_raised_after_max_attempts(self):
+        session = SessionStore()
+        session['cart'] = make_cart_data()
+        session.create()
+
+        storage = CountingSessionCartStorage(SessionStore(session.session_key), 'cart')
+        other = SessionCartStorage(SessionStore(session.session_key), 'cart')
+        load = storage.load
+
+        def load_stale():
+            cart = load()
+            with CartManager(other, None) as manager:
+                manager.update_quantity(2, -1)
+            return cart
+
+        storage.load = load_stale
+        with self.assertRaises(CartConflict):
+            with CartManager(storage, None) as manager:
+                manager.update_quantity(1, 1)
+        self.assertEqual(storage.rejected, CartManager.MAX_ATTEMPTS)
+        cart = Cart.from_dict(SessionStore(session.session_key)['cart'])
+        self.assertEqual((cart.get(1)['count'], cart.get(2)['count']), (1, 100 - (CartManager.MAX_ATTEMPTS + 1)))
+
+
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class SessionCartStressTests(TransactionTestCase):
+    @mock.patch.object(CartManager, 'MAX_ATTEMPTS', 80)
+    def test_parallel_mutations_are_not_lost(self):
+        session = SessionStore()
+        session['cart'] = make_cart_data()
+        session.create()
+        storages = []
+        barrier = threading.Barrier(8, timeout=30)
+
+        def mutate(index: int) -> None:
+            storage = CountingSessionCartStorage(SessionStore(session.session_key), 'cart')
+            storages.append(storage)
+            try:
+                with CartManager(storage, None) as manager:
+                    barrier.wait()
+                    manager.update_quantity(1, 1)
+                    manager.update_quantity(2, -1)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(mutate, range(80)))
+
+        cart = Cart.from_dict(SessionStore(session.session_key)['cart'])
+        self.assertEqual([(item['product_id'], item['count']) for item in cart], [(1, 81), (2, 20)])
+        self.assertEqual(cart.subtotal_cents, 250 * 81 + 400 * 20)
+        self.assertEqual(cart.revision, 80)
+        self.assertEqual(len(storages), 80)
+        # Every round of 8 writers loaded the cart before any of them saved, so all but one are rejected.
+        self.assertGreaterEqual(sum(storage.rejected for storage in storages), 70)
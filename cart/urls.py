@@ -12,7 +12,9 @@ from .views import CartViewSet
 
 urlpatterns: list[path] = [
     path('', CartViewSet.as_view({'get': 'list'}), name='cart-list'),
+    path('summary/', CartViewSet.as_view({'get': 'summary'}), name='cart-summary'),
     path('add/', CartViewSet.as_view({'post': 'create'}), name='add-cart-item'),
+    path('bulk/', CartViewSet.as_view({'post': 'bulk'}), name='cart-bulk'),
     path('remove/<int:pk>/', CartViewSet.as_view({'delete': 'destroy'}), name='remove-cart-item'),
     path('increase/<int:pk>/', CartViewSet.as_view({'patch': 'increase'}), name='cart-item-increase'),
     path('decrease/<int:pk>/', CartViewSet.as_view({'patch': 'decrease'}), name='cart-item-decrease'),
@@ -2,9 +2,9 @@
 Views for cart app.
 """
 
+from django.db import transaction
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from django.conf import settings
 from rest_framework.exceptions import ValidationError
 from rest_framework.viewsets import ViewSet
 from rest_framework.request import Request
@@ -12,8 +12,9 @@ from rest_framework.response import Response
 from rest_framework import status
 
 
-from .serializers import CartItemSerializer, AddCartItemSerializer
-from .services import CartManager, SessionCartStorage
+from .serializers import CartItemSerializer, AddCartItemSerializer, CartBulkSerializer, CartSummarySerializer
+from .services import CartManager, CartStorage, get_cart_storage_class, revalidate_cart
+from .structures import Cart
 from .paginations import CartPagination
 
 class CartManagerMixin:
@@ -21,10 +22,25 @@ class CartManagerMixin:
     Mixin for CartManager access.
 
     Methods:
+        get_cart_storage: Retrieve cart storage selected by ``CART_STORAGE`` setting.
         get_cart_manager: Retrieve cart manager by current request.
+        load_cart: Load and revalidate cart of current request.
     """
     @staticmethod
-    def get_cart_manager(request: Request) -> CartManager:
+    def get_cart_storage(request: Request) -> CartStorage:
+        """
+        Retrieve cart storage selected by ``CART_STORAGE`` setting.
+
+        Args:
+            request: Current HTTP request.
+
+        Returns:
+            CartStorage: Cart storage.
+        """
+        return get_cart_storage_class().from_request(request)
+
+    @classmethod
+    def get_cart_manager(cls, request: Request) -> CartManager:
         """
         Retrieve cart manager by current request.
 
@@ -35,13 +51,25 @@ class CartManagerMixin:
             CartManager: Cart manager.
         """
         return CartManager(
-            storage=SessionCartStorage(
-                request.session,
-                settings.CART_SESSION_ID,
-            ),
+            storage=cls.get_cart_storage(request),
             request=request,
         )
 
+    @classmethod
+    def load_cart(cls, request: Request) -> tuple[Cart, dict[int, dict]]:
+        """
+        Load cart of current request and refresh its products from the catalog.
+
+        Args:
+            request: Current HTTP request.
+
+        Returns:
+            tuple[Cart, dict[int, dict]]: Cart and price and availability changes by item ID.
+        """
+        storage = cls.get_cart_storage(request)
+        cart = storage.load()
+        return cart, revalidate_cart(storage, cart)
+
 
 class CartViewSet(ViewSet, CartManagerMixin):
     """
@@ -60,7 +88,8 @@ class CartViewSet(ViewSet, CartManagerMixin):
         """
         GET /api/cart/
 
-        Retrieve current list of cart items by session ID.
+        Retrieve current list of cart items by session ID. Items whose price or
+        availability changed since they were added are flagged in ``changes``.
 
         Args:
             request: Current HTTP request.
@@ -68,9 +97,27 @@ class CartViewSet(ViewSet, CartManagerMixin):
         Returns:
             Response: List of cart items.
         """
+        cart, changes = self.load_cart(request)
+        return Response([{**item, 'changes': changes.get(item['id'], {})} for item in cart.as_list()])
+
+    @swagger_auto_schema(
+        operation_summary="Get cart totals",
+        responses={200: CartSummarySerializer},
+    )
+    def summary(self, request: Request) -> Response:
+        """
+        GET /api/cart/summary/
 
-        cart: list = request.session.get(settings.CART_SESSION_ID, [])
-        return Response(cart)
+        Retrieve count of items, total quantity and subtotal of the cart.
+
+        Args:
+            request: Current HTTP request.
+
+        Returns:
+            Response: Cart totals.
+        """
+        cart, _ = self.load_cart(request)
+        return Response(cart.summary())
 
     @swagger_auto_schema(
         operation_summary="Add item to cart",
@@ -107,6 +154,45 @@ class CartViewSet(ViewSet, CartManagerMixin):
             status=status.HTTP_201_CREATED,
         )
 
+    @swagger_auto_schema(
+        operation_summary="Apply a batch of cart operations",
+        request_body=CartBulkSerializer,
+        responses={
+            200: openapi.Response(description="Cart items and totals"),
+            400: openapi.Response(description="Validation error"),
+        },
+    )
+    def bulk(self, request: Request) -> Response:
+        """
+        POST /api/cart/bulk/
+
+        Apply add, set, remove and clear operations in one request. Either all
+        operations are applied or none.
+
+        Args:
+            request: Current HTTP request.
+
+        Returns:
+            Response: Cart items and totals if all operations are valid, else 400.
+        """
+        serializer = CartBulkSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {'detail': 'Invalid request data', 'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            with transaction.atomic(), self.get_cart_manager(request) as cart:
+                cart.apply_operations(serializer.validated_data['operations'])
+        except ValidationError as exception:
+            return Response(
+                status=status.HTTP_400_BAD_REQUEST,
+                data={'detail': exception.detail},
+            )
+
+        return Response({'items': cart.cart.as_list(), 'summary': cart.cart.summary()})
+
     @swagger_auto_schema(
         operation_summary="Delete item from cart",
         responses={
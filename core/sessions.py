@@ -0,0 +1,72 @@
+"""
+Session serializers for core project.
+"""
+
+import datetime
+from decimal import Decimal
+
+import msgpack
+from django.core.signing import JSONSerializer
+
+DECIMAL_EXT = 1
+DATETIME_EXT = 2
+DATE_EXT = 3
+
+
+def encode_ext(obj):
+    """
+    Pack values msgpack doesn't support natively as extension types.
+
+    Args:
+        obj: Value to pack.
+
+    Returns:
+        msgpack.ExtType: Packed value.
+
+    Raises:
+        TypeError: If value type isn't supported.
+    """
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(DECIMAL_EXT, str(obj).encode())
+    if isinstance(obj, datetime.datetime):
+        return msgpack.ExtType(DATETIME_EXT, obj.isoformat().encode())
+    if isinstance(obj, datetime.date):
+        return msgpack.ExtType(DATE_EXT, obj.isoformat().encode())
+    raise TypeError(f'Object of type {type(obj).__name__} is not msgpack serializable')
+
+
+def decode_ext(code: int, data: bytes):
+    """
+    Unpack extension types packed by ``encode_ext``.
+
+    Args:
+        code: Extension type code.
+        data: Packed value.
+
+    Returns:
+        Unpacked value, or ``msgpack.ExtType`` for unknown codes.
+    """
+    if code == DECIMAL_EXT:
+        return Decimal(data.decode())
+    if code == DATETIME_EXT:
+        return datetime.datetime.fromisoformat(data.decode())
+    if code == DATE_EXT:
+        return datetime.date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+class MsgPackSerializer:
+    """
+    Session serializer packing data with msgpack.
+
+    Payloads are zlib-compressed by ``django.core.signing`` when that makes them
+    smaller. Sessions written by ``JSONSerializer`` are still read: a serialized
+    session is always a map, which msgpack never starts with ``{``.
+    """
+    def dumps(self, obj) -> bytes:
+        return msgpack.packb(obj, default=encode_ext, use_bin_type=True)
+
+    def loads(self, data: bytes):
+        if data.startswith(b'{'):
+            return JSONSerializer().loads(data)
+        return msgpack.unpackb(data, ext_hook=decode_ext, raw=False, strict_map_key=False)
@@ -1,3 +1,4 @@
+from datetime import timedelta
 from pathlib import Path
 import os
 import dj_database_url
@@ -23,6 +24,8 @@ ALLOWED_HOSTS = [
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 HOUSECALL_API_KEY = os.getenv("HOUSECALL_API_KEY")
+HOUSECALL_RATE_LIMIT = float(os.getenv("HOUSECALL_RATE_LIMIT", "2"))
+HOUSECALL_WEBHOOK_SECRET = os.getenv("HOUSECALL_WEBHOOK_SECRET")
 
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
@@ -32,6 +35,8 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", EMAIL_HOST_USER)
 HR_EMAIL = os.getenv("HR_EMAIL", DEFAULT_FROM_EMAIL)
+# Coalesce notifications to HR_EMAIL into digests sent every N minutes, 0 sends each one.
+EMAIL_DIGEST_INTERVAL = timedelta(minutes=int(os.getenv("EMAIL_DIGEST_MINUTES", "0")))
 
 
 INSTALLED_APPS = [
@@ -49,6 +54,12 @@ INSTALLED_APPS = [
     "household_chemicals",
     "orders",
     "integrations",
+    "feeds",
+    "seo",
+    "assets",
+    "outbox",
+    "throttling",
+    "analytics",
 
 
     "drf_yasg",
@@ -63,6 +74,7 @@ MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "cart.middleware.CartCookieMiddleware",
 
     "corsheaders.middleware.CorsMiddleware",
 
@@ -120,6 +132,13 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "EXCEPTION_HANDLER": "utils.exceptions.custom_exception_handler",
+    # Rates of throttling.throttles token buckets: burst size per refill period.
+    "DEFAULT_THROTTLE_RATES": {
+        "submissions": os.getenv("SUBMISSIONS_IP_RATE", "20/hour"),
+        "submissions_contact": os.getenv("SUBMISSIONS_CONTACT_RATE", "5/hour"),
+    },
+    # nginx is the only proxy in front of the app.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "1")),
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -136,14 +155,53 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
-STATICFILES_STORAGE = "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+
+STORAGES = {
+    "default": {"BACKEND": "assets.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "private": {"BACKEND": "assets.storage.PrivateContentAddressedStorage"},
+}
+CONTENT_ADDRESSED_PREFIX = "cas"
+PRIVATE_CONTENT_ADDRESSED_PREFIX = "private"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Private files, e.g. resumes, served by nginx only through X-Accel-Redirect of the protected media view.
+PRIVATE_MEDIA_ROOT = BASE_DIR / "private_media"
+PROTECTED_MEDIA_INTERNAL_URL = "/protected/"
+PROTECTED_MEDIA_X_ACCEL = os.getenv("PROTECTED_MEDIA_X_ACCEL", str(not DEBUG)) == "True"
+
+# Contacts and vacancy applications older than this are moved to ARCHIVE_ROOT by archive_submissions.
+ARCHIVE_ROOT = BASE_DIR / "archive"
+SUBMISSION_RETENTION_DAYS = int(os.getenv("SUBMISSION_RETENTION_DAYS", "365"))
+
+# Keep below client_max_body_size of nginx, which rejects larger requests before they reach a worker.
+RESUME_MAX_UPLOAD_SIZE = int(os.getenv("RESUME_MAX_UPLOAD_MB", "5")) * 1024 * 1024
+
+IMAGE_RENDITION_WIDTHS = (320, 640, 960, 1280)
+IMAGE_RENDITION_QUALITY = 80
+
+SITEMAP_ROOT = BASE_DIR / "sitemaps"
+# Origin of the public site the sitemap URLs point to, the frontend host rather than the API.
+SITEMAP_BASE_URL = os.getenv("SITEMAP_BASE_URL", "")
+SITEMAP_URL = os.getenv("SITEMAP_URL", f"https://{PUBLIC_API_URL}/sitemaps/")
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cache_table",
+    }
+}
+
 CART_SESSION_ID = "cart"
+CART_STORAGE = os.getenv("CART_STORAGE", "cart.services.SessionCartStorage")
+CART_COOKIE_NAME = "cart"
+CART_COOKIE_MAX_SIZE = 3000
+
+PRODUCT_FEED_CHUNK_SIZE = int(os.getenv("PRODUCT_FEED_CHUNK_SIZE", "2000"))
 
 USE_X_FORWARDED_HOST = True
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -156,6 +214,7 @@ CSRF_TRUSTED_ORIGINS = [
     f"https://{PUBLIC_API_URL}",
 ]
 
+SESSION_SERIALIZER = "core.sessions.MsgPackSerializer"
 SESSION_COOKIE_SAMESITE = "None"
 SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SAMESITE = "None"
@@ -41,6 +41,9 @@ urlpatterns = [
         path('household_chemicals/', include('household_chemicals.urls'), name='household-chem'),
         path('cart/', include('cart.urls'), name='cart'),
         path('orders/', include('orders.urls'), name='orders'),
+        path('feeds/', include('feeds.urls'), name='feeds'),
+        path('protected-media/', include('assets.urls')),
+        path('analytics/', include('analytics.urls')),
         re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
         path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
         path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
@@ -15,5 +15,18 @@ python manage.py makemigrations
 echo "👉 Applying migrations..."
 python manage.py migrate --noinput
 
+echo "Creating cache table..."
+python manage.py createcachetable
+
+echo "Moving resumes to private storage..."
+python manage.py protect_resumes
+
+echo "Pruning expired sessions and carts..."
+python manage.py clearsessions
+python manage.py prune_cart_items
+
+echo "Building sitemaps..."
+python manage.py build_sitemaps
+
 echo "🚀 Starting Gunicorn..."
 exec gunicorn core.wsgi:application --bind 0.0.0.0:8000 --workers 3 --timeout 30 --graceful-timeout 10
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Product feeds Django app.
+"""
@@ -0,0 +1,17 @@
+"""
+Feeds app config.
+"""
+
+from django.apps import AppConfig
+
+
+class FeedsConfig(AppConfig):
+    """
+    Feeds app config.
+
+    Attributes:
+        default_auto_field: Default auto-created primary key field.
+        name: App name.
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'feeds'
@@ -0,0 +1,187 @@
+"""
+Services for feeds app.
+
+Feed rows are produced from ``values_list`` iterators, so no model instances
+are built and only one chunk of rows is held in memory at a time.
+"""
+
+import csv
+import json
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, Optional
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Count, Max
+
+from api_models.models import Brand, Product
+from household_chemicals.models import ChemicalProduct
+
+FEED_FIELDS: tuple[str, ...] = (
+    'id', 'type', 'title', 'description', 'brand', 'price', 'currency', 'availability', 'image_url',
+)
+FEED_CURRENCY = 'CAD'
+DESCRIPTION_LENGTH = 5000
+
+
+def get_chunk_size() -> int:
+    """
+    Get number of rows fetched from the database per round trip.
+
+    Returns:
+        int: Chunk size.
+    """
+    return getattr(settings, 'PRODUCT_FEED_CHUNK_SIZE', 2000)
+
+
+def get_feed_state() -> dict:
+    """
+    Get aggregated catalog state used for conditional GET.
+
+    Row counts catch deletions, while maximum ``updated_at`` values catch edits,
+    including edits of brands whose names are included in product rows.
+
+    Returns:
+        dict: Counts and last modification dates of both catalogs and of brands.
+    """
+    chemicals = ChemicalProduct.objects.aggregate(count=Count('id'), modified=Max('updated_at'))
+    products = Product.objects.aggregate(count=Count('id'), modified=Max('updated_at'))
+    brands = Brand.objects.aggregate(modified=Max('updated_at'))
+    return {'chemicals': chemicals, 'products': products, 'brands': brands}
+
+
+def image_url_builder(origin: str) -> Callable[[Optional[str]], Optional[str]]:
+    """
+    Build a function converting stored image names to absolute URLs.
+
+    Args:
+        origin: Scheme and host of the current request, e.g. ``https://example.com``.
+
+    Returns:
+        Callable: Function returning absolute URL for an image name or None.
+    """
+    def build(name: Optional[str]) -> Optional[str]:
+        if not name:
+            return None
+        url = default_storage.url(name)
+        return origin + url if url.startswith('/') else url
+    return build
+
+
+def iter_feed_rows(origin: str) -> Iterator[dict]:
+    """
+    Iterate over all catalog products as flat feed rows.
+
+    Args:
+        origin: Scheme and host used for absolute image URLs.
+
+    Yields:
+        dict: Feed row with keys from ``FEED_FIELDS``.
+    """
+    build_image_url = image_url_builder(origin)
+    chunk_size = get_chunk_size()
+
+    chemicals = ChemicalProduct.objects.order_by('id').values_list(
+        'id', 'title', 'full_description', 'price', 'is_available', 'image',
+    )
+    for pk, title, description, price, is_available, image in chemicals.iterator(chunk_size=chunk_size):
+        yield {
+            'id': f'chemical-{pk}',
+            'type': 'household_chemical',
+            'title': title,
+            'description': (description or '')[:DESCRIPTION_LENGTH],
+            'brand': None,
+            'price': str(price) if isinstance(price, Decimal) else price,
+            'currency': FEED_CURRENCY,
+            'availability': 'in_stock' if is_available else 'out_of_stock',
+            'image_url': build_image_url(image),
+        }
+
+    products = Product.objects.order_by('id').values_list(
+        'id', 'name', 'description', 'brand__name', 'image',
+    )
+    for pk, name, description, brand, image in products.iterator(chunk_size=chunk_size):
+        yield {
+            'id': f'product-{pk}',
+            'type': 'appliance',
+            'title': name,
+            'description': (description or '')[:DESCRIPTION_LENGTH],
+            'brand': brand,
+            'price': None,
+            'currency': None,
+            'availability': None,
+            'image_url': build_image_url(image),
+        }
+
+
+def buffered(lines: Iterable[str], buffer_size: int = 64 * 1024) -> Iterator[str]:
+    """
+    Join small lines into bigger pieces to reduce per-chunk overhead of the response.
+
+    Args:
+        lines: Encoded feed lines.
+        buffer_size: Approximate size of yielded pieces in characters.
+
+    Yields:
+        str: Joined lines.
+    """
+    buffer: list[str] = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            yield ''.join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def encode_jsonl(rows: Iterable[dict]) -> Iterator[str]:
+    """
+    Encode rows as JSON lines.
+    """
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+class _LineBuffer:
+    """
+    File-like object returning written value instead of storing it.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+
+def encode_csv(rows: Iterable[dict]) -> Iterator[str]:
+    """
+    Encode rows as CSV with a header line.
+    """
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(FEED_FIELDS)
+    for row in rows:
+        yield writer.writerow(['' if row[field] is None else row[field] for field in FEED_FIELDS])
+
+
+def encode_xml(rows: Iterable[dict]) -> Iterator[str]:
+    """
+    Encode rows as XML document with one ``item`` element per row.
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<feed>\n'
+    for row in rows:
+        fields = ''.join(
+            f'<{field}>{escape(str(row[field]))}</{field}>'
+            for field in FEED_FIELDS
+            if row[field] is not None
+        )
+        yield f'<item>{fields}</item>\n'
+    yield '</feed>\n'
+
+
+FEED_FORMATS: dict[str, tuple[Callable[[Iterable[dict]], Iterator[str]], str]] = {
+    'jsonl': (encode_jsonl, 'application/x-ndjson; charset=utf-8'),
+    'csv': (encode_csv, 'text/csv; charset=utf-8'),
+    'xml': (encode_xml, 'application/xml; charset=utf-8'),
+}
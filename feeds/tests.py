@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from api_models.models import Brand, Product
+from household_chemicals.models import ChemicalProduct
+
+
+class ProductFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ChemicalProduct.objects.create(title='Cleaner <1L>', price='9.99', is_available=True)
+        ChemicalProduct.objects.create(title='Soap', price='2.50', is_available=False)
+        brand = Brand.objects.create(name='Bosch')
+        Product.objects.create(brand=brand, name='Dishwasher')
+
+    def get_feed(self, feed_format, **headers):
+        url = reverse('product-feed', kwargs={'feed_format': feed_format})
+        return self.client.get(url, secure=True, headers=headers)
+
+    def test_jsonl_feed(self):
+        response = self.get_feed('jsonl')
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['price'], '9.99')
+        self.assertEqual(rows[1]['availability'], 'out_of_stock')
+        self.assertEqual(rows[2]['brand'], 'Bosch')
+
+    def test_csv_feed(self):
+        response = self.get_feed('csv')
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['title'], 'Cleaner <1L>')
+
+    def test_xml_feed_is_escaped(self):
+        response = self.get_feed('xml')
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('<title>Cleaner &lt;1L&gt;</title>', content)
+        self.assertEqual(content.count('<item>'), 3)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.get_feed('pdf').status_code, 404)
+
+    def test_conditional_get(self):
+        etag = self.get_feed('jsonl')['ETag']
+        self.assertEqual(self.get_feed('jsonl', if_none_match=etag).status_code, 304)
+
+        ChemicalProduct.objects.create(title='Bleach', price='4.00')
+        self.assertEqual(self.get_feed('jsonl', if_none_match=etag).status_code, 200)
+
+    def test_brand_rename_changes_etag(self):
+        etag = self.get_feed('jsonl')['ETag']
+        brand = Brand.objects.get()
+        brand.name = 'Siemens'
+        brand.save()
+        response = self.get_feed('jsonl', if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows[2]['brand'], 'Siemens')
+
+    def test_gzip(self):
+        response = self.get_feed('jsonl', accept_encoding='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
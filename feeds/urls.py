@@ -0,0 +1,15 @@
+"""
+Urls for feeds app.
+
+Attributes:
+    urlpatterns: All url paths available in the app with view specified.
+"""
+
+from django.urls import path
+
+from .views import product_feed
+
+
+urlpatterns: list[path] = [
+    path('products.<str:feed_format>', product_feed, name='product-feed'),
+]
@@ -0,0 +1,70 @@
+"""
+Views for feeds app.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from django.http import Http404, HttpRequest, StreamingHttpResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_GET
+
+from .services import FEED_FORMATS, buffered, get_feed_state, iter_feed_rows
+
+
+def _feed_state(request: HttpRequest) -> dict:
+    """
+    Get catalog state once per request, shared by ETag and Last-Modified checks.
+    """
+    if not hasattr(request, '_feed_state'):
+        request._feed_state = get_feed_state()
+    return request._feed_state
+
+
+def feed_etag(request: HttpRequest, feed_format: str) -> str:
+    """
+    Compute feed ETag from catalog state and requested format.
+    """
+    state = _feed_state(request)
+    return hashlib.md5(f'{feed_format}:{state}'.encode()).hexdigest()
+
+
+def feed_last_modified(request: HttpRequest, feed_format: str) -> Optional[datetime]:
+    """
+    Compute feed last modification date from catalog state.
+    """
+    state = _feed_state(request)
+    dates = [part['modified'] for part in state.values() if part['modified']]
+    return max(dates, default=None)
+
+
+@require_GET
+@gzip_page
+@condition(etag_func=feed_etag, last_modified_func=feed_last_modified)
+def product_feed(request: HttpRequest, feed_format: str) -> StreamingHttpResponse:
+    """
+    GET /api/feeds/products.<jsonl|csv|xml>
+
+    Stream the whole product catalog (household chemicals and appliances) in the requested format.
+    Rows are fetched with server-side chunked iteration, so memory usage doesn't depend on catalog size.
+
+    Args:
+        request: Current HTTP request.
+        feed_format: Feed format, one of ``jsonl``, ``csv`` or ``xml``.
+
+    Returns:
+        StreamingHttpResponse: Streamed feed.
+    """
+    if feed_format not in FEED_FORMATS:
+        raise Http404('Unknown feed format.')
+    encoder, content_type = FEED_FORMATS[feed_format]
+    origin = request.build_absolute_uri('/').rstrip('/')
+
+    response = StreamingHttpResponse(
+        buffered(encoder(iter_feed_rows(origin))),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'inline; filename="products.{feed_format}"'
+    response['Cache-Control'] = 'public, max-age=300'
+    return response
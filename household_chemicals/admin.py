@@ -1,10 +1,10 @@
 from django.contrib import admin
 
-from household_chemicals.models import ChemicalProduct
+from household_chemicals.models import ChemicalProduct, StockReservation
 
 @admin.register(ChemicalProduct)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ('title', 'short_description', 'price', 'is_available', 'image')
+    list_display = ('title', 'short_description', 'price', 'stock_quantity', 'is_available', 'image')
     search_fields = ('title', 'full_description')
     list_filter = ('is_available',)
 
@@ -14,3 +14,12 @@ class ProductAdmin(admin.ModelAdmin):
             if len(obj.full_description) > 50 else obj.full_description
 
     short_description.short_description = 'Description'
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('product', 'quantity', 'order', 'created_at')
+    readonly_fields = ('product', 'order', 'quantity', 'created_at')
+
+    def has_add_permission(self, request):
+        return False
@@ -5,9 +5,45 @@ class ChemicalProduct(models.Model):
     title = models.CharField(max_length=255)
     full_description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
-    is_available = models.BooleanField(default=True)
+    is_available = models.BooleanField(default=True, db_index=True,
+                                       help_text="Derived from stock quantity when stock is tracked")
+    stock_quantity = models.PositiveIntegerField(null=True, blank=True,
+                                                 help_text="Units in stock, leave empty to not track stock")
     image = models.ImageField(upload_to='products/', null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        if self.stock_quantity is not None:
+            self.is_available = self.stock_quantity > 0
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
+
+class StockReservation(models.Model):
+    """
+    Units of a product taken from stock for a placed order.
+
+    Orders have no payment or confirmation step, so units are sold once the
+    order is placed and reservations are never released.
+
+    Attributes:
+        product: Reserved product.
+        order: Order the units are reserved for.
+        quantity: Reserved units.
+        created_at: Date and time the units were reserved.
+    """
+    product = models.ForeignKey(ChemicalProduct, on_delete=models.CASCADE, related_name='reservations')
+    order = models.ForeignKey('orders.Order', on_delete=models.CASCADE, null=True, blank=True,
+                              related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.product} x {self.quantity}"
+
+    class Meta:
+        verbose_name = "Stock Reservation"
+        verbose_name_plural = "Stock Reservations"
+        ordering = ['-created_at']
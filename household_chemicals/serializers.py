@@ -1,13 +1,15 @@
 from rest_framework import serializers
+from assets.serializers import RenditionField
 from .models import ChemicalProduct
 
 class ProductBaseSerializer(serializers.ModelSerializer):
     description = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
+    image_renditions = RenditionField('image')
 
     class Meta:
         model = ChemicalProduct
-        fields = ['id', 'title', 'image_url', 'price', 'description', 'is_available']
+        fields = ['id', 'title', 'image_url', 'image_renditions', 'price', 'description', 'is_available']
 
     @staticmethod
     def get_description(obj):
@@ -29,6 +31,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         style={'base_template': 'textarea.html'},
         source='full_description'
     )
+    image_renditions = RenditionField('image')
 
     class Meta(ProductBaseSerializer.Meta):
         model = ChemicalProduct
@@ -0,0 +1,11 @@
+"""
+Signals of household chemicals app.
+
+Attributes:
+    stock_changed: Sent after stock of products was changed with bulk updates,
+        with ``product_ids`` argument.
+"""
+
+from django.dispatch import Signal
+
+stock_changed = Signal()
@@ -0,0 +1,94 @@
+"""
+Stock reservations for household chemicals app.
+
+Stock is taken with conditional ``UPDATE ... SET stock_quantity = stock_quantity - n
+WHERE stock_quantity >= n`` statements, which lock a product row only for the
+statement's transaction. ``is_available`` is updated in the same statement, so
+catalog queries never compute it. These updates don't send model signals,
+``stock_changed`` is sent instead.
+"""
+
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, F, Q
+from django.utils import timezone
+
+from .models import ChemicalProduct, StockReservation
+from .signals import stock_changed
+
+
+def notify_stock_changed(product_ids: list[int]) -> None:
+    """
+    Send ``stock_changed`` after the current transaction commits.
+
+    Args:
+        product_ids: IDs of the products whose stock was changed.
+    """
+    if product_ids:
+        transaction.on_commit(lambda: stock_changed.send(sender=ChemicalProduct, product_ids=product_ids))
+
+
+class InsufficientStock(Exception):
+    """
+    Some products don't have enough units in stock.
+
+    Attributes:
+        product_ids: IDs of the products.
+    """
+    def __init__(self, product_ids: list[int]) -> None:
+        super().__init__(f'Not enough stock for products {product_ids}.')
+        self.product_ids = product_ids
+
+
+def take_stock(product_id: int, quantity: int) -> bool:
+    """
+    Atomically take units of the product from stock.
+
+    Args:
+        product_id: Product ID.
+        quantity: Units to take.
+
+    Returns:
+        bool: False if there are not enough units.
+    """
+    return bool(
+        ChemicalProduct.objects.filter(pk=product_id, stock_quantity__gte=quantity).update(
+            stock_quantity=F('stock_quantity') - quantity,
+            # Evaluated against the old value, so it's true if units remain after the update.
+            is_available=ExpressionWrapper(Q(stock_quantity__gt=quantity), output_field=BooleanField()),
+            updated_at=timezone.now(),
+        )
+    )
+
+
+def reserve_stock(lines: Iterable[dict], order=None) -> list[StockReservation]:
+    """
+    Reserve units of tracked products for order lines. Must be called inside a transaction.
+
+    Products are updated in order of their IDs, so concurrent reservations can't deadlock.
+
+    Args:
+        lines: Order lines with ``product_id``, ``count`` and ``track_stock``.
+        order: Order the units are reserved for.
+
+    Returns:
+        list[StockReservation]: Created reservations.
+
+    Raises:
+        InsufficientStock: If some products don't have enough units.
+    """
+    quantities = {}
+    for line in lines:
+        if line.get('track_stock') and line['product_id']:
+            quantities[line['product_id']] = quantities.get(line['product_id'], 0) + line['count']
+
+    missing = [product_id for product_id in sorted(quantities) if not take_stock(product_id, quantities[product_id])]
+    if missing:
+        raise InsufficientStock(missing)
+
+    notify_stock_changed(sorted(quantities))
+    return StockReservation.objects.bulk_create(
+        StockReservation(product_id=product_id, order=order, quantity=quantity)
+        for product_id, quantity in sorted(quantities.items())
+    )
@@ -0,0 +1,36 @@
+from django.test import TestCase
+
+from household_chemicals.models import ChemicalProduct
+from household_chemicals.stock import InsufficientStock, reserve_stock, take_stock
+
+
+class StockTests(TestCase):
+    def setUp(self):
+        self.soap = ChemicalProduct.objects.create(title='Soap', price='2.50', stock_quantity=3)
+        self.bleach = ChemicalProduct.objects.create(title='Bleach', price='4.00')
+
+    def test_availability_is_derived_from_stock(self):
+        self.assertTrue(take_stock(self.soap.pk, 2))
+        self.soap.refresh_from_db()
+        self.assertEqual((self.soap.stock_quantity, self.soap.is_available), (1, True))
+
+        self.assertFalse(take_stock(self.soap.pk, 2))
+        self.assertTrue(take_stock(self.soap.pk, 1))
+        self.soap.refresh_from_db()
+        self.assertEqual((self.soap.stock_quantity, self.soap.is_available), (0, False))
+
+        self.soap.stock_quantity = 5
+        self.soap.save()
+        self.assertTrue(self.soap.is_available)
+
+    def test_reserve_only_tracked_products(self):
+        lines = [
+            {'product_id': self.soap.pk, 'count': 2, 'track_stock': True},
+            {'product_id': self.bleach.pk, 'count': 10, 'track_stock': False},
+        ]
+        reservations = reserve_stock(lines)
+        self.assertEqual([(r.product_id, r.quantity) for r in reservations], [(self.soap.pk, 2)])
+
+        with self.assertRaises(InsufficientStock) as context:
+            reserve_stock(lines)
+        self.assertEqual(context.exception.product_ids, [self.soap.pk])
@@ -1,20 +1,110 @@
+import threading
+import time
+from typing import Optional
+
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
 
+API_URL = "https://api.housecallpro.com/v1"
+TIMEOUT = (5, 15)
 
-def send_to_housecall_pro(contact):
-    url = "https://api.housecallpro.com/v1/jobs"
-    headers = {
-        "Authorization": f"Bearer {settings.HOUSECALL_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    payload = {
+
+class RateLimited(Exception):
+    """
+    HouseCall Pro rejected the request with 429.
+
+    Attributes:
+        retry_after: Seconds to wait before the next request.
+    """
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited for {retry_after:g}s")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Spaces requests evenly to stay below ``rate`` requests per second.
+    """
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class HouseCallClient:
+    """
+    HouseCall Pro API client reusing one keep-alive connection pool.
+
+    Args:
+        api_key: API key, ``HOUSECALL_API_KEY`` setting by default.
+        rate: Maximum requests per second, ``HOUSECALL_RATE_LIMIT`` setting by default.
+    """
+    def __init__(self, api_key: Optional[str] = None, rate: Optional[float] = None):
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key or settings.HOUSECALL_API_KEY}",
+            "Content-Type": "application/json",
+        })
+        self.limiter = RateLimiter(settings.HOUSECALL_RATE_LIMIT if rate is None else rate)
+
+    def request(self, method: str, path: str, **kwargs) -> dict:
+        self.limiter.wait()
+        response = self.session.request(method, f"{API_URL}/{path}", timeout=TIMEOUT, **kwargs)
+        if response.status_code == 429:
+            raise RateLimited(float(response.headers.get("Retry-After") or 60))
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    def create_job(self, contact) -> dict:
+        return self.request("POST", "jobs", json=get_contact_payload(contact))
+
+    def find_job(self, contact) -> Optional[dict]:
+        """
+        Find the job created for the contact by its reference tag, used to detect jobs created by a request
+        whose response was lost.
+        """
+        reference = get_job_reference(contact)
+        jobs = self.request("GET", "jobs", params={"q": reference}).get("jobs", [])
+        return next((job for job in jobs if reference in (job.get("tags") or [])), None)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def get_job_reference(contact) -> str:
+    """
+    Get tag identifying the job created for the contact, e.g. ``contact-42``.
+    """
+    return f"contact-{contact.pk}"
+
+
+def get_contact_payload(contact):
+    return {
         "name": contact.name,
         "phone": contact.phone,
         "email": contact.email,
         "address": contact.address,
-        "description": contact.description
+        "description": contact.description,
+        "tags": [get_job_reference(contact)],
     }
-    response = requests.post(url, json=payload, headers=headers)
-    response.raise_for_status()
-    return response.json()
+
+
+def send_to_housecall_pro(contact):
+    with HouseCallClient(rate=0) as client:
+        return client.create_job(contact)
@@ -0,0 +1,29 @@
+from django.contrib import admin
+
+from orders.models import Order, OrderLine
+
+
+class OrderLineInline(admin.TabularInline):
+    model = OrderLine
+    fields = ('product', 'title', 'count', 'unit_price_cents', 'total_cents')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ('id', 'full_name', 'phone_number', 'total_cents', 'from_cart', 'created_at')
+    list_filter = ('from_cart',)
+    search_fields = ('full_name', 'phone_number', 'email')
+    date_hierarchy = 'created_at'
+    inlines = (OrderLineInline,)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
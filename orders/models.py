@@ -0,0 +1,69 @@
+from django.db import models
+
+from household_chemicals.models import ChemicalProduct
+
+
+class Order(models.Model):
+    """
+    Placed order. Orders are append-only and never changed after creation.
+
+    Attributes:
+        idempotency_key: Hash of the client key of the submission and the client's session,
+            replays with it return this order.
+        request_hash: Hash of the submitted data, replays with other data are rejected.
+        full_name: Customer name.
+        phone_number: Customer phone number.
+        address: Delivery address.
+        email: Customer e-mail.
+        comment: Customer comment.
+        from_cart: Whether lines were built and priced from the server-side cart.
+        total_cents: Order total in cents.
+        created_at: Date and time the order was placed.
+    """
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    request_hash = models.CharField(max_length=64, blank=True)
+    full_name = models.CharField(max_length=255)
+    phone_number = models.CharField(max_length=32)
+    address = models.CharField(max_length=255)
+    email = models.EmailField(blank=True)
+    comment = models.TextField(blank=True)
+    from_cart = models.BooleanField(default=False)
+    total_cents = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Order #{self.pk} from {self.full_name}"
+
+    class Meta:
+        verbose_name = "Order"
+        verbose_name_plural = "Orders"
+        ordering = ['-created_at']
+
+
+class OrderLine(models.Model):
+    """
+    Line of the order with product data at the time of the order.
+
+    Attributes:
+        order: Order of the line.
+        product: Ordered product, empty if it's unknown or deleted.
+        title: Product title.
+        count: Products count.
+        unit_price_cents: Product price in cents.
+        total_cents: Line total in cents.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='lines')
+    product = models.ForeignKey(ChemicalProduct, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='order_lines')
+    title = models.CharField(max_length=255)
+    count = models.PositiveIntegerField()
+    unit_price_cents = models.BigIntegerField()
+    total_cents = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.title} x {self.count}"
+
+    class Meta:
+        verbose_name = "Order Line"
+        verbose_name_plural = "Order Lines"
+        ordering = ['order', 'pk']
@@ -9,9 +9,14 @@ class OrderSerializer(serializers.Serializer):
     address = serializers.CharField(max_length=255)
     phone_number = serializers.CharField()
     email = serializers.EmailField(required=False)
-    items = CartItemSerializer(many=True, allow_empty=False)
+    items = CartItemSerializer(many=True, allow_empty=False, required=False)
+    from_cart = serializers.BooleanField(default=False, help_text='Build order lines from the session cart.')
     comment = serializers.CharField(style={'base_template': 'textarea.html'}, allow_blank=True, required=False)
 
+    def validate(self, attrs):
+        if not attrs['from_cart'] and 'items' not in attrs:
+            raise serializers.ValidationError({'items': ['This field is required.']})
+        return attrs
 
     def validate_phone_number(self, value):
         try:
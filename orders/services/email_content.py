@@ -9,7 +9,8 @@ def get_order_email_content(data):
         'address': data.get('address', 'not specified'),
         'email': data.get('email'),
         'items': items,
-        'comment': data.get('comment', 'not specified')
+        'comment': data.get('comment', 'not specified'),
+        'total': data.get('total'),
     }
 
     html_message = render_to_string('emails/new_order.html', context)
@@ -25,5 +26,7 @@ def get_order_email_content(data):
         f"Адрес: {context['address']}\n"
         f"Продукты:\n{products_str}"
     )
+    if context['total']:
+        text_message += f"\nИтого: {context['total']} CAD"
 
     return text_message, html_message
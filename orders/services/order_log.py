@@ -0,0 +1,100 @@
+import hashlib
+import json
+from typing import Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from orders.models import Order, OrderLine
+
+
+def get_idempotency_key(owner: str, client_key: Optional[str]) -> Optional[str]:
+    """
+    Scope client idempotency key to the client who sent it.
+
+    Args:
+        owner: Client identity, e.g. ``session:<key>``.
+        client_key: Client idempotency key.
+
+    Returns:
+        Optional[str]: Hex digest stored as ``Order.idempotency_key``, or None if the key is empty.
+    """
+    if not client_key:
+        return None
+    return hashlib.sha256(f'{owner}\n{client_key}'.encode()).hexdigest()
+
+
+def get_request_hash(data: dict) -> str:
+    """
+    Get hash of the submitted order data, compared on replays.
+
+    Args:
+        data: Serialized order data.
+
+    Returns:
+        str: Hex digest of the data.
+    """
+    payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def find_order(idempotency_key: Optional[str]) -> Optional[Order]:
+    """
+    Get order placed with the idempotency key.
+
+    Args:
+        idempotency_key: Scoped idempotency key from ``get_idempotency_key``.
+
+    Returns:
+        Optional[Order]: Order or None if the key is empty or unknown.
+    """
+    if not idempotency_key:
+        return None
+    return Order.objects.filter(idempotency_key=idempotency_key).first()
+
+
+def create_order(
+        customer: dict,
+        order: dict,
+        from_cart: bool,
+        idempotency_key: Optional[str] = None,
+        request_hash: str = '',
+) -> Order:
+    """
+    Store order with all its lines in two statements. Must be called inside a transaction.
+
+    Args:
+        customer: Validated order data with customer fields.
+        order: Order ``lines`` and ``total_cents`` built by pricing functions.
+        from_cart: Whether the order was built from the server-side cart.
+        idempotency_key: Scoped idempotency key from ``get_idempotency_key``.
+        request_hash: Hash of the submitted data from ``get_request_hash``.
+
+    Returns:
+        Order: Created order.
+
+    Raises:
+        IntegrityError: If an order with the idempotency key already exists.
+    """
+    record = Order.objects.create(
+        idempotency_key=idempotency_key or None,
+        request_hash=request_hash,
+        full_name=customer['full_name'],
+        phone_number=customer['phone_number'],
+        address=customer['address'],
+        email=customer.get('email') or '',
+        comment=customer.get('comment') or '',
+        from_cart=from_cart,
+        total_cents=order['total_cents'],
+    )
+    OrderLine.objects.bulk_create(
+        OrderLine(
+            order=record,
+            product_id=line['product_id'],
+            title=line['title'],
+            count=line['count'],
+            unit_price_cents=line['unit_price_cents'],
+            total_cents=line['total_cents'],
+        )
+        for line in order['lines']
+    )
+    return record
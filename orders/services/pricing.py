@@ -0,0 +1,102 @@
+from rest_framework.exceptions import ValidationError
+
+from cart.crud import get_products_by_ids
+from cart.structures import Cart, format_cents, to_cents
+
+
+def price_cart(cart: Cart) -> dict:
+    """
+    Build order lines from the cart with current product prices.
+
+    All products are fetched in one query and totals are computed in integer cents,
+    prices stored in the cart and sent by the client are ignored.
+
+    Args:
+        cart: Cart of the order.
+
+    Returns:
+        dict: Order ``lines`` and ``total_cents``. Every line has ``product_id``,
+            ``title``, ``count``, ``track_stock``, ``unit_price_cents`` and ``total_cents``.
+
+    Raises:
+        ValidationError: If the cart is empty or has unavailable products.
+    """
+    if not cart:
+        raise ValidationError({'items': ['Cart is empty.']})
+
+    products = get_products_by_ids(cart.products)
+    lines = []
+    unavailable = []
+    for item in cart:
+        product = products.get(item['product_id'])
+        if product is None or not product.is_available:
+            unavailable.append(item['product']['title'])
+            continue
+        unit_price_cents = to_cents(product.price)
+        lines.append({
+            'product_id': product.pk,
+            'title': product.title,
+            'count': item['count'],
+            'track_stock': product.stock_quantity is not None,
+            'unit_price_cents': unit_price_cents,
+            'total_cents': unit_price_cents * item['count'],
+        })
+    if unavailable:
+        raise ValidationError({'items': [f"Products aren't available: {', '.join(unavailable)}."]})
+
+    return {
+        'lines': lines,
+        'total_cents': sum(line['total_cents'] for line in lines),
+    }
+
+
+def get_email_items(lines: list[dict]) -> list[dict]:
+    """
+    Represent order lines as cart items for order emails.
+
+    Args:
+        lines: Order lines built by ``price_cart``.
+
+    Returns:
+        list[dict]: Items with ``product``, ``count`` and ``total_price``.
+    """
+    return [
+        {
+            'product': {'title': line['title'], 'price': format_cents(line['unit_price_cents'])},
+            'count': line['count'],
+            'total_price': format_cents(line['total_cents']),
+        }
+        for line in lines
+    ]
+
+
+def price_items(items: list[dict]) -> dict:
+    """
+    Build order lines from client-supplied cart items with their own prices.
+
+    Products are matched by ``product_id`` in one query, lines of unknown products
+    are kept without a product.
+
+    Args:
+        items: Validated cart items.
+
+    Returns:
+        dict: Order ``lines`` and ``total_cents`` in the format of ``price_cart``.
+    """
+    products = get_products_by_ids(item['product_id'] for item in items if item.get('product_id'))
+    lines = []
+    for item in items:
+        unit_price_cents = to_cents(item['product']['price'])
+        product = products.get(item.get('product_id'))
+        lines.append({
+            'product_id': product.pk if product else None,
+            'title': item['product']['title'],
+            'count': item['count'],
+            'track_stock': product is not None and product.stock_quantity is not None,
+            'unit_price_cents': unit_price_cents,
+            'total_cents': unit_price_cents * item['count'],
+        })
+    return {
+        'lines': lines,
+        'total_cents': sum(line['total_cents'] for line in lines),
+    }
@@ -1,4 +1,13 @@
-from django.test import SimpleTestCase
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from household_chemicals.models import ChemicalProduct
+from orders.models import Order
+from outbox.models import OutboxMessage
 
 from orders.services.email_content import get_order_email_content
 from orders.serializers import OrderSerializer
@@ -85,3 +94,100 @@ class OrderSerializerTest(SimpleTestCase):
         serializer = OrderSerializer(data=data)
         self.assertFalse(serializer.is_valid())
         self.assertIn("items", serializer.errors)
+
+
+# Savepoint, insert, lock, update and release for each of the two submission throttles.
+THROTTLE_QUERIES = 10
+
+
+@override_settings(HR_EMAIL='hr@example.com')
+class CartOrderTests(TestCase):
+    def setUp(self):
+        self.soap = ChemicalProduct.objects.create(title='Soap', price='2.50')
+        self.bleach = ChemicalProduct.objects.create(title='Bleach', price='4.05')
+        for product, count in ((self.soap, 3), (self.bleach, 1)):
+            self.client.post(reverse('add-cart-item'), {'product': product.pk, 'count': count},
+                             content_type='application/json', secure=True)
+
+    def send_order(self, **headers):
+        data = {key: value for key, value in VALID_DATA.items() if key != 'items'}
+        return self.client.post(reverse('send-order'), {**data, 'from_cart': True},
+                                content_type='application/json', secure=True, headers=headers)
+
+    def test_replay_returns_original_order(self):
+        first = self.send_order(**{'Idempotency-Key': 'checkout-1'})
+        with self.assertNumQueries(2 + THROTTLE_QUERIES):
+            replay = self.send_order(**{'Idempotency-Key': 'checkout-1'})
+
+        self.assertEqual(replay.status_code, 202)
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual((Order.objects.count(), OutboxMessage.objects.count()), (1, 1))
+
+    def test_replay_with_other_data_is_rejected(self):
+        self.send_order(**{'Idempotency-Key': 'checkout-1'})
+        data = {key: value for key, value in VALID_DATA.items() if key != 'items'}
+        response = self.client.post(reverse('send-order'), {**data, 'address': 'Osh', 'from_cart': True},
+                                    content_type='application/json', secure=True,
+                                    headers={'Idempotency-Key': 'checkout-1'})
+        self.assertEqual(response.status_code, 422)
+        self.assertNotIn('order', response.json())
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_are_scoped_to_session(self):
+        first = self.send_order(**{'Idempotency-Key': 'checkout-1'})
+        self.client.cookies.clear()
+        self.client.post(reverse('add-cart-item'), {'product': self.soap.pk, 'count': 1},
+                         content_type='application/json', secure=True)
+        other = self.send_order(**{'Idempotency-Key': 'checkout-1'})
+        self.assertEqual(other.status_code, 202)
+        self.assertNotEqual(other.json()['order'], first.json()['order'])
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_order_is_priced_from_cart(self):
+        self.soap.price = '2.70'
+        self.soap.save()
+
+        with self.assertNumQueries(9 + THROTTLE_QUERIES):
+            response = self.send_order()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(mail.outbox, [])
+        call_command('process_outbox', '--once', stdout=StringIO())
+        self.assertIn('Soap x 3 = 8.10 CAD', mail.outbox[0].alternatives[0][0])
+        self.assertIn('Итого: 12.15 CAD', mail.outbox[0].body)
+        self.assertEqual(self.client.get(reverse('cart-list'), secure=True).json(), [])
+
+        order = Order.objects.get(pk=response.json()['order'])
+        self.assertEqual(order.total_cents, 1215)
+        self.assertEqual(list(order.lines.values_list('product_id', 'count', 'unit_price_cents', 'total_cents')),
+                         [(self.soap.pk, 3, 270, 810), (self.bleach.pk, 1, 405, 405)])
+
+    def test_unavailable_product_is_rejected(self):
+        self.bleach.is_available = False
+        self.bleach.save()
+        response = self.send_order()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Bleach', response.json()['errors']['items'][0])
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_stock_is_reserved(self):
+        self.soap.stock_quantity = 3
+        self.soap.save()
+        self.assertEqual(self.send_order().status_code, 202)
+        self.soap.refresh_from_db()
+        self.assertEqual((self.soap.stock_quantity, self.soap.is_available), (0, False))
+        reservation = Order.objects.get().reservations.get()
+        self.assertEqual(reservation.quantity, 3)
+
+    def test_oversell_is_rejected(self):
+        self.soap.stock_quantity = 2
+        self.soap.save()
+        response = self.send_order()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors']['items'], ['Not enough stock: Soap.'])
+        self.soap.refresh_from_db()
+        self.assertEqual(self.soap.stock_quantity, 2)
+        self.assertFalse(Order.objects.exists())
+
+    def test_items_are_required_without_cart(self):
+        data = {key: value for key, value in VALID_DATA.items() if key != 'items'}
+        self.assertFalse(OrderSerializer(data=data).is_valid())
@@ -1,24 +1,56 @@
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.status import HTTP_400_BAD_REQUEST, HTTP_202_ACCEPTED
+from rest_framework.status import HTTP_400_BAD_REQUEST, HTTP_202_ACCEPTED, HTTP_422_UNPROCESSABLE_ENTITY
+from cart.structures import format_cents
+from cart.views import CartManagerMixin
+from household_chemicals.stock import InsufficientStock, reserve_stock
+from orders.models import Order
 from orders.serializers import OrderSerializer
 from orders.services.email_content import get_order_email_content
+from orders.services.order_log import create_order, find_order, get_idempotency_key, get_request_hash
+from orders.services.pricing import get_email_items, price_cart, price_items
+from outbox.services import enqueue_email
+from throttling.throttles import SubmissionThrottleMixin
 
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+
+
+class SendOrderView(SubmissionThrottleMixin, APIView, CartManagerMixin):
+    """
+    Place an order and queue an e-mail to managers.
+
+    Submissions with an ``Idempotency-Key`` header are placed once, replays
+    with the same key return the original order without sending anything.
+    Keys are scoped to the client's session, and a replay with other data
+    is rejected with 422.
+    """
 
-class SendOrderView(APIView):
     @swagger_auto_schema(
         operation_summary="Send order.",
         request_body=OrderSerializer,
+        manual_parameters=[
+            openapi.Parameter(IDEMPOTENCY_KEY_HEADER, openapi.IN_HEADER, type=openapi.TYPE_STRING, required=False,
+                              description="Client key of the submission, at most 64 characters."),
+        ],
         responses={
             202: openapi.Response(description="Sent"),
             400: openapi.Response(description="Validation error"),
+            422: openapi.Response(description="Idempotency key reused with other data"),
         },
     )
     def post(self, request, *args, **kwargs):
+        client_key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if client_key and len(client_key) > 64:
+            return Response(
+                {'detail': f'{IDEMPOTENCY_KEY_HEADER} must be at most 64 characters.'},
+                status=HTTP_400_BAD_REQUEST,
+            )
+
         serializer = OrderSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
@@ -26,30 +58,87 @@ class SendOrderView(APIView):
                 status=HTTP_400_BAD_REQUEST,
             )
 
+        idempotency_key = get_idempotency_key(self.get_client_identity(request), client_key) if client_key else None
+        request_hash = get_request_hash(serializer.data)
+        existing = find_order(idempotency_key)
+        if existing:
+            return self.replayed_response(existing, request_hash)
+
         data = serializer.data
+        from_cart = serializer.validated_data['from_cart']
+        if from_cart:
+            try:
+                order = price_cart(self.get_cart_storage(request).load())
+            except ValidationError as exception:
+                return Response(
+                    {'detail': 'Invalid request data', 'errors': exception.detail},
+                    status=HTTP_400_BAD_REQUEST,
+                )
+            data = {**data, 'items': get_email_items(order['lines']), 'total': format_cents(order['total_cents'])}
+        else:
+            order = price_items(serializer.validated_data['items'])
+
         subject = "New order"
 
         text_message, html_message = get_order_email_content(data)
 
         try:
-            send_mail(
-                subject=subject,
-                message=text_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[settings.HR_EMAIL],
-                html_message=html_message,
-                fail_silently=False,
+            with transaction.atomic():
+                record = create_order(serializer.validated_data, order, from_cart, idempotency_key, request_hash)
+                reserve_stock(order['lines'], record)
+                enqueue_email(
+                    subject=subject,
+                    body=text_message,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[settings.HR_EMAIL],
+                    html_body=html_message,
+                    digest=True,
+                )
+        except IntegrityError:
+            existing = find_order(idempotency_key)
+            if existing is None:
+                raise
+            return self.replayed_response(existing, request_hash)
+        except InsufficientStock as exception:
+            titles = [line['title'] for line in order['lines'] if line['product_id'] in exception.product_ids]
+            return Response(
+                {'detail': 'Invalid request data', 'errors': {'items': [f"Not enough stock: {', '.join(titles)}."]}},
+                status=HTTP_400_BAD_REQUEST,
             )
-        except Exception as e:
+
+        if from_cart:
+            with self.get_cart_manager(request) as cart:
+                cart.clear()
+
+        return self.placed_response(record)
+
+    @staticmethod
+    def get_client_identity(request) -> str:
+        """
+        Get identity of the client idempotency keys are scoped to, creating the session of a new client.
+        """
+        if request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        if not request.session.session_key:
+            request.session.save()
+        return f'session:{request.session.session_key}'
+
+    def replayed_response(self, order: Order, request_hash: str) -> Response:
+        if order.request_hash != request_hash:
             return Response(
-                {'detail': 'Error sending email.', 'error': str(e)},
-                status=HTTP_400_BAD_REQUEST
+                {'detail': f'{IDEMPOTENCY_KEY_HEADER} was already used with other order data.'},
+                status=HTTP_422_UNPROCESSABLE_ENTITY,
             )
+        return self.placed_response(order)
 
+    @staticmethod
+    def placed_response(order: Order) -> Response:
         return Response(
             {
                 'detail':
                     'Thanks! Your order has been placed. Our managers will contact you soon.',
+                'order': order.pk,
+                'total': format_cents(order.total_cents),
             },
             status=HTTP_202_ACCEPTED,
         )
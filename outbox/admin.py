@@ -0,0 +1,23 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from outbox.models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'available_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('kind', 'payload', 'status', 'attempts', 'available_at', 'claimed_at', 'error', 'created_at',
+                       'sent_at')
+    actions = ('retry',)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Retry selected dead messages')
+    def retry(self, request, queryset):
+        retried = queryset.filter(status=OutboxMessage.DEAD).update(
+            status=OutboxMessage.PENDING, attempts=0, available_at=timezone.now(),
+        )
+        self.message_user(request, f'Queued {retried} messages for retry.')
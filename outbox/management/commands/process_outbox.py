@@ -0,0 +1,35 @@
+"""
+Worker command delivering queued outbox messages.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from outbox.services import claim_batch, process_batch
+
+
+class Command(BaseCommand):
+    """
+    Deliver due outbox messages, one mail connection per batch.
+    Runs forever unless ``--once`` is passed.
+    """
+    help = 'Deliver queued outbox messages.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages claimed per iteration.')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when nothing is due.')
+        parser.add_argument('--once', action='store_true', help='Exit when nothing is due.')
+
+    def handle(self, *args, **options):
+        while True:
+            batch = claim_batch(options['batch_size'])
+            for message, delivered in process_batch(batch):
+                if delivered:
+                    self.stdout.write(f'Sent {message}')
+                else:
+                    self.stderr.write(f'Failed {message}: {message.error}')
+            if not batch:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
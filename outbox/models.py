@@ -0,0 +1,56 @@
+"""
+Models for outbox app.
+"""
+
+from django.db import models
+
+
+class OutboxMessage(models.Model):
+    """
+    Message queued for delivery by the outbox worker.
+
+    Messages are written in the transaction of the change they belong to, so
+    they are delivered if and only if the change is committed.
+
+    Attributes:
+        kind: Handler name, e.g. ``email``.
+        payload: Handler arguments.
+        status: Delivery status.
+        attempts: Count of failed delivery attempts.
+        available_at: Date and time of the next delivery attempt.
+        claimed_at: Date and time a worker took the message.
+        error: Error of the last failed attempt.
+        created_at: Date and time the message was queued.
+        sent_at: Date and time the message was delivered.
+    """
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    SENT = 'sent'
+    DEAD = 'dead'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (SENT, 'Sent'),
+        (DEAD, 'Dead'),
+    )
+
+    kind = models.CharField(max_length=32)
+    payload = models.JSONField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField()
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk} ({self.status})'
+
+    class Meta:
+        verbose_name = "Outbox Message"
+        verbose_name_plural = "Outbox Messages"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_claim_idx'),
+        ]
@@ -0,0 +1,296 @@
+"""
+Transactional outbox.
+
+Request handlers only insert messages, a worker claims due messages with
+``SELECT ... FOR UPDATE SKIP LOCKED`` and delivers them. Failed deliveries
+are retried with exponential backoff, messages failing ``MAX_ATTEMPTS`` times
+are dead-lettered and kept for inspection.
+
+Each claimed batch is delivered over one mail connection, so SMTP connect,
+STARTTLS and login happen once per batch rather than once per message.
+E-mails queued as digest entries are due at the end of the current
+``EMAIL_DIGEST_INTERVAL`` window and are coalesced into one message per
+sender and recipients.
+"""
+
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import OutboxMessage
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+CLAIM_TIMEOUT = timedelta(minutes=10)
+ERROR_MAX_LENGTH = 2000
+DIGEST_KIND = 'email_digest'
+
+
+def send_email(payload: dict, connection: BaseEmailBackend) -> None:
+    """
+    Deliver queued e-mail.
+
+    Args:
+        payload: ``subject``, ``body``, ``from_email``, ``to`` and optional ``html_body``.
+        connection: Open mail connection of the batch.
+    """
+    message = EmailMultiAlternatives(payload['subject'], payload['body'], payload['from_email'], payload['to'],
+                                     connection=connection)
+    if payload.get('html_body'):
+        message.attach_alternative(payload['html_body'], 'text/html')
+    message.send(fail_silently=False)
+
+
+HANDLERS: dict[str, Callable[[dict, BaseEmailBackend], None]] = {
+    'email': send_email,
+    DIGEST_KIND: send_email,
+}
+
+
+def register_handler(kind: str, handler: Callable[[dict, BaseEmailBackend], None]) -> None:
+    """
+    Register handler of a message kind, call from ``AppConfig.ready``.
+
+    Args:
+        kind: Handler name.
+        handler: Callable taking the payload and the mail connection of the batch.
+    """
+    HANDLERS[kind] = handler
+
+
+def enqueue(kind: str, payload: dict, available_at: Optional[datetime] = None) -> OutboxMessage:
+    """
+    Queue a message. Call inside the transaction of the change the message belongs to.
+
+    Args:
+        kind: Handler name.
+        payload: JSON-serializable handler arguments.
+        available_at: Date and time of the first delivery attempt, now by default.
+
+    Returns:
+        OutboxMessage: Queued message.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown outbox message kind: {kind}')
+    return OutboxMessage.objects.create(kind=kind, payload=payload, available_at=available_at or timezone.now())
+
+
+def get_digest_due(now: datetime, interval: timedelta) -> datetime:
+    """
+    Get end of the digest window the given moment belongs to.
+
+    Windows are aligned to the epoch, so all entries queued within a window
+    share the due time and are claimed together.
+    """
+    seconds = interval.total_seconds()
+    return datetime.fromtimestamp(math.ceil(now.timestamp() / seconds) * seconds, tz=dt_timezone.utc)
+
+
+def enqueue_email(subject: str, body: str, from_email: str, to: list[str],
+                  html_body: Optional[str] = None, digest: bool = False) -> OutboxMessage:
+    """
+    Queue an e-mail.
+
+    Args:
+        subject: Subject.
+        body: Plain text body.
+        from_email: Sender address.
+        to: Recipient addresses.
+        html_body: HTML alternative of the body.
+        digest: Whether the e-mail may be coalesced into a periodic digest,
+            takes effect when ``EMAIL_DIGEST_INTERVAL`` is set.
+
+    Returns:
+        OutboxMessage: Queued message.
+    """
+    payload = {
+        'subject': subject,
+        'body': body,
+        'from_email': from_email,
+        'to': to,
+        'html_body': html_body,
+    }
+    interval = settings.EMAIL_DIGEST_INTERVAL
+    if digest and interval:
+        return enqueue(DIGEST_KIND, payload, available_at=get_digest_due(timezone.now(), interval))
+    return enqueue('email', payload)
+
+
+def get_backoff(attempts: int) -> timedelta:
+    """
+    Get delay before the next attempt after the given count of failed attempts.
+    """
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def claim_batch(batch_size: int) -> list[OutboxMessage]:
+    """
+    Take due messages for delivery. Safe for concurrent workers.
+
+    Messages claimed by a worker which died are taken again after ``CLAIM_TIMEOUT``.
+
+    Args:
+        batch_size: Maximum number of messages.
+
+    Returns:
+        list[OutboxMessage]: Claimed messages.
+    """
+    now = timezone.now()
+    claimable = OutboxMessage.objects.filter(
+        Q(status=OutboxMessage.PENDING, available_at__lte=now)
+        | Q(status=OutboxMessage.PROCESSING, claimed_at__lt=now - CLAIM_TIMEOUT)
+    )
+    with transaction.atomic():
+        batch = list(claimable.select_for_update(skip_locked=True).order_by('available_at', 'pk')[:batch_size])
+        OutboxMessage.objects.filter(pk__in=[message.pk for message in batch]).update(
+            status=OutboxMessage.PROCESSING, claimed_at=now,
+        )
+    return batch
+
+
+def mark_sent(message: OutboxMessage) -> None:
+    """
+    Record successful delivery.
+    """
+    message.status = OutboxMessage.SENT
+    message.sent_at = timezone.now()
+    message.error = ''
+    message.save(update_fields=['status', 'sent_at', 'error'])
+
+
+def mark_all_sent(messages: list[OutboxMessage]) -> None:
+    """
+    Record successful delivery of several messages with one query.
+    """
+    now = timezone.now()
+    OutboxMessage.objects.filter(pk__in=[message.pk for message in messages]).update(
+        status=OutboxMessage.SENT, sent_at=now, error='',
+    )
+    for message in messages:
+        message.status, message.sent_at, message.error = OutboxMessage.SENT, now, ''
+
+
+def mark_failed(message: OutboxMessage, error: str) -> None:
+    """
+    Record failed delivery, scheduling a retry or dead-lettering the message.
+    """
+    message.attempts += 1
+    message.error = error[:ERROR_MAX_LENGTH]
+    if message.attempts >= MAX_ATTEMPTS:
+        message.status = OutboxMessage.DEAD
+    else:
+        message.status = OutboxMessage.PENDING
+        message.available_at = timezone.now() + get_backoff(message.attempts)
+    message.save(update_fields=['attempts', 'error', 'status', 'available_at'])
+
+
+def describe_error(exception: Exception) -> str:
+    return f'{type(exception).__name__}: {exception}'
+
+
+def process_message(message: OutboxMessage, connection: BaseEmailBackend) -> bool:
+    """
+    Deliver claimed message.
+
+    Args:
+        message: Claimed message.
+        connection: Open mail connection of the batch.
+
+    Returns:
+        bool: Whether the message was delivered.
+    """
+    try:
+        HANDLERS[message.kind](message.payload, connection)
+    except Exception as exception:
+        mark_failed(message, describe_error(exception))
+        return False
+    mark_sent(message)
+    return True
+
+
+def build_digest(payloads: list[dict]) -> dict:
+    """
+    Combine e-mails with the same sender and recipients into one.
+
+    Args:
+        payloads: Payloads of queued e-mails, in order of queueing.
+
+    Returns:
+        dict: Payload of the digest e-mail.
+    """
+    separator = '\n\n' + '-' * 40 + '\n\n'
+    html_parts = [payload.get('html_body') or f"<pre>{escape(payload['body'])}</pre>" for payload in payloads]
+    return {
+        'subject': f'Digest: {len(payloads)} notifications',
+        'body': separator.join(f"{payload['subject']}\n\n{payload['body']}" for payload in payloads),
+        'from_email': payloads[0]['from_email'],
+        'to': payloads[0]['to'],
+        'html_body': '<hr>'.join(
+            f"<h3>{escape(payload['subject'])}</h3>{html}" for payload, html in zip(payloads, html_parts)
+        ),
+    }
+
+
+def process_digest(messages: list[OutboxMessage], connection: BaseEmailBackend) -> bool:
+    """
+    Deliver claimed digest entries as one e-mail.
+
+    Returns:
+        bool: Whether the digest was delivered.
+    """
+    if len(messages) == 1:
+        return process_message(messages[0], connection)
+    try:
+        send_email(build_digest([message.payload for message in messages]), connection)
+    except Exception as exception:
+        for message in messages:
+            mark_failed(message, describe_error(exception))
+        return False
+    mark_all_sent(messages)
+    return True
+
+
+def process_batch(batch: list[OutboxMessage]) -> list[tuple[OutboxMessage, bool]]:
+    """
+    Deliver claimed messages over one mail connection, coalescing digest entries.
+
+    Args:
+        batch: Claimed messages.
+
+    Returns:
+        list[tuple[OutboxMessage, bool]]: Messages with whether each was delivered.
+    """
+    if not batch:
+        return []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exception:
+        for message in batch:
+            mark_failed(message, describe_error(exception))
+        return [(message, False) for message in batch]
+
+    results = []
+    digests = defaultdict(list)
+    try:
+        for message in batch:
+            if message.kind == DIGEST_KIND:
+                digests[(message.payload['from_email'], tuple(message.payload['to']))].append(message)
+            else:
+                results.append((message, process_message(message, connection)))
+        for messages in digests.values():
+            delivered = process_digest(messages, connection)
+            results.extend((message, delivered) for message in messages)
+    finally:
+        connection.close()
+    return results
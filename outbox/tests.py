@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from outbox.models import OutboxMessage
+from outbox.services import (
+    MAX_ATTEMPTS, claim_batch, enqueue_email, get_backoff, get_digest_due, process_batch,
+)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP is down')
+
+
+class CountingEmailBackend(locmem.EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return True
+
+
+def queue_email(subject='Subject', **kwargs):
+    return enqueue_email(subject, 'Body', 'shop@example.com', ['hr@example.com'], html_body='<p>Body</p>', **kwargs)
+
+
+class OutboxTests(TestCase):
+    def test_message_is_delivered(self):
+        queue_email()
+        [(message, delivered)] = process_batch(claim_batch(10))
+        self.assertTrue(delivered)
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.SENT)
+        self.assertEqual(mail.outbox[0].to, ['hr@example.com'])
+        self.assertEqual(mail.outbox[0].alternatives[0][0], '<p>Body</p>')
+
+    def test_claimed_message_is_not_claimed_again(self):
+        queue_email()
+        self.assertEqual(len(claim_batch(10)), 1)
+        self.assertEqual(claim_batch(10), [])
+
+    def test_stale_claim_is_taken_again(self):
+        queue_email()
+        claim_batch(10)
+        OutboxMessage.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(len(claim_batch(10)), 1)
+
+    @override_settings(EMAIL_BACKEND='outbox.tests.FailingEmailBackend')
+    def test_failed_delivery_is_retried_with_backoff(self):
+        queue_email()
+        [(message, delivered)] = process_batch(claim_batch(10))
+        self.assertFalse(delivered)
+
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (OutboxMessage.PENDING, 1))
+        self.assertIn('SMTP is down', message.error)
+        self.assertGreater(message.available_at, timezone.now() + get_backoff(1) - timedelta(seconds=5))
+        self.assertEqual(claim_batch(10), [])
+
+    @override_settings(EMAIL_BACKEND='outbox.tests.FailingEmailBackend')
+    def test_message_is_dead_lettered(self):
+        message = queue_email()
+        OutboxMessage.objects.filter(pk=message.pk).update(attempts=MAX_ATTEMPTS - 1)
+        [(message, _)] = process_batch(claim_batch(10))
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.DEAD)
+        OutboxMessage.objects.update(available_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(claim_batch(10), [])
+
+    def test_backoff_is_capped(self):
+        self.assertEqual(get_backoff(1), timedelta(seconds=30))
+        self.assertEqual(get_backoff(3), timedelta(minutes=2))
+        self.assertEqual(get_backoff(20), timedelta(hours=1))
+
+    @override_settings(EMAIL_BACKEND='outbox.tests.CountingEmailBackend')
+    def test_batch_shares_one_connection(self):
+        CountingEmailBackend.opened = 0
+        for index in range(3):
+            queue_email(f'Order {index}')
+        process_batch(claim_batch(10))
+        self.assertEqual((CountingEmailBackend.opened, len(mail.outbox)), (1, 3))
+
+
+@override_settings(EMAIL_DIGEST_INTERVAL=timedelta(minutes=15))
+class DigestTests(TestCase):
+    def test_entries_of_window_share_due_time(self):
+        first = queue_email(digest=True)
+        second = queue_email(digest=True)
+        self.assertEqual(first.kind, 'email_digest')
+        self.assertEqual(first.available_at, second.available_at)
+        self.assertEqual(first.available_at.minute % 15, 0)
+        self.assertEqual(queue_email().kind, 'email')
+
+    def test_due_time_is_end_of_window(self):
+        now = timezone.now().replace(hour=10, minute=7, second=30, microsecond=0)
+        self.assertEqual(get_digest_due(now, timedelta(minutes=15)), now.replace(minute=15, second=0))
+
+    def test_entries_are_coalesced(self):
+        for index in range(3):
+            queue_email(f'Order {index}', digest=True)
+        OutboxMessage.objects.update(available_at=timezone.now())
+
+        results = process_batch(claim_batch(10))
+        self.assertTrue(all(delivered for _, delivered in results))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Digest: 3 notifications')
+        self.assertIn('Order 2', mail.outbox[0].body)
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.SENT).count(), 3)
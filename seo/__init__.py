@@ -0,0 +1,3 @@
+"""
+SEO Django app.
+"""
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from seo.models import SitemapSection
+
+
+@admin.register(SitemapSection)
+class SitemapSectionAdmin(admin.ModelAdmin):
+    list_display = ('name', 'dirty', 'url_count', 'file_count', 'lastmod', 'built_at')
+    readonly_fields = ('name', 'url_count', 'file_count', 'lastmod', 'built_at')
+    list_filter = ('dirty',)
@@ -0,0 +1,24 @@
+"""
+SEO app config.
+"""
+
+from django.apps import AppConfig
+
+
+class SeoConfig(AppConfig):
+    """
+    SEO app config.
+
+    Attributes:
+        default_auto_field: Default auto-created primary key field.
+        name: App name.
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'seo'
+
+    def ready(self) -> None:
+        """
+        Connect signals marking sitemap sections as changed.
+        """
+        from .signals import connect_sitemap_signals
+        connect_sitemap_signals()
@@ -0,0 +1,30 @@
+"""
+Command regenerating changed sitemap sections.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from seo.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    """
+    Regenerate sitemap files of sections changed since the last build.
+
+    Intended to be run periodically (e.g. by cron) and on deploy.
+    """
+    help = 'Regenerate sitemap files of sections changed since the last build.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate all sections.')
+
+    def handle(self, *args, **options):
+        try:
+            rebuilt = build_sitemaps(force=options['force'])
+        except ImproperlyConfigured as exception:
+            raise CommandError(str(exception))
+        if rebuilt:
+            self.stdout.write(self.style.SUCCESS(f"Regenerated sections: {', '.join(rebuilt)}"))
+        else:
+            self.stdout.write('Sitemaps are up to date.')
@@ -0,0 +1,33 @@
+"""
+Models for SEO app.
+"""
+
+from django.db import models
+
+
+class SitemapSection(models.Model):
+    """
+    State of one generated sitemap section.
+
+    Attributes:
+        name: Section name, see ``seo.sitemaps.SECTIONS``.
+        dirty: Whether section models changed since the last build.
+        lastmod: Latest modification date of section URLs.
+        url_count: Number of URLs in the section.
+        file_count: Number of sitemap files the section is split into.
+        built_at: Date and time of the last build.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    dirty = models.BooleanField(default=True)
+    lastmod = models.DateTimeField(null=True, blank=True)
+    url_count = models.PositiveIntegerField(default=0)
+    file_count = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = "Sitemap Section"
+        verbose_name_plural = "Sitemap Sections"
+        ordering = ['name']
@@ -0,0 +1,34 @@
+"""
+Signals marking sitemap sections as changed.
+"""
+
+from functools import partial
+
+from django.db.models.signals import post_delete, post_save
+
+from .models import SitemapSection
+
+
+def mark_section_dirty(section_name: str, **kwargs) -> None:
+    """
+    Mark sitemap section for regeneration. Costs one small UPDATE per write.
+
+    Args:
+        section_name: Name of the changed section.
+    """
+    if kwargs.get('raw'):
+        return
+    SitemapSection.objects.filter(name=section_name, dirty=False).update(dirty=True)
+
+
+def connect_sitemap_signals() -> None:
+    """
+    Connect save and delete signals of every sitemap section model.
+    """
+    from .sitemaps import SECTIONS
+
+    for section in SECTIONS:
+        receiver = partial(mark_section_dirty, section.name)
+        uid = f'sitemap-{section.name}'
+        post_save.connect(receiver, sender=section.model, weak=False, dispatch_uid=uid)
+        post_delete.connect(receiver, sender=section.model, weak=False, dispatch_uid=uid)
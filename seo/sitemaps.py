@@ -0,0 +1,237 @@
+"""
+Sitemap sections and incremental sitemap builder.
+
+Every section is written to its own set of static files. Only sections marked
+as dirty (by model signals) are regenerated, the index file is rewritten on
+every build since it's tiny.
+"""
+
+import os
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Model, Q, QuerySet
+from django.utils import timezone
+
+from api_models.models import (
+    BlogPost, Brand, CaseStudy, City, Installation, Location, Product, Repair, Vacancy,
+)
+from .models import SitemapSection
+
+MAX_URLS_PER_FILE = 50000
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+@dataclass(frozen=True)
+class Section:
+    """
+    Sitemap section definition.
+
+    Attributes:
+        name: Section name, used in file names.
+        model: Model with slugged objects.
+        path: Public path template with ``{slug}`` placeholder.
+        lastmod_field: Model field with modification date.
+        filters: Extra queryset filters, e.g. only active objects.
+    """
+    name: str
+    model: type[Model]
+    path: str
+    lastmod_field: str = 'created_at'
+    filters: Q = field(default_factory=Q)
+
+    def queryset(self) -> QuerySet:
+        """
+        Get ordered queryset of section objects with a slug.
+        """
+        return (
+            self.model.objects
+            .filter(self.filters)
+            .exclude(slug__isnull=True)
+            .exclude(slug='')
+            .order_by('pk')
+        )
+
+
+SECTIONS: tuple[Section, ...] = (
+    Section('cities', City, '/cities/{slug}/'),
+    Section('repairs', Repair, '/repairs/{slug}/'),
+    Section('installations', Installation, '/installations/{slug}/'),
+    Section('brands', Brand, '/brands/{slug}/'),
+    Section('products', Product, '/products/{slug}/', lastmod_field='updated_at'),
+    Section('blog', BlogPost, '/blog/{slug}/'),
+    Section('casestudies', CaseStudy, '/casestudies/{slug}/'),
+    Section('vacancies', Vacancy, '/vacancies/{slug}/', lastmod_field='updated_at', filters=Q(is_active=True)),
+    Section('locations', Location, '/locations/{slug}/'),
+)
+
+
+def get_sitemap_root() -> Path:
+    """
+    Get directory the sitemap files are written to.
+    """
+    return Path(settings.SITEMAP_ROOT)
+
+
+def section_file_name(section: Section, number: int) -> str:
+    """
+    Get file name of the section part.
+
+    Args:
+        section: Sitemap section.
+        number: Part number, starting from 1.
+    """
+    return f'sitemap-{section.name}-{number}.xml'
+
+
+def write_atomic(path: Path, chunks: Iterator[str]) -> None:
+    """
+    Write file through a temporary file, so the web server never sees a partial sitemap.
+
+    Args:
+        path: Destination path.
+        chunks: File content pieces.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix='.xml')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            for chunk in chunks:
+                file.write(chunk)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def iter_urls(section: Section, base_url: str) -> Iterator[tuple[str, Optional[datetime]]]:
+    """
+    Iterate over absolute URLs and modification dates of the section.
+
+    Args:
+        section: Sitemap section.
+        base_url: Public site origin.
+    """
+    rows = section.queryset().values_list('slug', section.lastmod_field)
+    for slug, lastmod in rows.iterator(chunk_size=2000):
+        yield base_url + section.path.format(slug=slug), lastmod
+
+
+def render_urlset(urls: list[tuple[str, Optional[datetime]]]) -> Iterator[str]:
+    """
+    Render ``urlset`` document.
+    """
+    yield XML_HEADER + f'<urlset xmlns="{XMLNS}">\n'
+    for loc, lastmod in urls:
+        lastmod_tag = f'<lastmod>{lastmod.date().isoformat()}</lastmod>' if lastmod else ''
+        yield f'<url><loc>{escape(loc)}</loc>{lastmod_tag}</url>\n'
+    yield '</urlset>\n'
+
+
+def build_section(section: Section, state: SitemapSection, root: Path, base_url: str) -> SitemapSection:
+    """
+    Regenerate all files of the section.
+
+    The dirty flag is dropped before reading, so changes made during the build
+    mark the section dirty again for the next run.
+
+    Args:
+        section: Sitemap section.
+        state: Stored section state.
+        root: Sitemap directory.
+        base_url: Public site origin.
+
+    Returns:
+        SitemapSection: Updated section state.
+    """
+    SitemapSection.objects.filter(pk=state.pk).update(dirty=False)
+
+    file_count = 0
+    url_count = 0
+    lastmod = None
+    batch: list[tuple[str, Optional[datetime]]] = []
+
+    def flush() -> None:
+        nonlocal file_count
+        file_count += 1
+        write_atomic(root / section_file_name(section, file_count), render_urlset(batch))
+        batch.clear()
+
+    for loc, modified in iter_urls(section, base_url):
+        batch.append((loc, modified))
+        url_count += 1
+        if modified and (lastmod is None or modified > lastmod):
+            lastmod = modified
+        if len(batch) == MAX_URLS_PER_FILE:
+            flush()
+    if batch or not file_count:
+        flush()
+
+    for number in range(file_count + 1, state.file_count + 1):
+        (root / section_file_name(section, number)).unlink(missing_ok=True)
+
+    # The dirty flag isn't saved, it may have been set again by a change made during the build.
+    state.lastmod = lastmod
+    state.url_count = url_count
+    state.file_count = file_count
+    state.built_at = timezone.now()
+    state.save(update_fields=['lastmod', 'url_count', 'file_count', 'built_at'])
+    state.refresh_from_db(fields=['dirty'])
+    return state
+
+
+def render_index(states: list[SitemapSection], sitemap_url: str) -> Iterator[str]:
+    """
+    Render ``sitemapindex`` document referencing every section file.
+    """
+    sections = {section.name: section for section in SECTIONS}
+    yield XML_HEADER + f'<sitemapindex xmlns="{XMLNS}">\n'
+    for state in states:
+        lastmod = state.lastmod or state.built_at
+        lastmod_tag = f'<lastmod>{lastmod.isoformat()}</lastmod>' if lastmod else ''
+        for number in range(1, state.file_count + 1):
+            loc = sitemap_url + section_file_name(sections[state.name], number)
+            yield f'<sitemap><loc>{escape(loc)}</loc>{lastmod_tag}</sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def build_sitemaps(force: bool = False) -> list[str]:
+    """
+    Regenerate changed sitemap sections and the sitemap index.
+
+    Args:
+        force: Regenerate all sections, even unchanged.
+
+    Returns:
+        list[str]: Names of regenerated sections.
+
+    Raises:
+        ImproperlyConfigured: ``SITEMAP_BASE_URL`` isn't set.
+    """
+    if not settings.SITEMAP_BASE_URL:
+        raise ImproperlyConfigured('SITEMAP_BASE_URL must be set to the public site origin, '
+                                   'e.g. https://www.fastcanada.com')
+    root = get_sitemap_root()
+    root.mkdir(parents=True, exist_ok=True)
+    base_url = settings.SITEMAP_BASE_URL.rstrip('/')
+
+    states = {state.name: state for state in SitemapSection.objects.all()}
+    rebuilt = []
+    for section in SECTIONS:
+        state = states.get(section.name)
+        if state is None:
+            state = states[section.name] = SitemapSection.objects.create(name=section.name)
+        if force or state.dirty or not (root / section_file_name(section, 1)).exists():
+            build_section(section, state, root, base_url)
+            rebuilt.append(section.name)
+
+    ordered_states = [states[section.name] for section in SECTIONS]
+    write_atomic(root / 'sitemap.xml', render_index(ordered_states, settings.SITEMAP_URL))
+    return rebuilt
@@ -0,0 +1,76 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from api_models.models import Brand, City
+from seo.models import SitemapSection
+from seo import sitemaps
+from seo.sitemaps import SECTIONS, build_sitemaps
+
+
+class SitemapBuildTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        settings_override = override_settings(
+            SITEMAP_ROOT=self.root,
+            SITEMAP_BASE_URL='https://example.com',
+            SITEMAP_URL='https://example.com/sitemaps/',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        City.objects.create(name='Toronto', latitude=43.65, longitude=-79.38)
+        Brand.objects.create(name='Bosch')
+
+    def test_first_build_writes_all_sections(self):
+        rebuilt = build_sitemaps()
+        self.assertEqual(rebuilt, [section.name for section in SECTIONS])
+
+        cities = (self.root / 'sitemap-cities-1.xml').read_text()
+        self.assertIn('<loc>https://example.com/cities/toronto/</loc>', cities)
+        index = (self.root / 'sitemap.xml').read_text()
+        self.assertIn('https://example.com/sitemaps/sitemap-brands-1.xml', index)
+
+    def test_only_changed_sections_are_rebuilt(self):
+        build_sitemaps()
+        self.assertEqual(build_sitemaps(), [])
+
+        Brand.objects.create(name='Miele')
+        self.assertEqual(build_sitemaps(), ['brands'])
+        self.assertIn('/brands/miele/', (self.root / 'sitemap-brands-1.xml').read_text())
+
+    def test_section_is_split_and_stale_parts_removed(self):
+        for name in ('Miele', 'Samsung', 'Viking'):
+            Brand.objects.create(name=name)
+
+        with mock.patch('seo.sitemaps.MAX_URLS_PER_FILE', 2):
+            build_sitemaps()
+            self.assertEqual(SitemapSection.objects.get(name='brands').file_count, 2)
+            self.assertTrue((self.root / 'sitemap-brands-2.xml').exists())
+
+            Brand.objects.filter(name__in=['Samsung', 'Viking']).delete()
+            build_sitemaps()
+        self.assertFalse((self.root / 'sitemap-brands-2.xml').exists())
+
+    def test_change_during_build_keeps_section_dirty(self):
+        iter_urls = sitemaps.iter_urls
+
+        def iter_urls_with_change(section, base_url):
+            yield from iter_urls(section, base_url)
+            if section.name == 'brands':
+                Brand.objects.create(name='Miele')
+
+        with mock.patch('seo.sitemaps.iter_urls', iter_urls_with_change):
+            build_sitemaps()
+        self.assertTrue(SitemapSection.objects.get(name='brands').dirty)
+        self.assertEqual(build_sitemaps(), ['brands'])
+
+    @override_settings(SITEMAP_BASE_URL='')
+    def test_base_url_is_required(self):
+        with self.assertRaises(ImproperlyConfigured):
+            build_sitemaps()
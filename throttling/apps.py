@@ -0,0 +1,17 @@
+"""
+Throttling app config.
+"""
+
+from django.apps import AppConfig
+
+
+class ThrottlingConfig(AppConfig):
+    """
+    Throttling app config.
+
+    Attributes:
+        default_auto_field: Default auto-created primary key field.
+        name: App name.
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'throttling'
@@ -0,0 +1,25 @@
+"""
+Command deleting idle token buckets.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from throttling.models import TokenBucket
+
+
+class Command(BaseCommand):
+    """
+    Delete buckets untouched for longer than it takes any scope to refill. A deleted bucket is recreated full.
+    """
+    help = 'Delete idle throttle buckets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle-hours', type=int, default=24, help='Hours since the last request.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['idle_hours'])
+        deleted, _ = TokenBucket.objects.filter(updated_at__lt=cutoff).delete()
+        self.stdout.write(f'Deleted {deleted} buckets')
@@ -0,0 +1,26 @@
+"""
+Models for throttling app.
+"""
+
+from django.db import models
+
+
+class TokenBucket(models.Model):
+    """
+    Token bucket of a throttled client, shared by all workers through the database.
+
+    Attributes:
+        key: Throttle scope and client identity, e.g. ``submissions:ip:203.0.113.7``.
+        tokens: Tokens left at ``updated_at``.
+        updated_at: Date and time tokens were last counted.
+    """
+    key = models.CharField(max_length=255, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f'{self.key}: {self.tokens:.2f}'
+
+    class Meta:
+        verbose_name = "Token Bucket"
+        verbose_name_plural = "Token Buckets"
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from api_models.models import Contact, Vacancy
+from api_models.resumes import ResumeUploadHandler
+from throttling.models import TokenBucket
+from throttling.throttles import SubmissionContactThrottle, SubmissionIPThrottle, take_tokens
+
+RATES = {'submissions': '3/hour', 'submissions_contact': '2/hour'}
+
+
+class TakeTokensTests(TestCase):
+    def test_burst_then_reject(self):
+        for _ in range(3):
+            self.assertIsNone(take_tokens(['a'], 3, 3 / 3600))
+        self.assertAlmostEqual(take_tokens(['a'], 3, 3 / 3600), 1200, delta=1)
+
+    def test_tokens_are_taken_from_all_buckets_or_none(self):
+        take_tokens(['a'], 1, 1 / 3600)
+        self.assertIsNotNone(take_tokens(['a', 'b'], 1, 1 / 3600))
+        self.assertEqual(TokenBucket.objects.get(key='b').tokens, 1)
+
+
+@mock.patch.object(SubmissionIPThrottle, 'THROTTLE_RATES', RATES)
+@mock.patch.object(SubmissionContactThrottle, 'THROTTLE_RATES', RATES)
+class SubmissionThrottleTests(TestCase):
+    def post_contact(self, email, **extra):
+        return self.client.post(reverse('contact'), {'name': 'Lead', 'email': email, 'address': '1 Main St'},
+                                content_type='application/json', secure=True, **extra)
+
+    def test_same_email_is_throttled(self):
+        self.assertEqual(self.post_contact('lead@example.com').status_code, 201)
+        self.assertEqual(self.post_contact('lead@example.com').status_code, 400)
+        response = self.post_contact('LEAD@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+
+    def test_same_ip_is_throttled_before_validation(self):
+        for index in range(3):
+            self.post_contact(f'lead{index}@example.com')
+        # Only the IP bucket is read, the contact throttle isn't checked after the rejection.
+        with self.assertNumQueries(4):
+            response = self.post_contact('other@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(Contact.objects.count(), 3)
+        self.assertEqual(TokenBucket.objects.filter(key__startswith='submissions_contact:').count(), 3)
+        self.assertEqual(self.post_contact('other@example.com', REMOTE_ADDR='198.51.100.1').status_code, 201)
+
+    def test_multipart_body_isnt_parsed_by_throttles(self):
+        vacancy = Vacancy.objects.create(title='Technician')
+        for _ in range(3):
+            take_tokens([SubmissionIPThrottle().get_key('ip:127.0.0.1')], 3, 3 / 3600)
+
+        with mock.patch.object(ResumeUploadHandler, 'receive_data_chunk') as receive_data_chunk:
+            response = self.client.post(reverse('vacancy-application-list'), {
+                'vacancy': vacancy.slug, 'name': 'Applicant', 'email': 'applicant@example.com',
+                'resume': SimpleUploadedFile('cv.pdf', b'%PDF-1.7 resume'),
+            }, secure=True)
+        self.assertEqual(response.status_code, 429)
+        receive_data_chunk.assert_not_called()
+        self.assertFalse(TokenBucket.objects.filter(key__startswith='submissions_contact:').exists())
@@ -0,0 +1,145 @@
+"""
+Token bucket throttles.
+
+Buckets are rows of ``TokenBucket``, so every gunicorn worker sees the same
+state. A request takes one token from each of its buckets under row locks,
+either from all of them or from none. Buckets refill continuously at the
+rate of the scope, e.g. ``5/hour`` allows a burst of 5 requests and one more
+every 12 minutes.
+
+Throttles run in ``APIView.initial``, before the handler, so rejected
+requests never reach serializer validation, e-mail or CRM calls.
+"""
+
+import hashlib
+import re
+from typing import Optional
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+from throttling.models import TokenBucket
+
+NON_DIGITS_PATTERN = re.compile(r'\D')
+
+
+def take_tokens(keys: list[str], capacity: int, refill_rate: float) -> Optional[float]:
+    """
+    Take one token from each bucket if all of them have one.
+
+    Args:
+        keys: Bucket keys.
+        capacity: Maximum tokens of a bucket.
+        refill_rate: Tokens added per second.
+
+    Returns:
+        Optional[float]: ``None`` when tokens were taken, otherwise seconds until they can be.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        TokenBucket.objects.bulk_create(
+            [TokenBucket(key=key, tokens=capacity, updated_at=now) for key in keys], ignore_conflicts=True,
+        )
+        buckets = list(TokenBucket.objects.select_for_update().filter(key__in=keys).order_by('key'))
+        for bucket in buckets:
+            elapsed = max((now - bucket.updated_at).total_seconds(), 0)
+            bucket.tokens = min(capacity, bucket.tokens + elapsed * refill_rate)
+            bucket.updated_at = now
+        if any(bucket.tokens < 1 for bucket in buckets):
+            return max((1 - bucket.tokens) / refill_rate for bucket in buckets)
+        for bucket in buckets:
+            bucket.tokens -= 1
+        TokenBucket.objects.bulk_update(buckets, ['tokens', 'updated_at'])
+    return None
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Throttle with a database token bucket per client identity. Safe methods aren't throttled.
+
+    Attributes:
+        wait_seconds: Seconds until the rejected request would be allowed.
+    """
+    wait_seconds: Optional[float] = None
+
+    def get_identities(self, request) -> list[str]:
+        """
+        Get identities of the client, e.g. ``ip:203.0.113.7``. Empty list disables the throttle.
+        """
+        raise NotImplementedError('.get_identities() must be overridden')
+
+    def get_key(self, identity: str) -> str:
+        digest = hashlib.sha256(identity.encode()).hexdigest()[:40]
+        return f'{self.scope}:{digest}'
+
+    def allow_request(self, request, view):
+        if self.rate is None or request.method in SAFE_METHODS:
+            return True
+        identities = self.get_identities(request)
+        if not identities:
+            return True
+        keys = sorted({self.get_key(identity) for identity in identities})
+        self.wait_seconds = take_tokens(keys, self.num_requests, self.num_requests / self.duration)
+        return self.wait_seconds is None
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class SubmissionIPThrottle(TokenBucketThrottle):
+    """
+    Throttle submissions by client IP.
+    """
+    scope = 'submissions'
+
+    def get_identities(self, request):
+        return [f'ip:{self.get_ident(request)}']
+
+
+class SubmissionContactThrottle(TokenBucketThrottle):
+    """
+    Throttle submissions by e-mail and phone of the submitted form.
+
+    Multipart forms aren't throttled by contact, reading their fields would
+    parse the whole body, streaming and hashing uploads before the throttle
+    could reject the request.
+    """
+    scope = 'submissions_contact'
+
+    def get_identities(self, request):
+        if request.content_type.startswith('multipart/'):
+            return []
+        data = request.data
+        if not hasattr(data, 'get'):
+            return []
+        identities = []
+        email = data.get('email')
+        if isinstance(email, str) and email.strip():
+            identities.append(f'email:{email.strip().lower()}')
+        for field in ('phone', 'phone_number'):
+            phone = data.get(field)
+            digits = NON_DIGITS_PATTERN.sub('', phone) if isinstance(phone, str) else ''
+            if digits:
+                identities.append(f'phone:{digits[-10:]}')
+        return identities
+
+
+SUBMISSION_THROTTLES = [SubmissionIPThrottle, SubmissionContactThrottle]
+
+
+class SubmissionThrottleMixin:
+    """
+    View mixin throttling submissions, checking throttles in order and stopping at the first rejection.
+
+    ``APIView.check_throttles`` evaluates every throttle. Stopping early means a
+    client over its IP limit is rejected before the contact throttle reads the
+    request body, and doesn't spend contact tokens.
+    """
+    throttle_classes = SUBMISSION_THROTTLES
+
+    def check_throttles(self, request):
+        for throttle in self.get_throttles():
+            if not throttle.allow_request(request, self):
+                self.throttled(request, throttle.wait())